@@ -0,0 +1,17 @@
+"""Benchmark suites run through ``python manage.py benchmark <suite>``.
+
+Each suite module exposes ``run(options)`` returning a list of result dicts
+built with :func:`game.benchmarks.timing.measure`. Results can be saved as a
+baseline and later runs compared against it, see :mod:`.baseline`.
+"""
+
+SUITES = {
+    'drafts': 'game.benchmarks.drafts',
+    'load': 'game.benchmarks.load',
+    'lookup': 'game.benchmarks.lookup',
+    'players_api': 'game.benchmarks.players_api',
+    'primitives': 'game.benchmarks.primitives',
+    'render': 'game.benchmarks.render',
+    'scoring': 'game.benchmarks.scoring',
+    'sqlite': 'game.benchmarks.sqlite',
+}
@@ -0,0 +1,35 @@
+"""Saved benchmark results and the comparison that flags regressions against them."""
+import json
+
+# Timings that may only grow by the tolerance; query counts may not grow at all
+TIMED_KEYS = ('median_us', 'p95_us', 'p99_us')
+
+
+def save_baseline(path, results):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2)
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def compare(results, baseline, tolerance=0.25):
+    """Return a message for every result slower or issuing more queries than its baseline."""
+    previous = {result['name']: result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(result['name'])
+        if old is None:
+            continue
+        for key in TIMED_KEYS:
+            if key in old and key in result and result[key] > old[key] * (1 + tolerance):
+                regressions.append(f"{result['name']}: {key} {old[key]:.1f} -> {result[key]:.1f} us")
+        if result.get('queries_per_request', 0) > old.get('queries_per_request', float('inf')):
+            regressions.append(
+                f"{result['name']}: queries per request {old['queries_per_request']:.2f} -> {result['queries_per_request']:.2f}"
+            )
+        if result.get('failed_games', 0) > old.get('failed_games', float('inf')):
+            regressions.append(f"{result['name']}: failed games {old['failed_games']} -> {result['failed_games']}")
+    return regressions
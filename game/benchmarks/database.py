@@ -0,0 +1,88 @@
+"""Throwaway databases and synthetic rosters for benchmarks that hit the ORM."""
+import os
+import tempfile
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from ..catalog import bump_catalog_version
+from ..models import LEAGUE_ATTRIBUTE_FIELDS, Player, PlayerAttributes, Team
+
+
+@contextmanager
+def benchmark_database(on_disk=False):
+    """Run the block against a fresh test database, never the real one.
+
+    SQLite test databases live in memory by default; pass on_disk=True when
+    several threads write concurrently, as shared-cache memory databases lock
+    whole tables.
+    """
+    test_settings = connection.settings_dict['TEST']
+    old_test_name = test_settings['NAME']
+    if on_disk:
+        test_settings['NAME'] = os.path.join(tempfile.mkdtemp(prefix='nba-benchmark-'), 'db.sqlite3')
+    try:
+        setup_test_environment()
+        own_environment = True
+    except RuntimeError:
+        # Already inside a test run
+        own_environment = False
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings['NAME'] = old_test_name
+        if own_environment:
+            teardown_test_environment()
+
+
+def create_rosters(num_teams=30, players_per_team=20):
+    """Create teams with distinct players, bulk-inserted."""
+    positions = ['PG', 'SG', 'SF', 'PF', 'C']
+    Membership = Player.teams.through
+    teams = Team.objects.bulk_create(
+        Team(name=f"Benchmark Team {i}", abbreviation=f"{i:03d}") for i in range(num_teams)
+    )
+    players = Player.objects.bulk_create(
+        Player(player_id=f"bench{i}", name=f"Benchmark Player {i}", position=positions[i % len(positions)])
+        for i in range(num_teams * players_per_team)
+    )
+    Membership.objects.bulk_create(
+        Membership(team_id=teams[i // players_per_team].id, player_id=player.id)
+        for i, player in enumerate(players)
+    )
+    bump_catalog_version()
+    return teams, players
+
+
+def create_league_rosters(league):
+    """Create one team per league.json team with its players and their stored ratings."""
+    positions = ['PG', 'SG', 'SF', 'PF', 'C']
+    Membership = Player.teams.through
+    names = sorted({player['team'] for player in league.players if player.get('team')})
+    teams = Team.objects.bulk_create(
+        Team(name=name, abbreviation=f"{i:03d}") for i, name in enumerate(names)
+    )
+    team_ids = {team.name: team.id for team in teams}
+    rows = [player for player in league.players if player.get('team') in team_ids]
+    players = Player.objects.bulk_create(
+        Player(player_id=f"league{i}", name=row['name'], position=positions[i % len(positions)])
+        for i, row in enumerate(rows)
+    )
+    Membership.objects.bulk_create(
+        Membership(team_id=team_ids[row['team']], player_id=player.id)
+        for row, player in zip(rows, players)
+    )
+    PlayerAttributes.objects.bulk_create(
+        PlayerAttributes(
+            player_id=player.id,
+            league_name=row['name'],
+            **{field: row.get(key, 0) for key, field in LEAGUE_ATTRIBUTE_FIELDS},
+        )
+        for row, player in zip(rows, players)
+    )
+    bump_catalog_version()
+    return teams, players
@@ -0,0 +1,134 @@
+"""Draft throughput per game state backend, with many games running concurrently.
+
+Each draft is a new game followed by five rounds of picks; every pick is a
+wheel page load plus the pick itself. state_bytes is the stored size of a
+finished game. The "session_db" case replays what the
+database session engine with SESSION_SAVE_EVERY_REQUEST did for those steps.
+"""
+import statistics
+import threading
+import time
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.db import OperationalError, connections
+
+from ..encoding import dumps
+from ..resp import RespServer
+from ..state import POSITIONS, CachedDBGameStateBackend, GameState, LocalGameStateBackend, RedisGameStateBackend
+from .database import benchmark_database
+from .timing import speedup
+
+NUM_PLAYERS = 2
+
+
+def legacy_state():
+    """The pre-GameState dict, as the session used to store it."""
+    state = {'current_player': 1, 'turn': 1, 'num_players': NUM_PLAYERS}
+    for i in range(1, NUM_PLAYERS + 1):
+        state[f'player_{i}_team'] = []
+    return state
+
+
+def legacy_pick(state, n):
+    position = POSITIONS[state['turn'] - 1]
+    state[f"player_{state['current_player']}_team"].append({'id': n, 'name': f"Benchmark Player {n}", 'position': position})
+    if state['current_player'] < state['num_players']:
+        state['current_player'] += 1
+    else:
+        state['current_player'] = 1
+        state['turn'] += 1
+
+
+def session_db_draft(_backend, game_no):
+    session = SessionStore()
+    session['game_state'] = legacy_state()
+    session.save()
+    key = session.session_key
+    n = 0
+    while True:
+        for step in ('wheel', 'pick'):
+            session = SessionStore(session_key=key)
+            state = session['game_state']
+            if step == 'pick':
+                legacy_pick(state, n)
+                n += 1
+                session['game_state'] = state
+            session.save()
+        if state['turn'] > 5:
+            return state
+
+
+def backend_draft(backend, game_no):
+    game_id = f"bench-{threading.get_ident()}-{game_no}"
+    # The revision rides in the session cookie, as save_game_state() keeps it
+    revision = backend.save(game_id, GameState(NUM_PLAYERS).to_dict())
+    n = 0
+    while True:
+        backend.load(game_id, revision)  # wheel
+        state = GameState.from_dict(backend.load(game_id, revision))
+        state.pick(n, POSITIONS[state.turn - 1])
+        n += 1
+        revision = backend.save(game_id, state.to_dict())
+        if state.is_over:
+            return state.to_dict()
+
+
+def run_drafts(draft, backend, games, threads):
+    """Play `games` drafts across `threads` threads; return (seconds, failed drafts)."""
+    failures = []
+
+    def worker(offset):
+        try:
+            for game_no in range(offset, games, threads):
+                try:
+                    draft(backend, game_no)
+                except OperationalError:
+                    # "database is locked": the writer contention being measured
+                    failures.append(game_no)
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start, len(failures)
+
+
+def run(options):
+    games = options.get('games', 200)
+    repeat = options.get('repeat', 5)
+    results = []
+    server = RespServer().start()
+    try:
+        with benchmark_database(on_disk=True):
+            cases = [
+                ('session_db', session_db_draft, None),
+                ('local', backend_draft, LocalGameStateBackend()),
+                ('cached_db', backend_draft, CachedDBGameStateBackend()),
+                ('redis', backend_draft, RedisGameStateBackend(port=server.port)),
+            ]
+            for threads in options.get('thread_counts', (1, 8)):
+                baseline = None
+                for name, draft, backend in cases:
+                    outcomes = [run_drafts(draft, backend, games, threads) for _ in range(repeat)]
+                    runs = [elapsed for elapsed, _failed in outcomes]
+                    results.append({
+                        'name': f"drafts.{name}.threads{threads}",
+                        'number': games,
+                        'repeat': repeat,
+                        'best_us': min(runs) / games * 1e6,
+                        'median_us': statistics.median(runs) / games * 1e6,
+                        'drafts_per_sec': games / min(runs),
+                        'failed_drafts': sum(failed for _elapsed, failed in outcomes),
+                        'state_bytes': len(dumps(draft(backend, games))),
+                    })
+                    if baseline is None:
+                        baseline = results[-1]
+                    else:
+                        results[-1]['speedup'] = speedup(baseline, results[-1])
+    finally:
+        server.stop()
+    return results
@@ -0,0 +1,145 @@
+"""Full draft games end to end, with several clients playing at once.
+
+A game is new_game, then for every pick the wheel page, /api/teams/, one
+/api/teams/<id>/ and select_player_action, and finally game_over. Each
+request is timed and its queries counted; results are reported per endpoint
+and for all requests together, for every player count and concurrency level.
+"""
+import json
+import math
+import random
+import threading
+import time
+
+from django.db import OperationalError, connection, connections
+from django.test import Client
+from django.urls import reverse
+
+from ..league import get_league_store
+from ..state import POSITIONS, ROUNDS
+from .database import benchmark_database, create_league_rosters
+
+ENDPOINTS = ('new_game', 'wheel', 'team-list', 'team-detail', 'select_player_action', 'game_over')
+
+
+class LoadError(Exception):
+    """A request in a benchmark game did not succeed."""
+
+
+class LoadClient:
+    """A test client that records (seconds, queries) for every request by endpoint."""
+
+    def __init__(self):
+        self.client = Client()
+        self.samples = {endpoint: [] for endpoint in ENDPOINTS}
+
+    def request(self, endpoint, method, path, **kwargs):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(count):
+            response = getattr(self.client, method)(path, **kwargs)
+        self.samples[endpoint].append((time.perf_counter() - start, queries))
+        if response.status_code >= 400:
+            raise LoadError(f"{endpoint} returned {response.status_code}")
+        return response
+
+
+def play_game(client, num_players, rng):
+    """Draft a full game of num_players seats the way the wheel page does."""
+    client.request('new_game', 'post', reverse('new_game'), data={'num_players': num_players})
+    drafted = set()
+    for position in POSITIONS[:ROUNDS]:
+        for _seat in range(num_players):
+            client.request('wheel', 'get', reverse('wheel'))
+            teams = client.request('team-list', 'get', reverse('team-list')).json()
+            available = []
+            while not available:
+                team = rng.choice(teams)
+                roster = client.request('team-detail', 'get', reverse('team-detail', args=[team['id']])).json()
+                available = [player for player in roster['players'] if player['id'] not in drafted]
+            player = rng.choice(available)
+            client.request(
+                'select_player_action', 'post', reverse('select_player_action'),
+                data=json.dumps({'player_id': player['id'], 'position': position}),
+                content_type='application/json',
+            )
+            drafted.add(player['id'])
+    client.request('game_over', 'get', reverse('game_over'))
+
+
+def run_games(num_players, games, threads, seed=0):
+    """Play `games` games across `threads` clients; return (seconds, samples, failed games)."""
+    clients = [LoadClient() for _ in range(threads)]
+    failures = []
+
+    def worker(offset):
+        rng = random.Random(seed + offset)
+        try:
+            for game_no in range(offset, games, threads):
+                try:
+                    play_game(clients[offset], num_players, rng)
+                except (LoadError, OperationalError):
+                    failures.append(game_no)
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    samples = {endpoint: [] for endpoint in ENDPOINTS}
+    for client in clients:
+        for endpoint, timings in client.samples.items():
+            samples[endpoint].extend(timings)
+    return elapsed, samples, len(failures)
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(name, samples, elapsed, **extra):
+    latencies = sorted(seconds * 1e6 for seconds, _queries in samples)
+    result = {
+        'name': name,
+        'number': len(samples),
+        'repeat': 1,
+        'best_us': latencies[0],
+        'median_us': percentile(latencies, 50),
+        'p50_us': percentile(latencies, 50),
+        'p95_us': percentile(latencies, 95),
+        'p99_us': percentile(latencies, 99),
+        'requests_per_sec': len(samples) / elapsed,
+        'queries_per_request': sum(queries for _seconds, queries in samples) / len(samples),
+    }
+    result.update(extra)
+    return result
+
+
+def run(options):
+    games = options.get('games', 20)
+    results = []
+    with benchmark_database(on_disk=True):
+        create_league_rosters(get_league_store().get())
+        for num_players in options.get('num_players', (2, 4)):
+            for threads in options.get('concurrency', (1, 4)):
+                elapsed, samples, failed = run_games(num_players, games, threads)
+                prefix = f"load.players{num_players}.threads{threads}"
+                extra = {'games': games, 'failed_games': failed}
+                for endpoint in ENDPOINTS:
+                    if samples[endpoint]:
+                        results.append(summarize(f"{prefix}.{endpoint}", samples[endpoint], elapsed, **extra))
+                everything = [sample for endpoint in ENDPOINTS for sample in samples[endpoint]]
+                results.append(summarize(f"{prefix}.all", everything, elapsed, **extra))
+    return results
@@ -0,0 +1,62 @@
+"""Player name lookup: PlayerIndex against the original linear scans."""
+from ..league import LeagueData, get_league_store
+from .timing import measure, speedup
+
+
+def linear_player_lookup(player_name, league_data):
+    """The pre-index get_player_league_data, kept as the benchmark baseline."""
+    normalized_name = player_name.strip().lower()
+
+    for player_data in league_data:
+        if player_data.get('name', '').strip().lower() == normalized_name:
+            return player_data
+
+    for player_data in league_data:
+        league_name = player_data.get('name', '').strip().lower()
+        if normalized_name in league_name or league_name in normalized_name:
+            return player_data
+
+    return None
+
+
+def build_queries(players):
+    """Exact names, names with a suffix, bare surnames and unknown names."""
+    names = [player['name'] for player in players]
+    return {
+        'exact': names,
+        'suffixed': [f"{name} Jr." for name in names],
+        'surname': [name.split()[-1] for name in names if ' ' in name],
+        'unknown': [f"Unknown Prospect {i}" for i in range(len(names))],
+    }
+
+
+def run(options):
+    league = options.get('league') or get_league_store().get()
+    if not isinstance(league, LeagueData):
+        league = LeagueData(league)
+    players = league.players
+    league.index  # build outside the timed region
+
+    results = []
+    for kind, queries in build_queries(players).items():
+        for query in queries:
+            expected = linear_player_lookup(query, players)
+            if league.find(query) is not expected:
+                raise AssertionError(f"PlayerIndex disagrees with the linear scan for {query!r}")
+
+        number = max(1, options.get('number', 5))
+        baseline = measure(
+            f"lookup.{kind}.linear",
+            lambda: [linear_player_lookup(query, players) for query in queries],
+            number=number, repeat=options.get('repeat', 5),
+            lookups=len(queries), players=len(players),
+        )
+        indexed = measure(
+            f"lookup.{kind}.indexed",
+            lambda: [league.find(query) for query in queries],
+            number=number, repeat=options.get('repeat', 5),
+            lookups=len(queries), players=len(players),
+        )
+        indexed['speedup'] = speedup(baseline, indexed)
+        results.extend([baseline, indexed])
+    return results
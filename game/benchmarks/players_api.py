@@ -0,0 +1,44 @@
+"""/api/players/: the values_list() fast path against PlayerSerializer."""
+from django.test import Client
+from rest_framework.renderers import JSONRenderer
+
+from ..encoding import dumps
+from ..models import Player
+from ..serializers import PlayerSerializer, PlayerValuesSerializer
+from .database import benchmark_database, create_rosters
+from .timing import measure, speedup
+
+
+def run(options):
+    results = []
+    for num_players in options.get('player_counts', (1000, 5000)):
+        with benchmark_database():
+            create_rosters(num_teams=50, players_per_team=num_players // 50)
+            client = Client()
+            timing = {'number': options.get('number', 5), 'repeat': options.get('repeat', 5), 'rows': num_players}
+
+            baseline = measure(
+                f"players{num_players}.model_serializer",
+                lambda: JSONRenderer().render(PlayerSerializer(Player.objects.all(), many=True).data),
+                **timing,
+            )
+            fast = measure(
+                f"players{num_players}.values",
+                lambda: dumps(PlayerValuesSerializer().rows(Player.objects.order_by('id'))),
+                **timing,
+            )
+            fast['speedup'] = speedup(baseline, fast)
+            request = measure(
+                f"players{num_players}.request",
+                lambda: client.get('/api/players/'),
+                **timing,
+            )
+            page = measure(
+                f"players{num_players}.request_page100",
+                lambda: client.get('/api/players/?limit=100&fields=id,name'),
+                **dict(timing, rows=100),
+            )
+            for result in (baseline, fast, request, page):
+                result['rows_per_sec'] = result['rows'] / (result['best_us'] / 1e6)
+            results.extend([baseline, fast, request, page])
+    return results
@@ -0,0 +1,103 @@
+"""Scoring and lookup primitives on synthetic leagues of growing size.
+
+Leagues of 500, 5k and 50k players are generated with league.json's
+attribute columns and names recombined from its first names and surnames,
+then calculate_comprehensive_team_scores, determine_winner_comprehensive,
+get_player_league_data and get_all_drafted_player_ids are timed for 2 to 16
+teams. The one-off PlayerIndex and AttributeMatrix builds are timed too, as
+they are what a larger league costs a worker on reload. Use --json for
+machine-readable output.
+"""
+import logging
+import random
+from contextlib import contextmanager
+
+from ..league import LeagueData, PlayerIndex, get_league_store
+from ..scoring import AttributeMatrix
+from ..state import GameState
+from ..views import (
+    calculate_comprehensive_team_scores,
+    determine_winner_comprehensive,
+    get_all_drafted_player_ids,
+    get_player_league_data,
+)
+from .scoring import random_teams
+from .timing import measure
+
+LEAGUE_SIZES = (500, 5000, 50000)
+TEAM_COUNTS = (2, 4, 8, 16)
+
+
+def synthetic_league(size, template=None, seed=0):
+    """A LeagueData of `size` players with unique names and random ratings."""
+    rng = random.Random(seed)
+    template = template or get_league_store().get().players
+    attributes = [key for key in template[0] if key not in ('name', 'team')] if template else ['overallAttribute']
+    names = [player['name'].split(' ', 1) for player in template if ' ' in player['name']]
+    first_names = sorted({first for first, _last in names}) or ['Player']
+    surnames = sorted({last for _first, last in names}) or ['Synthetic']
+    teams = sorted({player.get('team', '') for player in template} - {''}) or ['Synthetic Team']
+
+    players = []
+    seen = set()
+    while len(players) < size:
+        name = f"{rng.choice(first_names)} {rng.choice(surnames)}"
+        if name in seen:
+            # Every pair is taken often enough at 50k; number the repeats
+            name = f"{name} {len(players)}"
+        seen.add(name)
+        player = {'name': name, 'team': rng.choice(teams)}
+        player.update((attr, rng.randint(25, 99)) for attr in attributes)
+        players.append(player)
+    return LeagueData(players, version=f"synthetic-{size}-{seed}")
+
+
+def drafted_state(teams):
+    state = GameState(len(teams))
+    for picks in zip(*(team['roster'] for team in teams)):
+        for player in picks:
+            state.pick(player['id'], player['position'])
+    return state
+
+
+@contextmanager
+def quiet_scoring_logs():
+    """Keep per-call info logging off the terminal; the messages are still formatted."""
+    logger = logging.getLogger('game.views')
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
+
+
+def run(options):
+    number = options.get('number', 5)
+    repeat = options.get('repeat', 5)
+    results = []
+    with quiet_scoring_logs():
+        for size in options.get('league_sizes', LEAGUE_SIZES):
+            league = synthetic_league(size)
+            prefix = f"primitives.players{size}"
+            results.append(measure(f"{prefix}.index_build", lambda: PlayerIndex(league.players), number=1, repeat=repeat, players=size))
+            results.append(measure(f"{prefix}.matrix_build", lambda: AttributeMatrix(league.players), number=1, repeat=repeat, players=size))
+            league.index
+            league.attribute_matrix
+
+            for num_teams in options.get('team_counts', TEAM_COUNTS):
+                teams = random_teams(league.players, num_teams, seed=num_teams)
+                names = [player['name'] for team in teams for player in team['roster']]
+                state = drafted_state(teams)
+                extra = {'number': number, 'repeat': repeat, 'players': size, 'teams': num_teams}
+                results.extend([
+                    measure(f"{prefix}.teams{num_teams}.team_scores", lambda: calculate_comprehensive_team_scores(teams, league), **extra),
+                    measure(f"{prefix}.teams{num_teams}.winner", lambda: determine_winner_comprehensive(teams, league), **extra),
+                    measure(
+                        f"{prefix}.teams{num_teams}.player_lookup",
+                        lambda: [get_player_league_data(name, league) for name in names],
+                        lookups=len(names), **extra,
+                    ),
+                    measure(f"{prefix}.teams{num_teams}.drafted_ids", lambda: get_all_drafted_player_ids(state), **extra),
+                ])
+    return results
@@ -0,0 +1,86 @@
+"""game_over.html rendering for 2-, 3- and 4-player games.
+
+"legacy" renders the results section the way it was written before scores
+were summarized in the view, running count_won/get_item filters per team
+per attribute. "summarized" renders the current partial, and "page" and
+"page_cached" time the whole page without and with its fragment cache.
+"""
+from django.core.cache import caches
+from django.template import engines
+from django.template.loader import get_template
+
+from ..league import get_league_store
+from ..views import determine_winner_comprehensive, summarize_scores
+from .scoring import random_teams
+from .timing import measure, speedup
+
+LEGACY_RESULTS = """{% load game_tags %}
+{% for team in teams_display_data %}
+<div class="team">
+    <div class="score-item won">Won: {{ team.score_details|count_won }}</div>
+    <div class="score-item lost">Lost: {{ team.score_details|count_lost }}</div>
+    <div class="score-item tied">Tied: {{ team.score_details|count_tied }}</div>
+    {% for player in team.roster %}<li><strong>{{ player.name }}</strong> ({{ player.position }})</li>{% endfor %}
+    {% for attr_name, attr_data in team.score_details.items %}
+        {% if attr_data.won == True and forloop.counter <= 5 %}
+            <strong>{{ attr_name|replace_underscores }}:</strong> {{ attr_data.value }}
+        {% endif %}
+    {% endfor %}
+</div>
+{% endfor %}
+{% for attr_name in all_attributes %}
+    {% for team in teams_display_data %}
+        {% if forloop.first %}
+            <div class="attribute-name">{{ attr_name|replace_underscores }}</div>
+            {% for team_data in teams_display_data %}
+                {% with team_data.score_details|get_item:attr_name as attr_data %}
+                    <span>{{ attr_data.value|default:"0" }}</span>
+                    {% if attr_data.won == True %}✓{% elif attr_data.won == False %}✗{% else %}={% endif %}
+                {% endwith %}
+            {% endfor %}
+        {% endif %}
+    {% endfor %}
+{% endfor %}
+"""
+
+
+def game_over_context(league, num_teams):
+    teams = random_teams(league.players, num_teams)
+    winner, team_scores, all_attributes = determine_winner_comprehensive(teams, league)
+    attribute_rows = summarize_scores(teams, team_scores, all_attributes, winner)
+    return {
+        'winner': winner,
+        'teams_display_data': teams,
+        'all_attributes': all_attributes,
+        'attribute_rows': attribute_rows,
+        'team_scores': team_scores,
+        'total_attributes': len(all_attributes),
+        'fragment_key': None,
+    }
+
+
+def run(options):
+    league = get_league_store().get()
+    legacy = engines['django'].from_string(LEGACY_RESULTS)
+    partial = get_template('game/partials/game_over_results.html')
+    page = get_template('game/game_over.html')
+    timing = {'number': options.get('number', 5), 'repeat': options.get('repeat', 5)}
+
+    results = []
+    for num_teams in options.get('team_counts', (2, 3, 4)):
+        context = game_over_context(league, num_teams)
+        extra = dict(timing, teams=num_teams, attributes=context['total_attributes'])
+
+        baseline = measure(f"render.teams{num_teams}.legacy", lambda: legacy.render(context), **extra)
+        summarized = measure(f"render.teams{num_teams}.summarized", lambda: partial.render(context), **extra)
+        summarized['speedup'] = speedup(baseline, summarized)
+        full = measure(f"render.teams{num_teams}.page", lambda: page.render(context), **extra)
+
+        cached_context = dict(context, fragment_key=f"benchmark-{num_teams}")
+        caches['scoring'].clear()
+        page.render(cached_context)
+        cached = measure(f"render.teams{num_teams}.page_cached", lambda: page.render(cached_context), **extra)
+        cached['speedup'] = speedup(full, cached)
+        results.extend([baseline, summarized, full, cached])
+    caches['scoring'].clear()
+    return results
@@ -0,0 +1,113 @@
+"""Team scoring: the NumPy backend against the original dict-based loops."""
+import random
+
+from ..league import LeagueData, get_league_store
+from ..state import POSITIONS
+from ..views import calculate_comprehensive_team_scores
+from .lookup import linear_player_lookup
+from .timing import measure, speedup
+
+
+def legacy_team_scores(teams_display_data, league_data):
+    """The pre-matrix calculate_comprehensive_team_scores, kept as the baseline."""
+    sample_player = league_data[0] if league_data else {}
+    all_attributes = [key for key in sample_player.keys() if key not in ['name', 'team']]
+
+    team_scores = {}
+    team_attribute_totals = {}
+
+    for team in teams_display_data:
+        player_num = team['player_num']
+        team_scores[player_num] = {'total_attributes_won': 0, 'details': {}}
+        team_attribute_totals[player_num] = {attr: 0 for attr in all_attributes}
+
+        for player in team['roster']:
+            player_data = linear_player_lookup(player['name'], league_data)
+            if player_data:
+                for attr in all_attributes:
+                    value = player_data.get(attr, 0)
+                    if isinstance(value, (int, float)):
+                        team_attribute_totals[player_num][attr] += value
+
+    for attr in all_attributes:
+        max_value = -1
+        winning_teams = []
+
+        for player_num in team_attribute_totals:
+            attr_total = team_attribute_totals[player_num][attr]
+            if attr_total > max_value:
+                max_value = attr_total
+                winning_teams = [player_num]
+            elif attr_total == max_value and attr_total > 0:
+                winning_teams.append(player_num)
+
+        if len(winning_teams) == 1:
+            winning_team = winning_teams[0]
+            team_scores[winning_team]['total_attributes_won'] += 1
+            team_scores[winning_team]['details'][attr] = {
+                'won': True,
+                'value': team_attribute_totals[winning_team][attr],
+                'vs_others': {str(pn): team_attribute_totals[pn][attr] for pn in team_attribute_totals if pn != winning_team}
+            }
+            for other_team in team_attribute_totals:
+                if other_team != winning_team:
+                    team_scores[other_team]['details'][attr] = {
+                        'won': False,
+                        'value': team_attribute_totals[other_team][attr],
+                        'vs_others': {str(winning_team): team_attribute_totals[winning_team][attr]}
+                    }
+        else:
+            for player_num in team_attribute_totals:
+                team_scores[player_num]['details'][attr] = {
+                    'won': None,
+                    'value': team_attribute_totals[player_num][attr],
+                    'vs_others': {str(pn): team_attribute_totals[pn][attr] for pn in team_attribute_totals if pn != player_num}
+                }
+
+    return team_scores, all_attributes
+
+
+def random_teams(players, num_teams, roster_size=5, seed=0):
+    """Draft distinct players into num_teams rosters the way game_state stores them."""
+    rng = random.Random(seed)
+    drafted = rng.sample(range(len(players)), num_teams * roster_size)
+    return [
+        {
+            'player_num': seat + 1,
+            'roster': [
+                {'id': row, 'name': players[row]['name'], 'position': POSITIONS[pick % len(POSITIONS)]}
+                for pick, row in enumerate(drafted[seat * roster_size:(seat + 1) * roster_size])
+            ],
+        }
+        for seat in range(num_teams)
+    ]
+
+
+def run(options):
+    league = options.get('league') or get_league_store().get()
+    if not isinstance(league, LeagueData):
+        league = LeagueData(league)
+    league.index
+    league.attribute_matrix
+
+    results = []
+    for num_teams in options.get('team_counts', (2, 3, 4)):
+        teams = random_teams(league.players, num_teams)
+        if calculate_comprehensive_team_scores(teams, league) != legacy_team_scores(teams, league.players):
+            raise AssertionError(f"Matrix scoring disagrees with the legacy loops for {num_teams} teams")
+
+        baseline = measure(
+            f"scoring.teams{num_teams}.legacy",
+            lambda: legacy_team_scores(teams, league.players),
+            number=options.get('number', 5), repeat=options.get('repeat', 5),
+            teams=num_teams, players=len(league),
+        )
+        matrix = measure(
+            f"scoring.teams{num_teams}.matrix",
+            lambda: calculate_comprehensive_team_scores(teams, league),
+            number=options.get('number', 5), repeat=options.get('repeat', 5),
+            teams=num_teams, players=len(league),
+        )
+        matrix['speedup'] = speedup(baseline, matrix)
+        results.extend([baseline, matrix])
+    return results
@@ -0,0 +1,70 @@
+"""Concurrent drafts against SQLite: Django's stock setup against the tuned profile.
+
+Full games from the load suite are played with database sessions saved on
+every request and the cached_db game state backend, so every request writes
+and concurrent clients contend for SQLite's single writer. "stock" is the
+plain sqlite3 backend's behaviour: rollback journal, deferred transactions
+and a new connection per request. "tuned" is settings.DATABASES as shipped:
+WAL, synchronous=NORMAL, busy_timeout, cache and mmap pragmas, IMMEDIATE
+transactions and persistent connections. Each profile gets its own fresh
+database file, as the journal mode is stored in it.
+"""
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import override_settings
+
+from ..league import get_league_store
+from .database import benchmark_database, create_league_rosters
+from .load import ENDPOINTS, run_games, summarize
+
+PROFILES = {
+    'stock': {
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {
+            'pragmas': {'busy_timeout': None, 'journal_mode': 'DELETE', 'synchronous': 'FULL', 'cache_size': None, 'mmap_size': None, 'temp_store': None},
+            'optimize_interval': None,
+        },
+    },
+    'tuned': {},
+}
+
+# Every request writes: the session row and the game state
+WRITE_HEAVY = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'SESSION_SAVE_EVERY_REQUEST': True,
+    'GAME_STATE': {'BACKEND': 'game.state.CachedDBGameStateBackend', 'OPTIONS': {}},
+}
+
+
+@contextmanager
+def database_profile(profile):
+    """Apply a profile's DATABASES entries for every connection opened inside the block."""
+    settings_dict = connection.settings_dict
+    saved = {key: settings_dict[key] for key in profile}
+    connection.close()
+    settings_dict.update(profile)
+    try:
+        yield
+    finally:
+        connection.close()
+        settings_dict.update(saved)
+
+
+def run(options):
+    games = options.get('games', 40)
+    results = []
+    for threads in options.get('concurrency', (1, 8)):
+        baseline = None
+        for name, profile in PROFILES.items():
+            with database_profile(profile), benchmark_database(on_disk=True), override_settings(**WRITE_HEAVY):
+                create_league_rosters(get_league_store().get())
+                elapsed, samples, failed = run_games(options.get('num_players', (2,))[0], games, threads)
+            everything = [sample for endpoint in ENDPOINTS for sample in samples[endpoint]]
+            result = summarize(f"sqlite.{name}.threads{threads}", everything, elapsed, games=games, failed_games=failed)
+            if baseline is None:
+                baseline = result
+            else:
+                result['speedup'] = result['requests_per_sec'] / baseline['requests_per_sec']
+            results.append(result)
+    return results
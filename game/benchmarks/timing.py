@@ -0,0 +1,22 @@
+import statistics
+import timeit
+
+
+def measure(name, func, number=100, repeat=5, **extra):
+    """Time func and return a result dict with per-call figures in microseconds."""
+    timer = timeit.Timer(func)
+    runs = [total / number * 1e6 for total in timer.repeat(repeat=repeat, number=number)]
+    result = {
+        'name': name,
+        'number': number,
+        'repeat': repeat,
+        'best_us': min(runs),
+        'median_us': statistics.median(runs),
+    }
+    result.update(extra)
+    return result
+
+
+def speedup(baseline, candidate):
+    """Ratio of the baseline's best time to the candidate's."""
+    return baseline['best_us'] / candidate['best_us'] if candidate['best_us'] else float('inf')
@@ -0,0 +1,166 @@
+"""Process-wide, read-only snapshot of teams, players and team memberships.
+
+The tables only change when an importer or an admin edit touches them, so each
+worker keeps them in memory and answers pick validation, name lookups and the
+team detail API without a query. Any change replaces the CatalogVersion token:
+model signals do it for ordinary saves, and bulk writers (which skip signals)
+call bump_catalog_version(). Per-row importers run inside
+muted_catalog_signals(), so their saves move the token once, at the end.
+Workers compare their token with the database at most once every
+settings.CATALOG_CHECK_INTERVAL seconds. PlayerAttributes changes move the
+token too, as cached game results are keyed by it.
+"""
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+from .models import CatalogVersion, Player, Team
+
+logger = logging.getLogger(__name__)
+
+
+class Catalog:
+    """Teams and players as tuples indexed by id; immutable once built."""
+
+    __slots__ = ('token', 'updated_at', 'players', 'player_index', 'teams', 'team_index', 'team_members')
+
+    def __init__(self, token, players, teams, memberships, updated_at=None):
+        self.token = token
+        self.updated_at = updated_at
+        # (id, name, position) rows and id -> row position
+        self.players = tuple(players)
+        self.player_index = {row[0]: i for i, row in enumerate(self.players)}
+        # (id, name, abbreviation) rows and id -> row position
+        self.teams = tuple(teams)
+        self.team_index = {row[0]: i for i, row in enumerate(self.teams)}
+        members = {}
+        for team_id, player_id in memberships:
+            # The three queries are not one snapshot; an import may have added or deleted players in between
+            if player_id in self.player_index:
+                members.setdefault(team_id, []).append(self.player_index[player_id])
+        self.team_members = {team_id: tuple(rows) for team_id, rows in members.items()}
+
+    @classmethod
+    def load(cls, token, updated_at=None):
+        return cls(
+            token,
+            Player.objects.order_by('id').values_list('id', 'name', 'position'),
+            Team.objects.order_by('id').values_list('id', 'name', 'abbreviation'),
+            Player.teams.through.objects.order_by('team_id', 'player_id').values_list('team_id', 'player_id'),
+            updated_at,
+        )
+
+    def player_names(self, ids):
+        """Map player ids to names; ids with no player are left out."""
+        index, players = self.player_index, self.players
+        return {player_id: players[index[player_id]][1] for player_id in ids if player_id in index}
+
+    def team(self, team_id):
+        """Team detail as TeamSerializer renders it, or None."""
+        if team_id not in self.team_index:
+            return None
+        team_id, name, abbreviation = self.teams[self.team_index[team_id]]
+        return {
+            'id': team_id,
+            'name': name,
+            'abbreviation': abbreviation,
+            'players': [
+                {'id': player_id, 'name': player_name, 'position': position}
+                for player_id, player_name, position in (self.players[i] for i in self.team_members.get(team_id, ()))
+            ],
+        }
+
+    def __len__(self):
+        return len(self.players)
+
+
+_catalog = None
+_checked_at = 0.0
+_stale = True
+_lock = threading.Lock()
+# pending is None unless model signals are muted, then whether a change was seen
+_muted = threading.local()
+
+
+def current_version():
+    """Return (token, updated_at) of the last recorded change, or ('', None)."""
+    return CatalogVersion.objects.filter(pk=1).values_list('token', 'updated_at').first() or ('', None)
+
+
+def get_catalog():
+    """Return this process's catalog, reloading it if the database token moved on."""
+    global _catalog, _checked_at, _stale
+    now = time.monotonic()
+    if not _stale and now - _checked_at < settings.CATALOG_CHECK_INTERVAL:
+        return _catalog
+    with _lock:
+        if _stale or now - _checked_at >= settings.CATALOG_CHECK_INTERVAL:
+            # Cleared before reading the token so a bump racing this load marks it stale again
+            _stale = False
+            try:
+                token, updated_at = current_version()
+                if _catalog is None or _catalog.token != token:
+                    _catalog = Catalog.load(token, updated_at)
+                    logger.info(f"Loaded catalog of {len(_catalog)} players and {len(_catalog.teams)} teams")
+            except DatabaseError:
+                _stale = True
+                raise
+            _checked_at = now
+    return _catalog
+
+
+def warm_catalog():
+    """Load the catalog at worker start; a missing or unmigrated database is not fatal."""
+    try:
+        get_catalog()
+    except DatabaseError as e:
+        logger.warning(f"Catalog not loaded at startup: {e}")
+
+
+def invalidate_catalog():
+    """Make this process re-check the token on its next catalog read."""
+    global _stale
+    _stale = True
+
+
+def bump_catalog_version():
+    """Record a change to teams, players or memberships for every worker."""
+    token = uuid.uuid4().hex
+    if not CatalogVersion.objects.filter(pk=1).update(token=token, updated_at=timezone.now()):
+        CatalogVersion.objects.create(pk=1, token=token)
+    invalidate_catalog()
+
+
+def catalog_changed():
+    """Called by model signals: bump the token now, or once muted_catalog_signals() ends."""
+    if getattr(_muted, 'pending', None) is None:
+        bump_catalog_version()
+    else:
+        _muted.pending = True
+
+
+@contextmanager
+def muted_catalog_signals():
+    """Collapse the token bumps of every save in the block into one at its end."""
+    if getattr(_muted, 'pending', None) is not None:
+        yield
+        return
+    _muted.pending = False
+    try:
+        yield
+    finally:
+        # Rows saved before an error are committed too
+        changed, _muted.pending = _muted.pending, None
+        if changed:
+            bump_catalog_version()
+
+
+def player_names(ids):
+    """Map player ids to names; ids with no player are left out."""
+    return get_catalog().player_names(ids)
@@ -0,0 +1,74 @@
+"""Conditional GET and Cache-Control for the read-only game API."""
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .catalog import get_catalog
+
+
+class NotModified(Exception):
+    """Carries the 304 (or 412) response for a request whose validators matched."""
+
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """Validate GET/HEAD requests against the catalog version before doing any work.
+
+    Every Team/Player change, including each import, moves the catalog
+    token, so an ETag derived from it and the request URL stays valid until
+    the data changes. Validators are checked after DRF's authentication and
+    permission checks; a match is answered with 304 without running the
+    handler. Requests for an object that resource_exists() rules out skip
+    validation, so they still get their 404. Cache-Control comes from
+    settings.API_CACHE_CONTROL, keyed by route name (e.g. 'player-list')
+    with a 'default' fallback.
+    """
+
+    def resource_exists(self, request):
+        """Whether the requested object exists, answered without a query where possible."""
+        return True
+
+    def get_etag(self, request):
+        digest = hashlib.sha1(f"{get_catalog().token}|{request.get_full_path()}".encode()).hexdigest()
+        return f'"{digest[:32]}"'
+
+    def get_last_modified(self, request):
+        updated_at = get_catalog().updated_at
+        # Whole seconds, as Last-Modified and If-Modified-Since carry no more
+        return int(updated_at.timestamp()) if updated_at else None
+
+    def get_cache_control(self):
+        options = settings.API_CACHE_CONTROL
+        return options.get(f"{self.basename}-{self.action}", options.get('default', {}))
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.conditional_validators = None
+        if request.method in ('GET', 'HEAD') and self.resource_exists(request):
+            self.conditional_validators = (self.get_etag(request), self.get_last_modified(request))
+            etag, last_modified = self.conditional_validators
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is not None:
+                # Raised so dispatch() skips the handler; handle_exception() returns the response
+                raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'conditional_validators', None) and response.status_code in (200, 304):
+            etag, last_modified = self.conditional_validators
+            if etag and not response.has_header('ETag'):
+                response['ETag'] = etag
+            if last_modified is not None and not response.has_header('Last-Modified'):
+                response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, **self.get_cache_control())
+        return response
@@ -0,0 +1,69 @@
+"""Fast JSON encoding for hot API paths, and precompression for served files.
+
+orjson and brotli are used when they are installed.
+"""
+import gzip
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# File name suffix of each precompressed variant
+ENCODING_SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def dumps(data):
+    """Encode data as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return _encoder.encode(data).encode('utf-8')
+
+
+def compress(body):
+    """Return {content_encoding: bytes} for every encoding available here."""
+    encoded = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded['br'] = brotli.compress(body, quality=11)
+    return encoded
+
+
+def accepted_encodings(accept_encoding):
+    """Map each coding in an Accept-Encoding header to its q-value; malformed ones count as 0."""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, *params = [item.strip() for item in part.split(';')]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+def preferred_encoding(accept_encoding, available):
+    """Pick the highest-q encoding both the client and we have, brotli first on ties.
+
+    q=0 refuses an encoding, and '*' covers the ones not named. None means identity.
+    """
+    accepted = accepted_encodings(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in ('br', 'gzip'):
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if encoding in available and q > best_q:
+            best, best_q = encoding, q
+    return best
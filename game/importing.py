@@ -0,0 +1,89 @@
+import hashlib
+import json
+
+from .models import ImportWatermark
+
+# Current NBA teams as of 2024-2025 season
+NBA_TEAMS = [
+    {'name': 'Atlanta Hawks', 'abbreviation': 'ATL'},
+    {'name': 'Boston Celtics', 'abbreviation': 'BOS'},
+    {'name': 'Brooklyn Nets', 'abbreviation': 'BRK'},
+    {'name': 'Charlotte Hornets', 'abbreviation': 'CHO'},
+    {'name': 'Chicago Bulls', 'abbreviation': 'CHI'},
+    {'name': 'Cleveland Cavaliers', 'abbreviation': 'CLE'},
+    {'name': 'Dallas Mavericks', 'abbreviation': 'DAL'},
+    {'name': 'Denver Nuggets', 'abbreviation': 'DEN'},
+    {'name': 'Detroit Pistons', 'abbreviation': 'DET'},
+    {'name': 'Golden State Warriors', 'abbreviation': 'GSW'},
+    {'name': 'Houston Rockets', 'abbreviation': 'HOU'},
+    {'name': 'Indiana Pacers', 'abbreviation': 'IND'},
+    {'name': 'Los Angeles Clippers', 'abbreviation': 'LAC'},
+    {'name': 'Los Angeles Lakers', 'abbreviation': 'LAL'},
+    {'name': 'Memphis Grizzlies', 'abbreviation': 'MEM'},
+    {'name': 'Miami Heat', 'abbreviation': 'MIA'},
+    {'name': 'Milwaukee Bucks', 'abbreviation': 'MIL'},
+    {'name': 'Minnesota Timberwolves', 'abbreviation': 'MIN'},
+    {'name': 'New Orleans Pelicans', 'abbreviation': 'NOP'},
+    {'name': 'New York Knicks', 'abbreviation': 'NYK'},
+    {'name': 'Oklahoma City Thunder', 'abbreviation': 'OKC'},
+    {'name': 'Orlando Magic', 'abbreviation': 'ORL'},
+    {'name': 'Philadelphia 76ers', 'abbreviation': 'PHI'},
+    {'name': 'Phoenix Suns', 'abbreviation': 'PHO'},
+    {'name': 'Portland Trail Blazers', 'abbreviation': 'POR'},
+    {'name': 'Sacramento Kings', 'abbreviation': 'SAC'},
+    {'name': 'San Antonio Spurs', 'abbreviation': 'SAS'},
+    {'name': 'Toronto Raptors', 'abbreviation': 'TOR'},
+    {'name': 'Utah Jazz', 'abbreviation': 'UTA'},
+    {'name': 'Washington Wizards', 'abbreviation': 'WAS'},
+]
+
+
+def row_fingerprint(row):
+    """Stable hash of an upstream row's full content."""
+    payload = json.dumps(row, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def row_key(row):
+    """Identify an upstream row: one player can have a row per team in a season."""
+    player_id = row.get('playerId') or row.get('player_id')
+    return f"{player_id}:{row.get('team')}"
+
+
+class SeasonDelta:
+    """Rows of one (source, season) import that differ from the last watermark.
+
+    A player is treated as changed when any of their rows is new or has a
+    different fingerprint; all of that player's rows are then kept so
+    per-player merges (positions, last-row-wins stats) see the full set.
+    """
+
+    def __init__(self, source, season, rows):
+        self.source = source
+        self.season = season
+        self.fingerprints = {row_key(row): row_fingerprint(row) for row in rows}
+
+        watermark = ImportWatermark.objects.filter(source=source, season=season).first()
+        previous = watermark.row_fingerprints if watermark else {}
+        changed_keys = {key for key, fingerprint in self.fingerprints.items() if previous.get(key) != fingerprint}
+        changed_players = {key.rsplit(':', 1)[0] for key in changed_keys}
+
+        self.rows_seen = len(rows)
+        self.rows_changed = len(changed_keys)
+        self.changed_rows = [row for row in rows if row_key(row).rsplit(':', 1)[0] in changed_players]
+
+    def discard(self, row):
+        """Leave a row that was not written out of the watermark, so the next run retries it."""
+        self.fingerprints.pop(row_key(row), None)
+
+    def record(self):
+        """Store the new fingerprints as this source and season's watermark."""
+        ImportWatermark.objects.update_or_create(
+            source=self.source,
+            season=self.season,
+            defaults={
+                'row_fingerprints': self.fingerprints,
+                'rows_seen': self.rows_seen,
+                'rows_changed': self.rows_changed,
+            },
+        )
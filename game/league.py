@@ -0,0 +1,255 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from functools import cached_property
+from types import MappingProxyType
+
+from django.conf import settings
+
+from .scoring import AttributeMatrix
+from .signals import league_data_changed
+
+logger = logging.getLogger(__name__)
+
+
+class LeagueData:
+    """Immutable snapshot of league.json shared by every request in a worker."""
+
+    def __init__(self, players, version=''):
+        self.players = tuple(MappingProxyType(dict(player)) for player in players)
+        self.version = version
+
+    def __len__(self):
+        return len(self.players)
+
+    @cached_property
+    def index(self):
+        return PlayerIndex(self.players)
+
+    @cached_property
+    def attribute_matrix(self):
+        return AttributeMatrix(self.players)
+
+    def find(self, player_name):
+        """Return the league entry matching player_name, or None."""
+        position = self.index.find(player_name)
+        return None if position is None else self.players[position]
+
+
+def normalize_name(name):
+    return name.strip().lower()
+
+
+class PlayerIndex:
+    """Name lookups over a league player list without scanning it.
+
+    Matching follows the original linear search: an exact match on the
+    normalized name wins, otherwise the first player in file order whose name
+    contains the query or is contained in it. Exact names live in a dict;
+    the containment fallback intersects n-gram posting sets for one
+    direction and, for the other, probes only the substrings of the query
+    that start with a known name prefix and have a known name length.
+    """
+
+    NGRAM = 3
+
+    def __init__(self, players):
+        self.names = tuple(normalize_name(player.get('name', '')) for player in players)
+        self.exact = {}
+        postings = {}
+        prefixes = {}
+        short_lengths = set()
+        for position, name in enumerate(self.names):
+            self.exact.setdefault(name, position)
+            for gram in self._grams(name):
+                postings.setdefault(gram, set()).add(position)
+            if len(name) >= self.NGRAM:
+                prefixes.setdefault(name[:self.NGRAM], set()).add(len(name))
+            else:
+                short_lengths.add(len(name))
+        self.postings = {gram: frozenset(positions) for gram, positions in postings.items()}
+        self.prefixes = {prefix: tuple(sorted(lengths)) for prefix, lengths in prefixes.items()}
+        self.short_lengths = tuple(sorted(short_lengths))
+
+    @classmethod
+    def _grams(cls, text):
+        # Grams shorter than NGRAM are indexed too so short queries are a
+        # single posting lookup.
+        grams = set()
+        for size in range(1, cls.NGRAM + 1):
+            grams.update(text[i:i + size] for i in range(len(text) - size + 1))
+        return grams
+
+    def find(self, player_name):
+        """Return the position of the matching player, or None."""
+        query = normalize_name(player_name)
+        position = self.exact.get(query)
+        if position is not None:
+            return position
+        return self._find_partial(query)
+
+    def _find_partial(self, query):
+        if not self.names:
+            return None
+        if not query:
+            return 0
+
+        best = None
+        # League names contained in the query.
+        size = len(query)
+        for start in range(size + 1):
+            lengths = self.prefixes.get(query[start:start + self.NGRAM], ())
+            for length in self.short_lengths + lengths:
+                if start + length > size:
+                    break
+                position = self.exact.get(query[start:start + length])
+                if position is not None and (best is None or position < best):
+                    best = position
+
+        # League names containing the query.
+        if len(query) <= self.NGRAM:
+            grams = [query]
+        else:
+            grams = {query[i:i + self.NGRAM] for i in range(len(query) - self.NGRAM + 1)}
+        sets = sorted((self.postings.get(gram, frozenset()) for gram in grams), key=len)
+        candidates = sets[0].intersection(*sets[1:])
+        for position in sorted(candidates):
+            if best is not None and position >= best:
+                break
+            if query in self.names[position]:
+                best = position
+                break
+        return best
+
+
+EMPTY_LEAGUE = LeagueData(())
+
+
+class LeagueDataStore:
+    """Load league.json once per process and reload it only when it changes.
+
+    Every call stats the file; if its mtime and size match the last load the
+    cached snapshot is returned. Otherwise the file is read and hashed, and
+    only re-parsed when the hash differs from the snapshot's version.
+
+    With compiled_path set, the snapshot is the compiled league file mapped
+    read-only (see game.leaguefile). league.json is only parsed, and the
+    file rebuilt, when the file was built from a different version.
+    """
+
+    def __init__(self, path, compiled_path=None):
+        self.path = str(path)
+        self.compiled_path = str(compiled_path) if compiled_path else None
+        self._lock = threading.Lock()
+        # Hits are mostly counted outside _lock; misses and reloads only happen under it
+        self._hits_lock = threading.Lock()
+        self._data = None
+        self._stat_key = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def get(self):
+        """Return the current LeagueData snapshot."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            logger.error(f"league.json not found at {self.path}")
+            return self._data or EMPTY_LEAGUE
+
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        if self._data is not None and stat_key == self._stat_key:
+            self._count_hit()
+            return self._data
+
+        with self._lock:
+            if self._data is not None and stat_key == self._stat_key:
+                self._count_hit()
+                return self._data
+            self.misses += 1
+            self._load(stat_key)
+        return self._data
+
+    def _count_hit(self):
+        with self._hits_lock:
+            self.hits += 1
+
+    def _load(self, stat_key):
+        with open(self.path, 'rb') as file:
+            raw = file.read()
+        version = hashlib.sha1(raw).hexdigest()
+        self._stat_key = stat_key
+
+        if self._data is not None and self._data.version == version:
+            # Touched but unchanged: keep sharing the existing snapshot.
+            return
+
+        league = self._open_compiled(version) if self.compiled_path else None
+        if league is None:
+            try:
+                players = json.loads(raw)
+            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                logger.error(f"Error parsing league.json: {e}")
+                if self._data is None:
+                    self._data = EMPTY_LEAGUE
+                return
+            league = self._compile(players, version) if self.compiled_path else None
+            league = league or LeagueData(players, version)
+
+        reloaded = self._data is not None and self._data is not EMPTY_LEAGUE
+        self._data = league
+        logger.info(f"Loaded {len(self._data)} players from league.json (version {version[:12]})")
+        if reloaded:
+            self.reloads += 1
+            league_data_changed.send(sender=self.__class__, league=self._data)
+
+    def _open_compiled(self, version):
+        from .leaguefile import open_league_file, read_source_version
+
+        if read_source_version(self.compiled_path) != version:
+            return None
+        try:
+            return open_league_file(self.compiled_path)
+        except (OSError, ValueError) as e:
+            # ValueError covers LeagueFileError and empty files mmap refuses
+            logger.warning(f"Could not map compiled league {self.compiled_path}: {e}")
+            return None
+
+    def _compile(self, players, version):
+        from .leaguefile import write_league_file
+
+        try:
+            write_league_file(self.compiled_path, players, version)
+        except OSError as e:
+            logger.warning(f"Could not compile league.json to {self.compiled_path}: {e}")
+            return None
+        logger.info(f"Compiled league.json to {self.compiled_path}")
+        return self._open_compiled(version)
+
+    def stats(self):
+        """Counters for confirming the cache is effective."""
+        data = self._data or EMPTY_LEAGUE
+        return {
+            'path': self.path,
+            'version': data.version,
+            'players': len(data),
+            'hits': self.hits,
+            'misses': self.misses,
+            'reloads': self.reloads,
+        }
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_league_store():
+    """Return the process-wide store for settings.LEAGUE_DATA_FILE and LEAGUE_COMPILED_FILE."""
+    path = str(settings.LEAGUE_DATA_FILE)
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(path, LeagueDataStore(path, settings.LEAGUE_COMPILED_FILE))
+    return store
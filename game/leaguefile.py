@@ -0,0 +1,208 @@
+"""league.json compiled to a binary file that workers share through mmap.
+
+Parsing league.json gives every worker its own few hundred dicts of ~38
+boxed values each. The compiled file holds the same ratings once, and every
+worker maps it read-only, so they all read one page-cache copy and a cold
+worker only has to hash league.json to know the file is current.
+
+Layout, little-endian:
+
+    header      magic, player and attribute counts, sha1 of the source
+                league.json, and the offsets of the sections below
+    strings     interned string table: attribute names, then team names
+    names       string table of player names, in league.json order
+    teams       uint32 per player, indexing the team names in `strings`
+    integral    uint8 per attribute, 1 when every value in it is an int
+    matrix      float64 players x attributes ratings, 8-byte aligned
+
+A string table is a uint32 count, count + 1 uint32 offsets into the UTF-8
+blob that follows, then the blob.
+"""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from collections.abc import Mapping, Sequence
+from functools import cached_property
+
+import numpy as np
+
+from .league import LeagueData
+from .scoring import AttributeMatrix
+
+MAGIC = b'NBALEAG1'
+# magic, players, attributes, source sha1, then strings/names/teams/integral/matrix offsets
+HEADER = struct.Struct('<8sII40s5Q')
+
+
+class LeagueFileError(ValueError):
+    """The file is not a compiled league this version can read."""
+
+
+def pack_strings(strings):
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype='<u4')
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    return struct.pack('<I', len(encoded)) + offsets.tobytes() + b''.join(encoded)
+
+
+class StringTable(Sequence):
+    """Read-only view of a packed string table; strings are decoded on access."""
+
+    def __init__(self, buffer, offset):
+        (self.count,) = struct.unpack_from('<I', buffer, offset)
+        self.offsets = np.frombuffer(buffer, dtype='<u4', count=self.count + 1, offset=offset + 4)
+        self.buffer = buffer
+        self.start = offset + 4 + 4 * (self.count + 1)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.count))]
+        if not -self.count <= i < self.count:
+            raise IndexError('string table index out of range')
+        i %= self.count
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.buffer[self.start + start:self.start + end].decode('utf-8')
+
+
+def compile_league(players, version):
+    """Return the compiled file contents for a league.json player list."""
+    ratings = AttributeMatrix(players)
+    attributes = list(ratings.attributes)
+    teams = sorted({player.get('team') or '' for player in players})
+    team_rows = {team: len(attributes) + i for i, team in enumerate(teams)}
+
+    sections = [
+        pack_strings(attributes + teams),
+        pack_strings([player.get('name', '') for player in players]),
+        np.array([team_rows[player.get('team') or ''] for player in players], dtype='<u4').tobytes(),
+        ratings.integral.astype('u1').tobytes(),
+    ]
+    offsets = []
+    position = HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+    padding = -position % 8
+    offsets.append(position + padding)
+
+    header = HEADER.pack(MAGIC, len(players), len(attributes), version.encode('ascii'), *offsets)
+    return b''.join([header, *sections, b'\0' * padding, ratings.matrix.astype('<f8').tobytes()])
+
+
+def write_league_file(path, players, version):
+    """Compile players into path, replacing it atomically."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    handle, tmp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(handle, 'wb') as file:
+            file.write(compile_league(players, version))
+        # mkstemp creates the file private; workers may run as another user
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_source_version(path):
+    """Return the league.json sha1 a compiled file was built from, or None."""
+    try:
+        with open(path, 'rb') as file:
+            magic, _players, _attributes, version, *_offsets = HEADER.unpack(file.read(HEADER.size))
+    except (OSError, struct.error):
+        return None
+    return version.decode('ascii') if magic == MAGIC else None
+
+
+def open_league_file(path):
+    """Map a compiled league read-only and return it as CompiledLeagueData."""
+    with open(path, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return CompiledLeagueData(buffer)
+
+
+class PlayerRecord(Mapping):
+    """One player of a compiled league, read as a league.json dict would be."""
+
+    __slots__ = ('league', 'row')
+
+    def __init__(self, league, row):
+        self.league = league
+        self.row = row
+
+    def __getitem__(self, key):
+        league = self.league
+        if key == 'name':
+            return league.names[self.row]
+        if key == 'team':
+            return league.strings[int(league.team_rows[self.row])]
+        column = league.attribute_columns[key]
+        value = league.matrix[self.row, column].item()
+        return int(value) if league.integral[column] else value
+
+    def __iter__(self):
+        yield 'name'
+        yield 'team'
+        yield from self.league.attributes
+
+    def __len__(self):
+        return 2 + len(self.league.attributes)
+
+    def __repr__(self):
+        return f"<PlayerRecord {self.row}: {self['name']}>"
+
+
+class PlayerRecords(Sequence):
+    """The players of a compiled league; a record is made on first access and reused."""
+
+    def __init__(self, league):
+        self.league = league
+        self.records = [None] * league.num_players
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return tuple(self[j] for j in range(*i.indices(len(self.records))))
+        record = self.records[i]
+        if record is None:
+            record = self.records[i] = PlayerRecord(self.league, i % len(self.records))
+        return record
+
+
+class CompiledLeagueData(LeagueData):
+    """LeagueData whose ratings, names and teams live in a mapped league file."""
+
+    def __init__(self, buffer):
+        try:
+            magic, num_players, num_attributes, version, strings, names, teams, integral, matrix = HEADER.unpack_from(buffer)
+        except struct.error as e:
+            raise LeagueFileError(f"Truncated league file: {e}") from e
+        if magic != MAGIC:
+            raise LeagueFileError('Not a compiled league file')
+        if matrix + 8 * num_players * num_attributes > len(buffer):
+            raise LeagueFileError('Truncated league file')
+
+        self.buffer = buffer
+        self.version = version.decode('ascii')
+        self.num_players = num_players
+        self.strings = StringTable(buffer, strings)
+        self.attributes = tuple(sys.intern(name) for name in self.strings[:num_attributes])
+        self.attribute_columns = {attr: column for column, attr in enumerate(self.attributes)}
+        self.names = StringTable(buffer, names)
+        self.team_rows = np.frombuffer(buffer, dtype='<u4', count=num_players, offset=teams)
+        self.integral = np.frombuffer(buffer, dtype='u1', count=num_attributes, offset=integral).astype(bool)
+        self.matrix = np.frombuffer(buffer, dtype='<f8', count=num_players * num_attributes, offset=matrix)
+        self.matrix = self.matrix.reshape(num_players, num_attributes)
+        self.players = PlayerRecords(self)
+
+    @cached_property
+    def attribute_matrix(self):
+        return AttributeMatrix.from_arrays(self.attributes, self.matrix, self.integral)
@@ -0,0 +1,53 @@
+import argparse
+import json
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+
+from game.benchmarks import SUITES
+from game.benchmarks.baseline import compare, load_baseline, save_baseline
+
+
+class Command(BaseCommand):
+    help = 'Run a benchmark suite and print per-call timings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('suite', choices=sorted(SUITES), help='Benchmark suite to run')
+        parser.add_argument('--number', type=int, default=5, help='Calls per timing run (default: 5)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timing runs per case (default: 5)')
+        parser.add_argument('--json', action='store_true', help='Emit results as JSON')
+        # Left out of options unless given, so each suite keeps its own defaults
+        parser.add_argument('--games', type=int, default=argparse.SUPPRESS, help='Games per case (drafts, load)')
+        parser.add_argument('--num-players', type=int, nargs='+', default=argparse.SUPPRESS, help='Players per game (load)')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=argparse.SUPPRESS, help='Concurrent clients (load)')
+        parser.add_argument('--league-sizes', type=int, nargs='+', default=argparse.SUPPRESS, help='Synthetic league sizes (primitives)')
+        parser.add_argument('--team-counts', type=int, nargs='+', default=argparse.SUPPRESS, help='Teams per game (primitives, render, scoring)')
+        parser.add_argument('--save-baseline', metavar='PATH', help='Write the results to PATH as a baseline')
+        parser.add_argument('--baseline', metavar='PATH', help='Fail if results regressed against the baseline at PATH')
+        parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown against the baseline (default: 0.25)')
+
+    def handle(self, *args, **options):
+        suite = import_module(SUITES[options['suite']])
+        results = suite.run(options)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            for result in results:
+                line = f"{result['name']:<40} best {result['best_us']:>12.1f} us   median {result['median_us']:>12.1f} us"
+                if 'p95_us' in result:
+                    line += f"   p95 {result['p95_us']:>10.1f} us   p99 {result['p99_us']:>10.1f} us"
+                if 'requests_per_sec' in result:
+                    line += f"   {result['requests_per_sec']:>8.1f} req/s   {result['queries_per_request']:.2f} q/req"
+                if 'speedup' in result:
+                    line += f"   x{result['speedup']:.1f}"
+                self.stdout.write(line)
+
+        if options['save_baseline']:
+            save_baseline(options['save_baseline'], results)
+        if options['baseline']:
+            regressions = compare(results, load_baseline(options['baseline']), options['tolerance'])
+            for regression in regressions:
+                self.stderr.write(regression)
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against {options['baseline']}")
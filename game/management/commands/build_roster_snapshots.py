@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from game.encoding import brotli
+from game.snapshots import write_roster_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Write precompressed team index and roster JSON snapshots with ETags'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Directory to write to (default: settings.ROSTER_SNAPSHOT_DIR)')
+
+    def handle(self, *args, **options):
+        directory = options['output'] or settings.ROSTER_SNAPSHOT_DIR
+        if not directory:
+            raise CommandError('No output directory: pass --output or set ROSTER_SNAPSHOT_DIR')
+        manifest = write_roster_snapshots(directory)
+        encodings = 'gzip and brotli' if brotli is not None else 'gzip (install brotli for .br files)'
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote index and {len(manifest['teams'])} team snapshots to {directory} with {encodings}"
+        ))
@@ -0,0 +1,28 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from game.leaguefile import write_league_file
+
+
+class Command(BaseCommand):
+    help = 'Compile league.json into the memory-mapped league file workers share'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='File to write (default: settings.LEAGUE_COMPILED_FILE)')
+
+    def handle(self, *args, **options):
+        path = options['output'] or settings.LEAGUE_COMPILED_FILE
+        if not path:
+            raise CommandError('No output file: pass --output or set LEAGUE_COMPILED_FILE')
+        try:
+            with open(settings.LEAGUE_DATA_FILE, 'rb') as file:
+                raw = file.read()
+            players = json.loads(raw)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {settings.LEAGUE_DATA_FILE}: {e}")
+
+        write_league_file(path, players, hashlib.sha1(raw).hexdigest())
+        self.stdout.write(self.style.SUCCESS(f"Compiled {len(players)} players from {settings.LEAGUE_DATA_FILE} to {path}"))
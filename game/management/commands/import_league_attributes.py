@@ -0,0 +1,104 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from game.catalog import bump_catalog_version
+from game.models import LEAGUE_ATTRIBUTE_FIELDS, Player, PlayerAttributes
+from game.reconcile import reconcile, team_key
+
+BATCH_SIZE = 500
+MAX_RATING = 32767  # PositiveSmallIntegerField
+REPORT_SAMPLE = 20
+
+
+def rating(value):
+    """Store numbers as whole ratings; anything else counts as 0, as scoring always did."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return 0
+    return min(max(int(round(value)), 0), MAX_RATING)
+
+
+class Command(BaseCommand):
+    help = 'Reconcile players with league.json entries and store their ratings in PlayerAttributes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='League file to import (default: settings.LEAGUE_DATA_FILE)')
+        parser.add_argument('--report', metavar='PATH', help='Write the full match report to PATH as JSON')
+        parser.add_argument('--dry-run', action='store_true', help='Report matches without changing PlayerAttributes')
+
+    def handle(self, *args, **options):
+        path = options['file'] or settings.LEAGUE_DATA_FILE
+        try:
+            with open(path, 'rb') as file:
+                league = json.load(file)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {path}: {e}")
+
+        teams = {}
+        for player_id, name, abbreviation in Player.teams.through.objects.values_list('player_id', 'team__name', 'team__abbreviation'):
+            teams.setdefault(player_id, set()).update((team_key(name), team_key(abbreviation)))
+        players = [(player_id, name, teams.get(player_id, set())) for player_id, name in Player.objects.values_list('id', 'name')]
+        result = reconcile(players, league)
+
+        if options['report']:
+            self.write_report(options['report'], players, league, result)
+        if not options['dry_run']:
+            self.store(league, result)
+
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        by_team = sum(1 for _position, method in result.matches.values() if method == 'team')
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} ratings for {len(result.matches)} of {len(players)} players ({by_team} confirmed by team)"
+        ))
+        self.list('Ambiguous', [f"{name} -> {', '.join(candidates)}" for _id, name, candidates in result.ambiguous])
+        self.list('No league entry for', [name for _id, name in result.unmatched])
+        self.list('League entries without a player', [league[position].get('name', '') for position in result.unused])
+
+    def store(self, league, result):
+        rows = [
+            PlayerAttributes(
+                player_id=player_id,
+                league_name=league[position].get('name', ''),
+                match_method=method,
+                **{field: rating(league[position].get(key, 0)) for key, field in LEAGUE_ATTRIBUTE_FIELDS},
+            )
+            for player_id, (position, method) in result.matches.items()
+        ]
+        update_fields = ['league_name', 'match_method', *(field for _key, field in LEAGUE_ATTRIBUTE_FIELDS), 'updated_at']
+        with transaction.atomic():
+            # A player no longer matched must not keep another entry's ratings
+            PlayerAttributes.objects.exclude(player_id__in=list(result.matches)).delete()
+            PlayerAttributes.objects.bulk_create(
+                rows,
+                batch_size=BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['player'],
+                update_fields=update_fields,
+            )
+        # bulk_create skips model signals, so move the catalog token by hand
+        bump_catalog_version()
+
+    def write_report(self, path, players, league, result):
+        names = {player_id: name for player_id, name, _teams in players}
+        report = {
+            'matched': [
+                {'player_id': player_id, 'player': names[player_id], 'league_name': league[position].get('name'), 'method': method}
+                for player_id, (position, method) in sorted(result.matches.items())
+            ],
+            'ambiguous': [
+                {'player_id': player_id, 'player': name, 'candidates': candidates}
+                for player_id, name, candidates in result.ambiguous
+            ],
+            'unmatched': [{'player_id': player_id, 'player': name} for player_id, name in result.unmatched],
+            'unused_league_entries': [league[position].get('name') for position in result.unused],
+        }
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        self.stdout.write(f"Wrote match report to {path}")
+
+    def list(self, label, names):
+        if names:
+            more = f" and {len(names) - REPORT_SAMPLE} more" if len(names) > REPORT_SAMPLE else ''
+            self.stdout.write(f"{label} ({len(names)}): {'; '.join(names[:REPORT_SAMPLE])}{more}")
@@ -1,30 +1,52 @@
 import requests
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from game.catalog import muted_catalog_signals
+from game.importing import SeasonDelta
 from game.models import Team, Player, PlayerSeasonStats
+from game.nba_api import NBAApiClient
+from game.snapshots import write_roster_snapshots
 
 class Command(BaseCommand):
     help = 'Populates the database with NBA teams and players from an API'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only process player rows and stat lines that changed since the last import of each season',
+        )
+        NBAApiClient.add_arguments(parser)
+
     def handle(self, *args, **options):
         self.stdout.write("Starting to populate the database...")
-        
-        teams = self.get_teams()
-        self.save_teams(teams)
-        
-        self.get_and_save_players()
-        self.get_and_save_player_stats()
 
+        # One catalog token bump for the whole import instead of one per saved row
+        with muted_catalog_signals():
+            self.import_all(options)
+
+        if self.client.cache:
+            self.stdout.write(f"Response cache: {self.client.cache.summary()}")
+        manifest = write_roster_snapshots()
+        if manifest:
+            self.stdout.write(f"Wrote roster snapshots for {len(manifest['teams'])} teams")
         self.stdout.write(self.style.SUCCESS('Successfully populated the database with teams, players, and stats.'))
 
+    def import_all(self, options):
+        """Fetch and save teams, players and stats."""
+        self.client = NBAApiClient.from_options(options)
+        with self.client:
+            teams = self.get_teams()
+            self.save_teams(teams)
+
+            self.get_and_save_players(options['incremental'])
+            self.get_and_save_player_stats(options['incremental'])
+
     def get_teams(self):
         teams = set()
-        page = 1
         # Fetching a single recent season to get all team abbreviations
-        url = f"https://api.server.nbaapi.com/api/playertotals?season=2024&page={page}&pageSize=500"
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
+            data = self.client.get_json('playertotals', {'season': 2024, 'page': 1, 'pageSize': 500})
             for player_data in data.get('data', []):
                 team_abbreviation = player_data.get('team')
                 if team_abbreviation and len(team_abbreviation) == 3: # To filter out 2TM, 3TM etc.
@@ -43,23 +65,20 @@ class Command(BaseCommand):
             if created:
                 self.stdout.write(f"Created team: {team.name}")
 
-    def get_and_save_players(self):
+    def get_and_save_players(self, incremental=False):
         for season in range(2000, 2025):
             self.stdout.write(f"Fetching players for season: {season}")
-            page = 1
-            while True:
-                url = f"https://api.server.nbaapi.com/api/playertotals?season={season}&page={page}&pageSize=100"
-                try:
-                    response = requests.get(url)
-                    response.raise_for_status()
-                    data = response.json()
-                except requests.exceptions.RequestException as e:
-                    self.stderr.write(self.style.ERROR(f"Error fetching player data for season {season}: {e}"))
-                    break
-
-                players_data = data.get('data')
-                if not players_data:
-                    break
+            try:
+                players_data = self.client.fetch_pages('playertotals', {'season': season, 'pageSize': 100})
+            except requests.exceptions.RequestException as e:
+                self.stderr.write(self.style.ERROR(f"Error fetching player data for season {season}: {e}"))
+                continue
+
+            with transaction.atomic():
+                delta = SeasonDelta('populate_db:playertotals', season, players_data)
+                if incremental:
+                    self.stdout.write(f"  {delta.rows_changed} of {delta.rows_seen} rows changed")
+                    players_data = delta.changed_rows
 
                 for player_data in players_data:
                     player_id = player_data.get('playerId')
@@ -81,36 +100,37 @@ class Command(BaseCommand):
 
                     except Team.DoesNotExist:
                         self.stderr.write(self.style.WARNING(f"  - Team with abbreviation {team_abbr} not found for player {player_name}"))
+                        delta.discard(player_data)
 
-                if page >= data['pagination']['pages']:
-                    break
-                page += 1 
+                delta.record()
 
-    def get_and_save_player_stats(self):
-        self.stdout.write("Fetching and saving player stats...")
-        for player in Player.objects.all():
-            self.stdout.write(f"  Fetching stats for {player.name}...")
-            # Fetch advanced stats to get VORP
-            adv_url = f"https://api.server.nbaapi.com/api/playeradvancedstats?playerId={player.player_id}"
-            try:
-                adv_response = requests.get(adv_url)
-                adv_response.raise_for_status()
-                adv_data = adv_response.json().get('data', [])
-            except requests.exceptions.RequestException as e:
-                self.stderr.write(self.style.ERROR(f"    Could not fetch advanced stats for {player.name}: {e}"))
-                adv_data = []
+    def fetch_player_stat_lines(self, player):
+        """Fetch advanced and total stat lines for one player"""
+        # Fetch advanced stats to get VORP
+        try:
+            adv_data = self.client.get_json('playeradvancedstats', {'playerId': player.player_id}).get('data', [])
+        except requests.exceptions.RequestException as e:
+            self.stderr.write(self.style.ERROR(f"    Could not fetch advanced stats for {player.name}: {e}"))
+            adv_data = []
 
-            # Fetch total stats for points, rebounds, assists
-            totals_url = f"https://api.server.nbaapi.com/api/playertotals?playerId={player.player_id}"
-            try:
-                totals_response = requests.get(totals_url)
-                totals_response.raise_for_status()
-                totals_data = totals_response.json().get('data', [])
-            except requests.exceptions.RequestException as e:
-                self.stderr.write(self.style.ERROR(f"    Could not fetch total stats for {player.name}: {e}"))
-                totals_data = []
+        # Fetch total stats for points, rebounds, assists
+        try:
+            totals_data = self.client.get_json('playertotals', {'playerId': player.player_id}).get('data', [])
+        except requests.exceptions.RequestException as e:
+            self.stderr.write(self.style.ERROR(f"    Could not fetch total stats for {player.name}: {e}"))
+            totals_data = []
+
+        return adv_data, totals_data
 
-            # Create a dictionary of stats by season
+    def get_and_save_player_stats(self, incremental=False):
+        self.stdout.write("Fetching and saving player stats...")
+        players = {player.player_id: player for player in Player.objects.all()}
+        # Requests for different players run concurrently; saving stays on this thread
+        stat_lines = self.client.map(self.fetch_player_stat_lines, list(players.values()))
+
+        # One merged stat line per player and season, grouped by season for the watermarks
+        rows_by_season = {}
+        for player, (adv_data, totals_data) in zip(players.values(), stat_lines):
             stats_by_season = {}
             for stat_line in totals_data:
                 season = stat_line.get('season')
@@ -120,23 +140,40 @@ class Command(BaseCommand):
                         'rebounds': stat_line.get('totalRb', 0),
                         'assists': stat_line.get('assists', 0)
                     })
-            
+
             for stat_line in adv_data:
                 season = stat_line.get('season')
                 if season:
                     stats_by_season.setdefault(season, {}).update({
                         'vorp': stat_line.get('vorp', 0)
                     })
-            
+
             for season, stats in stats_by_season.items():
-                PlayerSeasonStats.objects.update_or_create(
-                    player=player,
-                    season=season,
-                    defaults={
-                        'points': stats.get('points', 0),
-                        'rebounds': stats.get('rebounds', 0),
-                        'assists': stats.get('assists', 0),
-                        'vorp': stats.get('vorp', 0)
-                    }
-                )
-        self.stdout.write(self.style.SUCCESS("Finished populating player stats.")) 
\ No newline at end of file
+                rows_by_season.setdefault(season, []).append({
+                    'playerId': player.player_id,
+                    'points': stats.get('points', 0),
+                    'rebounds': stats.get('rebounds', 0),
+                    'assists': stats.get('assists', 0),
+                    'vorp': stats.get('vorp', 0),
+                })
+
+        for season, rows in sorted(rows_by_season.items()):
+            with transaction.atomic():
+                delta = SeasonDelta('populate_db:playerstats', season, rows)
+                if incremental:
+                    self.stdout.write(f"  Season {season}: {delta.rows_changed} of {delta.rows_seen} stat lines changed")
+                    rows = delta.changed_rows
+
+                for row in rows:
+                    PlayerSeasonStats.objects.update_or_create(
+                        player=players[row['playerId']],
+                        season=season,
+                        defaults={
+                            'points': row['points'],
+                            'rebounds': row['rebounds'],
+                            'assists': row['assists'],
+                            'vorp': row['vorp']
+                        }
+                    )
+                delta.record()
+        self.stdout.write(self.style.SUCCESS("Finished populating player stats."))
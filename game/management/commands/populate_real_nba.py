@@ -1,7 +1,13 @@
 import requests
-import time
 from django.core.management.base import BaseCommand
-from game.models import Team, Player, PlayerSeasonStats
+from django.db import transaction
+from game.catalog import bump_catalog_version, muted_catalog_signals
+from game.importing import NBA_TEAMS, SeasonDelta
+from game.models import Team, Player, PlayerSeasonStats, ImportWatermark
+from game.nba_api import NBAApiClient
+from game.snapshots import write_roster_snapshots
+
+INVALID_TEAM_ABBREVIATIONS = ['TOT', '2TM', '3TM']
 
 class Command(BaseCommand):
     help = 'Populate the database with real NBA players and stats from NBA API'
@@ -18,52 +24,38 @@ class Command(BaseCommand):
             default='2024,2023,2022',
             help='Comma-separated seasons to fetch (default: 2024,2023,2022)',
         )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only write rows that changed since the last import of each season',
+        )
+        NBAApiClient.add_arguments(parser)
 
     def handle(self, *args, **options):
+        # One catalog token bump for the whole import instead of one per saved row
+        with muted_catalog_signals():
+            self.import_seasons(options)
+
+        if self.client.cache:
+            self.stdout.write(f'Response cache: {self.client.cache.summary()}')
+        manifest = write_roster_snapshots()
+        if manifest:
+            self.stdout.write(f"Wrote roster snapshots for {len(manifest['teams'])} teams")
+        self.stdout.write(self.style.SUCCESS('Successfully populated database with real NBA data!'))
+
+    def import_seasons(self, options):
+        """Create the teams, then import each requested season."""
         if options['clear']:
             self.stdout.write('Clearing existing data...')
             Team.objects.all().delete()
             Player.objects.all().delete()
             PlayerSeasonStats.objects.all().delete()
+            ImportWatermark.objects.all().delete()
 
-        # Current NBA teams
-        current_nba_teams = [
-            {'name': 'Atlanta Hawks', 'abbreviation': 'ATL'},
-            {'name': 'Boston Celtics', 'abbreviation': 'BOS'},
-            {'name': 'Brooklyn Nets', 'abbreviation': 'BRK'},
-            {'name': 'Charlotte Hornets', 'abbreviation': 'CHO'},
-            {'name': 'Chicago Bulls', 'abbreviation': 'CHI'},
-            {'name': 'Cleveland Cavaliers', 'abbreviation': 'CLE'},
-            {'name': 'Dallas Mavericks', 'abbreviation': 'DAL'},
-            {'name': 'Denver Nuggets', 'abbreviation': 'DEN'},
-            {'name': 'Detroit Pistons', 'abbreviation': 'DET'},
-            {'name': 'Golden State Warriors', 'abbreviation': 'GSW'},
-            {'name': 'Houston Rockets', 'abbreviation': 'HOU'},
-            {'name': 'Indiana Pacers', 'abbreviation': 'IND'},
-            {'name': 'Los Angeles Clippers', 'abbreviation': 'LAC'},
-            {'name': 'Los Angeles Lakers', 'abbreviation': 'LAL'},
-            {'name': 'Memphis Grizzlies', 'abbreviation': 'MEM'},
-            {'name': 'Miami Heat', 'abbreviation': 'MIA'},
-            {'name': 'Milwaukee Bucks', 'abbreviation': 'MIL'},
-            {'name': 'Minnesota Timberwolves', 'abbreviation': 'MIN'},
-            {'name': 'New Orleans Pelicans', 'abbreviation': 'NOP'},
-            {'name': 'New York Knicks', 'abbreviation': 'NYK'},
-            {'name': 'Oklahoma City Thunder', 'abbreviation': 'OKC'},
-            {'name': 'Orlando Magic', 'abbreviation': 'ORL'},
-            {'name': 'Philadelphia 76ers', 'abbreviation': 'PHI'},
-            {'name': 'Phoenix Suns', 'abbreviation': 'PHO'},
-            {'name': 'Portland Trail Blazers', 'abbreviation': 'POR'},
-            {'name': 'Sacramento Kings', 'abbreviation': 'SAC'},
-            {'name': 'San Antonio Spurs', 'abbreviation': 'SAS'},
-            {'name': 'Toronto Raptors', 'abbreviation': 'TOR'},
-            {'name': 'Utah Jazz', 'abbreviation': 'UTA'},
-            {'name': 'Washington Wizards', 'abbreviation': 'WAS'},
-        ]
-
-        self.stdout.write(f'Creating {len(current_nba_teams)} NBA teams...')
+        self.stdout.write(f'Creating {len(NBA_TEAMS)} NBA teams...')
         
         # Create teams
-        for team_data in current_nba_teams:
+        for team_data in NBA_TEAMS:
             team, created = Team.objects.get_or_create(
                 abbreviation=team_data['abbreviation'],
                 defaults={'name': team_data['name']}
@@ -75,212 +67,141 @@ class Command(BaseCommand):
         seasons = [int(s.strip()) for s in options['seasons'].split(',')]
         
         self.stdout.write(f'Fetching player data for seasons: {seasons}')
-        
-        # Fetch player data from NBA API
-        for season in seasons:
-            self.fetch_players_for_season(season)
-            self.fetch_advanced_stats_for_season(season)
-            time.sleep(1)  # Rate limiting
 
-        self.stdout.write(self.style.SUCCESS('Successfully populated database with real NBA data!'))
+        team_ids = dict(Team.objects.values_list('abbreviation', 'id'))
+        
+        # Fetch each season in full, then write it in a single transaction
+        self.client = NBAApiClient.from_options(options)
+        with self.client:
+            for season in seasons:
+                try:
+                    players_data = self.fetch_players_for_season(season)
+                    stats_data = self.fetch_advanced_stats_for_season(season)
+                except requests.RequestException as e:
+                    self.stdout.write(f'  Error fetching data for season {season}: {e}')
+                    continue
+                with transaction.atomic():
+                    players_delta = SeasonDelta('populate_real_nba:playertotals', season, players_data)
+                    stats_delta = SeasonDelta('populate_real_nba:playeradvancedstats', season, stats_data)
+                    if options['incremental']:
+                        self.stdout.write(
+                            f'  Season {season}: {players_delta.rows_changed}/{players_delta.rows_seen} player rows '
+                            f'and {stats_delta.rows_changed}/{stats_delta.rows_seen} advanced stats rows changed'
+                        )
+                        players_data = players_delta.changed_rows
+                        stats_data = stats_delta.changed_rows
+                    for row in self.save_players(players_data, team_ids):
+                        players_delta.discard(row)
+                    self.save_advanced_stats(stats_data, season)
+                    # Bulk upserts skip model signals
+                    bump_catalog_version()
+                    players_delta.record()
+                    stats_delta.record()
 
     def fetch_players_for_season(self, season):
         """Fetch player totals data from NBA API"""
         self.stdout.write(f'Fetching player totals for {season}...')
-        
-        page = 1
-        while True:
-            url = 'https://api.server.nbaapi.com/api/playertotals'
-            params = {
-                'season': season,
-                'page': page,
-                'pageSize': 100,
-                'sortBy': 'points',
-                'ascending': False
-            }
-            
-            try:
-                response = requests.get(url, params=params, timeout=30)
-                response.raise_for_status()
-                data = response.json()
-                
-                players_data = data.get('data', [])
-                if not players_data:
-                    break
-                
-                players_created = 0
-                for player_data in players_data:
-                    player_id = player_data.get('playerId') or player_data.get('player_id')
-                    player_name = player_data.get('playerName') or player_data.get('player_name')
-                    team_abbr = player_data.get('team')
-                    position = player_data.get('pos') or player_data.get('position')
-
-                    if not all([player_id, player_name, team_abbr]):
-                        continue
-                    
-                    # Skip invalid team abbreviations
-                    if len(team_abbr) != 3 or team_abbr in ['TOT', '2TM', '3TM']:
-                        continue
-                    
-                    try:
-                        team = Team.objects.get(abbreviation=team_abbr)
-                        player, created = Player.objects.get_or_create(
-                            player_id=player_id,
-                            defaults={
-                                'name': player_name,
-                                'position': position # Save position
-                            }
-                        )
-
-                        if not created and position and player.position != position:
-                            player.position = position
-                            player.save()
-                            
-                        player.teams.add(team)
-                        if created:
-                            self.stdout.write(f"  - Created player: {player_name} ({position})")
-                        else:
-                            # Optional: log updates for existing players
-                            # self.stdout.write(f"  - Updated player: {player_name}")
-                            pass
-
-                    except Team.DoesNotExist:
-                        self.stderr.write(self.style.WARNING(f"  - Team with abbreviation {team_abbr} not found for player {player_name}"))
-
-                # Check if we've reached the last page
-                pagination = data.get('pagination', {})
-                if page >= pagination.get('pages', 1):
-                    break
-                    
-                page += 1
-                time.sleep(0.5)  # Rate limiting
-                
-            except requests.RequestException as e:
-                self.stdout.write(f'  Error fetching players for season {season}, page {page}: {e}')
-                break
+        params = {
+            'season': season,
+            'pageSize': 100,
+            'sortBy': 'points',
+            'ascending': False
+        }
+        return self.client.fetch_pages('playertotals', params)
 
     def fetch_advanced_stats_for_season(self, season):
         """Fetch advanced stats data from NBA API"""
         self.stdout.write(f'Fetching advanced stats for {season}...')
-        
-        page = 1
-        while True:
-            url = 'https://api.server.nbaapi.com/api/playeradvancedstats'
-            params = {
-                'season': season,
-                'page': page,
-                'pageSize': 100,
-                'sortBy': 'vorp',
-                'ascending': False
-            }
-            
-            try:
-                response = requests.get(url, params=params, timeout=30)
-                response.raise_for_status()
-                data = response.json()
-                
-                stats_data = data.get('data', [])
-                if not stats_data:
-                    break
-                
-                stats_updated = 0
-                for stat_data in stats_data:
-                    if self.update_player_advanced_stats(stat_data, season):
-                        stats_updated += 1
-                
-                self.stdout.write(f'  Page {page}: Updated {stats_updated} player advanced stats')
-                
-                # Check if we've reached the last page
-                pagination = data.get('pagination', {})
-                if page >= pagination.get('pages', 1):
-                    break
-                    
-                page += 1
-                time.sleep(0.5)  # Rate limiting
-                
-            except requests.RequestException as e:
-                self.stdout.write(f'  Error fetching advanced stats for season {season}, page {page}: {e}')
-                break
+        params = {
+            'season': season,
+            'pageSize': 100,
+            'sortBy': 'vorp',
+            'ascending': False
+        }
+        return self.client.fetch_pages('playeradvancedstats', params)
+
+    def save_players(self, players_data, team_ids):
+        """Upsert players and their team memberships from staged totals rows.
 
-    def create_player_from_totals(self, player_data, season):
-        """Create/update player and their season stats from totals data"""
-        try:
-            player_id = player_data.get('playerId')
-            player_name = player_data.get('playerName')
+        Returns the rows skipped because their team is not in the database yet.
+        """
+        players = {}
+        memberships = set()
+        unknown_team = []
+        for player_data in players_data:
+            player_id = player_data.get('playerId') or player_data.get('player_id')
+            player_name = player_data.get('playerName') or player_data.get('player_name')
             team_abbr = player_data.get('team')
-            
+            position = player_data.get('pos') or player_data.get('position')
+
             if not all([player_id, player_name, team_abbr]):
-                return False
-            
+                continue
+
             # Skip invalid team abbreviations
-            if len(team_abbr) != 3 or team_abbr in ['TOT', '2TM', '3TM']:
-                return False
-            
-            # Get or create team
-            try:
-                team = Team.objects.get(abbreviation=team_abbr)
-            except Team.DoesNotExist:
-                self.stdout.write(f'    Warning: Team {team_abbr} not found')
-                return False
-            
-            # Create or get player
-            player, created = Player.objects.get_or_create(
-                player_id=player_id,
-                defaults={'name': player_name}
-            )
-            
-            # Add player to team
-            player.teams.add(team)
-            
-            # Create season stats
-            PlayerSeasonStats.objects.update_or_create(
-                player=player,
-                season=season,
-                defaults={
-                    'points': float(player_data.get('points', 0)),
-                    'rebounds': float(player_data.get('totalRb', 0)),
-                    'assists': float(player_data.get('assists', 0)),
-                    'vorp': 0.0  # Will be updated by advanced stats
-                }
-            )
-            
-            return True
-            
-        except Exception as e:
-            self.stdout.write(f'    Error processing player {player_data.get("playerName", "Unknown")}: {e}')
-            return False
+            if len(team_abbr) != 3 or team_abbr in INVALID_TEAM_ABBREVIATIONS:
+                continue
+
+            team_id = team_ids.get(team_abbr)
+            if team_id is None:
+                self.stderr.write(self.style.WARNING(f"  - Team with abbreviation {team_abbr} not found for player {player_name}"))
+                unknown_team.append(player_data)
+                continue
+
+            player_id = str(player_id)
+            name, known_position = players.get(player_id, (player_name, None))
+            players[player_id] = (name, position or known_position)
+            memberships.add((player_id, team_id))
+
+        if not players:
+            return unknown_team
 
-    def update_player_advanced_stats(self, stat_data, season):
-        """Update player's advanced stats"""
-        try:
+        existing = set(Player.objects.filter(player_id__in=players).values_list('player_id', flat=True))
+
+        # Only overwrite a stored position when the API reported one
+        Player.objects.bulk_create(
+            [Player(player_id=pid, name=name, position=position) for pid, (name, position) in players.items() if position],
+            update_conflicts=True,
+            unique_fields=['player_id'],
+            update_fields=['position'],
+        )
+        Player.objects.bulk_create(
+            [Player(player_id=pid, name=name) for pid, (name, position) in players.items() if not position],
+            ignore_conflicts=True,
+        )
+
+        ids = dict(Player.objects.filter(player_id__in=players).values_list('player_id', 'id'))
+        Membership = Player.teams.through
+        Membership.objects.bulk_create(
+            [Membership(player_id=ids[pid], team_id=team_id) for pid, team_id in memberships],
+            ignore_conflicts=True,
+        )
+
+        for pid, (name, position) in players.items():
+            if pid not in existing:
+                self.stdout.write(f"  - Created player: {name} ({position})")
+        self.stdout.write(f'  Saved {len(players)} players ({len(players) - len(existing)} new)')
+        return unknown_team
+
+    def save_advanced_stats(self, stats_data, season):
+        """Upsert VORP for every staged advanced stats row of a season"""
+        vorp_by_player = {}
+        for stat_data in stats_data:
             player_id = stat_data.get('playerId')
             if not player_id:
-                return False
-            
-            # Find player
+                continue
             try:
-                player = Player.objects.get(player_id=player_id)
-            except Player.DoesNotExist:
-                return False
-            
-            # Update season stats with advanced metrics
-            season_stats, created = PlayerSeasonStats.objects.get_or_create(
-                player=player,
-                season=season,
-                defaults={
-                    'points': 0.0,
-                    'rebounds': 0.0,
-                    'assists': 0.0,
-                    'vorp': float(stat_data.get('vorp', 0))
-                }
-            )
-            
-            if not created:
-                season_stats.vorp = float(stat_data.get('vorp', 0))
-                season_stats.save()
-            
-            return True
-            
-        except Exception as e:
-            self.stdout.write(f'    Error updating advanced stats for player {stat_data.get("playerName", "Unknown")}: {e}')
-            return False 
\ No newline at end of file
+                vorp_by_player[str(player_id)] = float(stat_data.get('vorp', 0))
+            except (TypeError, ValueError) as e:
+                self.stdout.write(f'    Error updating advanced stats for player {stat_data.get("playerName", "Unknown")}: {e}')
+
+        ids = dict(Player.objects.filter(player_id__in=vorp_by_player).values_list('player_id', 'id'))
+        PlayerSeasonStats.objects.bulk_create(
+            [
+                PlayerSeasonStats(player_id=ids[pid], season=season, points=0.0, rebounds=0.0, assists=0.0, vorp=vorp)
+                for pid, vorp in vorp_by_player.items() if pid in ids
+            ],
+            update_conflicts=True,
+            unique_fields=['player', 'season'],
+            update_fields=['vorp'],
+        )
+        self.stdout.write(f'  Updated {len(ids)} player advanced stats for {season}')
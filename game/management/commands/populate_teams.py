@@ -1,6 +1,9 @@
 from django.core.management.base import BaseCommand
-from game.models import Team, Player, PlayerSeasonStats
-import requests
+from game.catalog import muted_catalog_signals
+from game.importing import NBA_TEAMS
+from game.models import Team, Player, PlayerSeasonStats, ImportWatermark
+from game.nba_api import NBAApiClient
+from game.snapshots import write_roster_snapshots
 
 class Command(BaseCommand):
     help = 'Populate the database with current NBA teams and players'
@@ -11,52 +14,30 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing teams and players before populating',
         )
+        NBAApiClient.add_arguments(parser)
 
     def handle(self, *args, **options):
+        # One catalog token bump for the whole import instead of one per saved row
+        with muted_catalog_signals():
+            self.import_teams(options)
+
+        manifest = write_roster_snapshots()
+        if manifest:
+            self.stdout.write(f"Wrote roster snapshots for {len(manifest['teams'])} teams")
+
+    def import_teams(self, options):
+        """Create the teams, then players from the NBA API."""
         if options['clear']:
             self.stdout.write('Clearing existing data...')
             Team.objects.all().delete()
             Player.objects.all().delete()
             PlayerSeasonStats.objects.all().delete()
+            ImportWatermark.objects.all().delete()
 
-        # Current NBA teams as of 2024-2025 season
-        current_nba_teams = [
-            {'name': 'Atlanta Hawks', 'abbreviation': 'ATL'},
-            {'name': 'Boston Celtics', 'abbreviation': 'BOS'},
-            {'name': 'Brooklyn Nets', 'abbreviation': 'BRK'},
-            {'name': 'Charlotte Hornets', 'abbreviation': 'CHO'},
-            {'name': 'Chicago Bulls', 'abbreviation': 'CHI'},
-            {'name': 'Cleveland Cavaliers', 'abbreviation': 'CLE'},
-            {'name': 'Dallas Mavericks', 'abbreviation': 'DAL'},
-            {'name': 'Denver Nuggets', 'abbreviation': 'DEN'},
-            {'name': 'Detroit Pistons', 'abbreviation': 'DET'},
-            {'name': 'Golden State Warriors', 'abbreviation': 'GSW'},
-            {'name': 'Houston Rockets', 'abbreviation': 'HOU'},
-            {'name': 'Indiana Pacers', 'abbreviation': 'IND'},
-            {'name': 'Los Angeles Clippers', 'abbreviation': 'LAC'},
-            {'name': 'Los Angeles Lakers', 'abbreviation': 'LAL'},
-            {'name': 'Memphis Grizzlies', 'abbreviation': 'MEM'},
-            {'name': 'Miami Heat', 'abbreviation': 'MIA'},
-            {'name': 'Milwaukee Bucks', 'abbreviation': 'MIL'},
-            {'name': 'Minnesota Timberwolves', 'abbreviation': 'MIN'},
-            {'name': 'New Orleans Pelicans', 'abbreviation': 'NOP'},
-            {'name': 'New York Knicks', 'abbreviation': 'NYK'},
-            {'name': 'Oklahoma City Thunder', 'abbreviation': 'OKC'},
-            {'name': 'Orlando Magic', 'abbreviation': 'ORL'},
-            {'name': 'Philadelphia 76ers', 'abbreviation': 'PHI'},
-            {'name': 'Phoenix Suns', 'abbreviation': 'PHO'},
-            {'name': 'Portland Trail Blazers', 'abbreviation': 'POR'},
-            {'name': 'Sacramento Kings', 'abbreviation': 'SAC'},
-            {'name': 'San Antonio Spurs', 'abbreviation': 'SAS'},
-            {'name': 'Toronto Raptors', 'abbreviation': 'TOR'},
-            {'name': 'Utah Jazz', 'abbreviation': 'UTA'},
-            {'name': 'Washington Wizards', 'abbreviation': 'WAS'},
-        ]
-
-        self.stdout.write(f'Creating {len(current_nba_teams)} NBA teams...')
+        self.stdout.write(f'Creating {len(NBA_TEAMS)} NBA teams...')
         
         teams_created = 0
-        for team_data in current_nba_teams:
+        for team_data in NBA_TEAMS:
             team, created = Team.objects.get_or_create(
                 abbreviation=team_data['abbreviation'],
                 defaults={'name': team_data['name']}
@@ -73,15 +54,14 @@ class Command(BaseCommand):
         self.stdout.write(f'✅ Successfully created/updated {teams_created} teams')
 
         # Try to populate players from NBA API if available
-        self.populate_players_from_api()
+        self.populate_players_from_api(options)
 
-    def populate_players_from_api(self):
+    def populate_players_from_api(self, options):
         """Try to populate players from NBA stats API"""
         try:
             self.stdout.write('Attempting to fetch players from NBA API...')
             
             # NBA stats API endpoint for current players
-            url = 'https://stats.nba.com/stats/commonallplayers'
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
                 'Referer': 'https://stats.nba.com/',
@@ -93,35 +73,36 @@ class Command(BaseCommand):
                 'Season': '2024-25'
             }
 
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            client = NBAApiClient.from_options(
+                options,
+                base_url='https://stats.nba.com/stats/', headers=headers, timeout=10, retries=1
+            )
+            with client:
+                data = client.get_json('commonallplayers', params)
+
+            players_data = data['resultSets'][0]['rowSet']
             
-            if response.status_code == 200:
-                data = response.json()
-                players_data = data['resultSets'][0]['rowSet']
+            players_created = 0
+            for player_row in players_data[:200]:  # Limit to first 200 players to avoid overwhelming
+                player_id = player_row[0]
+                player_name = player_row[2]
+                team_abbr = player_row[7] if len(player_row) > 7 else None
                 
-                players_created = 0
-                for player_row in players_data[:200]:  # Limit to first 200 players to avoid overwhelming
-                    player_id = player_row[0]
-                    player_name = player_row[2]
-                    team_abbr = player_row[7] if len(player_row) > 7 else None
-                    
-                    if team_abbr:
-                        try:
-                            team = Team.objects.get(abbreviation=team_abbr)
-                            player, created = Player.objects.get_or_create(
-                                name=player_name,
-                                defaults={'player_id': str(player_id)}
-                            )
-                            if created:
-                                player.teams.add(team)
-                                players_created += 1
-                        except Team.DoesNotExist:
-                            self.stdout.write(f'  Warning: Team {team_abbr} not found for player {player_name}')
-                            continue
+                if team_abbr:
+                    try:
+                        team = Team.objects.get(abbreviation=team_abbr)
+                        player, created = Player.objects.get_or_create(
+                            name=player_name,
+                            defaults={'player_id': str(player_id)}
+                        )
+                        if created:
+                            player.teams.add(team)
+                            players_created += 1
+                    except Team.DoesNotExist:
+                        self.stdout.write(f'  Warning: Team {team_abbr} not found for player {player_name}')
+                        continue
 
-                self.stdout.write(f'✅ Successfully created {players_created} players from NBA API')
-            else:
-                raise requests.RequestException(f'API returned status {response.status_code}')
+            self.stdout.write(f'✅ Successfully created {players_created} players from NBA API')
 
         except Exception as e:
             self.stdout.write(f'⚠️  Could not fetch from NBA API: {e}')
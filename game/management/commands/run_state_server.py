@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from game.resp import RespServer
+
+
+class Command(BaseCommand):
+    help = 'Run an in-memory Redis-protocol server for RedisGameStateBackend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Address to bind (default: 127.0.0.1)')
+        parser.add_argument('--port', type=int, default=6379, help='Port to listen on (default: 6379)')
+
+    def handle(self, *args, **options):
+        server = RespServer((options['host'], options['port']))
+        self.stdout.write(f"Game state server listening on {options['host']}:{server.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
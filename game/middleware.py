@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+
+class QueryCountMiddleware:
+    """In DEBUG, report each request's database queries and time in response headers.
+
+    X-Query-Count carries the number of queries; Server-Timing carries the
+    time spent in the database and in the whole request, in milliseconds.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = {'count': 0, 'seconds': 0.0}
+
+        def count_query(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                stats['count'] += 1
+                stats['seconds'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        response['X-Query-Count'] = str(stats['count'])
+        response['Server-Timing'] = (
+            f'db;desc="{stats["count"]} queries";dur={stats["seconds"] * 1000:.2f}, total;dur={total * 1000:.2f}'
+        )
+        return response
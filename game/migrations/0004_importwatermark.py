@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0003_player_position'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=100)),
+                ('season', models.IntegerField()),
+                ('row_fingerprints', models.JSONField(default=dict)),
+                ('rows_seen', models.IntegerField(default=0)),
+                ('rows_changed', models.IntegerField(default=0)),
+                ('imported_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('source', 'season')},
+            },
+        ),
+    ]
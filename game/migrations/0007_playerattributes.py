@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0006_catalogversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerAttributes',
+            fields=[
+                ('player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='attributes', serialize=False, to='game.player')),
+                ('league_name', models.CharField(db_index=True, max_length=255)),
+                ('overall_attribute', models.PositiveSmallIntegerField(default=0)),
+                ('close_shot', models.PositiveSmallIntegerField(default=0)),
+                ('mid_range_shot', models.PositiveSmallIntegerField(default=0)),
+                ('three_point_shot', models.PositiveSmallIntegerField(default=0)),
+                ('free_throw', models.PositiveSmallIntegerField(default=0)),
+                ('shot_iq', models.PositiveSmallIntegerField(default=0)),
+                ('offensive_consistency', models.PositiveSmallIntegerField(default=0)),
+                ('layup', models.PositiveSmallIntegerField(default=0)),
+                ('standing_dunk', models.PositiveSmallIntegerField(default=0)),
+                ('driving_dunk', models.PositiveSmallIntegerField(default=0)),
+                ('post_hook', models.PositiveSmallIntegerField(default=0)),
+                ('post_fade', models.PositiveSmallIntegerField(default=0)),
+                ('post_control', models.PositiveSmallIntegerField(default=0)),
+                ('draw_foul', models.PositiveSmallIntegerField(default=0)),
+                ('hands', models.PositiveSmallIntegerField(default=0)),
+                ('interior_defense', models.PositiveSmallIntegerField(default=0)),
+                ('perimeter_defense', models.PositiveSmallIntegerField(default=0)),
+                ('steal', models.PositiveSmallIntegerField(default=0)),
+                ('block', models.PositiveSmallIntegerField(default=0)),
+                ('help_defense_iq', models.PositiveSmallIntegerField(default=0)),
+                ('pass_perception', models.PositiveSmallIntegerField(default=0)),
+                ('defensive_consistency', models.PositiveSmallIntegerField(default=0)),
+                ('speed', models.PositiveSmallIntegerField(default=0)),
+                ('agility', models.PositiveSmallIntegerField(default=0)),
+                ('strength', models.PositiveSmallIntegerField(default=0)),
+                ('vertical', models.PositiveSmallIntegerField(default=0)),
+                ('stamina', models.PositiveSmallIntegerField(default=0)),
+                ('hustle', models.PositiveSmallIntegerField(default=0)),
+                ('overall_durability', models.PositiveSmallIntegerField(default=0)),
+                ('pass_accuracy', models.PositiveSmallIntegerField(default=0)),
+                ('ball_handle', models.PositiveSmallIntegerField(default=0)),
+                ('speed_with_ball', models.PositiveSmallIntegerField(default=0)),
+                ('pass_iq', models.PositiveSmallIntegerField(default=0)),
+                ('pass_vision', models.PositiveSmallIntegerField(default=0)),
+                ('offensive_rebound', models.PositiveSmallIntegerField(default=0)),
+                ('defensive_rebound', models.PositiveSmallIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'player attributes',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0007_playerattributes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playerattributes',
+            name='match_method',
+            field=models.CharField(choices=[('name', 'Name'), ('team', 'Name and team')], default='name', max_length=10),
+        ),
+    ]
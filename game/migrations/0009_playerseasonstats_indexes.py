@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0008_playerattributes_match_method'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='player',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='playerseasonstats',
+            index=models.Index(fields=['season', '-vorp'], name='stats_season_vorp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerseasonstats',
+            index=models.Index(fields=['season', '-points'], name='stats_season_points_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerseasonstats',
+            index=models.Index(fields=['season', '-rebounds'], name='stats_season_rebounds_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerseasonstats',
+            index=models.Index(fields=['season', '-assists'], name='stats_season_assists_idx'),
+        ),
+    ]
@@ -2,6 +2,46 @@ from django.db import models
 
 # Create your models here.
 
+# league.json rating keys and the PlayerAttributes columns that hold them, in file order
+LEAGUE_ATTRIBUTE_FIELDS = (
+    ('overallAttribute', 'overall_attribute'),
+    ('closeShot', 'close_shot'),
+    ('midRangeShot', 'mid_range_shot'),
+    ('threePointShot', 'three_point_shot'),
+    ('freeThrow', 'free_throw'),
+    ('shotIQ', 'shot_iq'),
+    ('offensiveConsistency', 'offensive_consistency'),
+    ('layup', 'layup'),
+    ('standingDunk', 'standing_dunk'),
+    ('drivingDunk', 'driving_dunk'),
+    ('postHook', 'post_hook'),
+    ('postFade', 'post_fade'),
+    ('postControl', 'post_control'),
+    ('drawFoul', 'draw_foul'),
+    ('hands', 'hands'),
+    ('interiorDefense', 'interior_defense'),
+    ('perimeterDefense', 'perimeter_defense'),
+    ('steal', 'steal'),
+    ('block', 'block'),
+    ('helpDefenseIQ', 'help_defense_iq'),
+    ('passPerception', 'pass_perception'),
+    ('defensiveConsistency', 'defensive_consistency'),
+    ('speed', 'speed'),
+    ('agility', 'agility'),
+    ('strength', 'strength'),
+    ('vertical', 'vertical'),
+    ('stamina', 'stamina'),
+    ('hustle', 'hustle'),
+    ('overallDurability', 'overall_durability'),
+    ('passAccuracy', 'pass_accuracy'),
+    ('ballHandle', 'ball_handle'),
+    ('speedWithBall', 'speed_with_ball'),
+    ('passIQ', 'pass_iq'),
+    ('passVision', 'pass_vision'),
+    ('offensiveRebound', 'offensive_rebound'),
+    ('defensiveRebound', 'defensive_rebound'),
+)
+
 class Team(models.Model):
     name = models.CharField(max_length=100, unique=True)
     abbreviation = models.CharField(max_length=3, unique=True)
@@ -11,7 +51,7 @@ class Team(models.Model):
 
 class Player(models.Model):
     player_id = models.CharField(max_length=100, unique=True)
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, db_index=True)
     teams = models.ManyToManyField(Team, related_name='players')
     position = models.CharField(max_length=10, blank=True, null=True)
 
@@ -28,6 +68,98 @@ class PlayerSeasonStats(models.Model):
 
     class Meta:
         unique_together = ('player', 'season')
+        # Season leaderboards: one index per column /api/stats/ can rank by
+        indexes = [
+            models.Index(fields=['season', '-vorp'], name='stats_season_vorp_idx'),
+            models.Index(fields=['season', '-points'], name='stats_season_points_idx'),
+            models.Index(fields=['season', '-rebounds'], name='stats_season_rebounds_idx'),
+            models.Index(fields=['season', '-assists'], name='stats_season_assists_idx'),
+        ]
 
     def __str__(self):
         return f"{self.player.name} - {self.season}"
+
+class ImportWatermark(models.Model):
+    """Last import of one upstream endpoint for one season."""
+    source = models.CharField(max_length=100)
+    season = models.IntegerField()
+    row_fingerprints = models.JSONField(default=dict)
+    rows_seen = models.IntegerField(default=0)
+    rows_changed = models.IntegerField(default=0)
+    imported_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('source', 'season')
+
+    def __str__(self):
+        return f"{self.source} - {self.season}"
+
+class SavedGame(models.Model):
+    """Persistent copy of a game's state for the cached_db game state backend."""
+    game_id = models.CharField(max_length=64, unique=True)
+    state = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.game_id
+
+class CatalogVersion(models.Model):
+    """Single row whose token changes whenever teams, players or memberships do."""
+    token = models.CharField(max_length=32)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.token
+
+class PlayerAttributes(models.Model):
+    """League ratings for one player, imported from league.json by import_league_attributes."""
+    player = models.OneToOneField(Player, on_delete=models.CASCADE, primary_key=True, related_name='attributes')
+    league_name = models.CharField(max_length=255, db_index=True)
+    match_method = models.CharField(max_length=10, choices=[('name', 'Name'), ('team', 'Name and team')], default='name')
+    overall_attribute = models.PositiveSmallIntegerField(default=0)
+    close_shot = models.PositiveSmallIntegerField(default=0)
+    mid_range_shot = models.PositiveSmallIntegerField(default=0)
+    three_point_shot = models.PositiveSmallIntegerField(default=0)
+    free_throw = models.PositiveSmallIntegerField(default=0)
+    shot_iq = models.PositiveSmallIntegerField(default=0)
+    offensive_consistency = models.PositiveSmallIntegerField(default=0)
+    layup = models.PositiveSmallIntegerField(default=0)
+    standing_dunk = models.PositiveSmallIntegerField(default=0)
+    driving_dunk = models.PositiveSmallIntegerField(default=0)
+    post_hook = models.PositiveSmallIntegerField(default=0)
+    post_fade = models.PositiveSmallIntegerField(default=0)
+    post_control = models.PositiveSmallIntegerField(default=0)
+    draw_foul = models.PositiveSmallIntegerField(default=0)
+    hands = models.PositiveSmallIntegerField(default=0)
+    interior_defense = models.PositiveSmallIntegerField(default=0)
+    perimeter_defense = models.PositiveSmallIntegerField(default=0)
+    steal = models.PositiveSmallIntegerField(default=0)
+    block = models.PositiveSmallIntegerField(default=0)
+    help_defense_iq = models.PositiveSmallIntegerField(default=0)
+    pass_perception = models.PositiveSmallIntegerField(default=0)
+    defensive_consistency = models.PositiveSmallIntegerField(default=0)
+    speed = models.PositiveSmallIntegerField(default=0)
+    agility = models.PositiveSmallIntegerField(default=0)
+    strength = models.PositiveSmallIntegerField(default=0)
+    vertical = models.PositiveSmallIntegerField(default=0)
+    stamina = models.PositiveSmallIntegerField(default=0)
+    hustle = models.PositiveSmallIntegerField(default=0)
+    overall_durability = models.PositiveSmallIntegerField(default=0)
+    pass_accuracy = models.PositiveSmallIntegerField(default=0)
+    ball_handle = models.PositiveSmallIntegerField(default=0)
+    speed_with_ball = models.PositiveSmallIntegerField(default=0)
+    pass_iq = models.PositiveSmallIntegerField(default=0)
+    pass_vision = models.PositiveSmallIntegerField(default=0)
+    offensive_rebound = models.PositiveSmallIntegerField(default=0)
+    defensive_rebound = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'player attributes'
+
+    def __str__(self):
+        return self.league_name
+
+    def ratings(self):
+        """Ratings keyed by their league.json names."""
+        return {key: getattr(self, field) for key, field in LEAGUE_ATTRIBUTE_FIELDS}
@@ -0,0 +1,274 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BASE_URL': 'https://api.server.nbaapi.com/api/',
+    'MAX_WORKERS': 4,
+    'RATE_LIMIT': 4.0,
+    'BURST': 4,
+    'RETRIES': 3,
+    'BACKOFF': 0.5,
+    'TIMEOUT': 30,
+    'CACHE_DIR': None,
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` requests per second on average."""
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = capacity
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until it is available."""
+        if not self.rate:
+            return
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Reserve the token now so concurrent callers queue up behind us.
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            self.sleep(wait)
+
+
+class OfflineCacheMiss(requests.RequestException):
+    """Raised in offline mode when a request has no recorded response."""
+
+
+class ResponseCache:
+    """Content-addressed on-disk store of API responses.
+
+    Entries are keyed by a hash of the URL and its sorted query parameters
+    and keep the decoded body with the ETag / Last-Modified validators the
+    server sent, so later runs can revalidate instead of re-downloading.
+    """
+
+    def __init__(self, directory):
+        self.directory = str(directory)
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    @staticmethod
+    def key(url, params=None):
+        params = sorted((str(name), str(value)) for name, value in (params or {}).items())
+        return hashlib.sha256(json.dumps([url, params]).encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, url, params=None):
+        try:
+            with open(self.path(self.key(url, params)), encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def summary(self):
+        return f"{self.hits} replayed, {self.revalidated} revalidated, {self.misses} downloaded"
+
+    def put(self, url, params, body, headers=None):
+        headers = headers or {}
+        entry = {
+            'url': url,
+            'params': {str(name): str(value) for name, value in (params or {}).items()},
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'body': body,
+        }
+        path = self.path(self.key(url, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see half an entry.
+        handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(handle, 'w', encoding='utf-8') as file:
+            json.dump(entry, file, sort_keys=True, indent=1)
+        os.replace(tmp_path, path)
+        return entry
+
+
+class NBAApiClient:
+    """Pooled, rate-limited HTTP client shared by the populate commands.
+
+    Requests go through one requests.Session whose connection pool is sized
+    for `max_workers` concurrent fetches. Connection errors, timeouts and
+    429/5xx responses are retried with exponential backoff.
+
+    With a ResponseCache, cached responses are revalidated with
+    If-None-Match / If-Modified-Since; in offline mode they are replayed
+    without touching the network and a missing entry raises OfflineCacheMiss.
+    """
+
+    def __init__(self, base_url=DEFAULTS['BASE_URL'], max_workers=DEFAULTS['MAX_WORKERS'],
+                 rate_limit=DEFAULTS['RATE_LIMIT'], burst=DEFAULTS['BURST'], retries=DEFAULTS['RETRIES'],
+                 backoff=DEFAULTS['BACKOFF'], timeout=DEFAULTS['TIMEOUT'], headers=None, sleep=time.sleep,
+                 cache_dir=DEFAULTS['CACHE_DIR'], offline=False):
+        self.base_url = base_url
+        self.max_workers = max(1, max_workers)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.sleep = sleep
+        self.rate_limiter = TokenBucket(rate_limit, capacity=burst, sleep=sleep)
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.offline = offline
+        if offline and not self.cache:
+            raise ValueError("Offline mode needs a response cache directory")
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    @staticmethod
+    def add_arguments(parser):
+        """Add the response cache options shared by the populate commands."""
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help='Replay responses from the response cache without network access',
+        )
+        parser.add_argument(
+            '--cache-dir',
+            help='Directory of cached API responses (default: settings.NBA_API["CACHE_DIR"])',
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Do not read or write the response cache',
+        )
+
+    @classmethod
+    def from_options(cls, options, **overrides):
+        """Build a client from settings and the command line options above."""
+        if options.get('no_cache'):
+            overrides['cache_dir'] = None
+        elif options.get('cache_dir'):
+            overrides['cache_dir'] = options['cache_dir']
+        return cls.from_settings(offline=options.get('offline', False), **overrides)
+
+    @classmethod
+    def from_settings(cls, **overrides):
+        """Build a client from settings.NBA_API, with keyword overrides."""
+        config = {**DEFAULTS, **getattr(settings, 'NBA_API', {})}
+        options = {
+            'base_url': config['BASE_URL'],
+            'max_workers': config['MAX_WORKERS'],
+            'rate_limit': config['RATE_LIMIT'],
+            'burst': config['BURST'],
+            'retries': config['RETRIES'],
+            'backoff': config['BACKOFF'],
+            'timeout': config['TIMEOUT'],
+            'cache_dir': config['CACHE_DIR'],
+        }
+        options.update(overrides)
+        return cls(**options)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def get_json(self, path, params=None):
+        """GET base_url + path and return the decoded JSON body."""
+        url = urljoin(self.base_url, path)
+        entry = self.cache.get(url, params) if self.cache else None
+        if self.offline:
+            if entry is None:
+                self.cache.misses += 1
+                raise OfflineCacheMiss(f"No cached response for {url} {params or {}}")
+            self.cache.hits += 1
+            return entry['body']
+
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"Retrying {url} after {e}")
+                self.sleep(self.backoff * 2 ** attempt)
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                delay = self.backoff * 2 ** attempt
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+                logger.warning(f"Retrying {url} after HTTP {response.status_code}")
+                response.close()
+                self.sleep(delay)
+                continue
+
+            if response.status_code == 304 and entry:
+                self.cache.revalidated += 1
+                return entry['body']
+
+            response.raise_for_status()
+            data = response.json()
+            if self.cache:
+                self.cache.misses += 1
+                self.cache.put(url, params, data, response.headers)
+            return data
+
+    def map(self, func, items):
+        """Apply func to items with up to max_workers in flight, preserving order."""
+        items = list(items)
+        if self.max_workers == 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(func, items))
+
+    def fetch_pages(self, path, params=None):
+        """Return the combined 'data' rows of every page of a paginated endpoint.
+
+        The first page is fetched on its own to learn the page count; the
+        remaining pages are then fetched concurrently.
+        """
+        params = dict(params or {})
+        first = self.get_json(path, {**params, 'page': 1})
+        rows = list(first.get('data') or [])
+        pages = first.get('pagination', {}).get('pages', 1)
+        if not rows or pages <= 1:
+            return rows
+
+        for data in self.map(lambda page: self.get_json(path, {**params, 'page': page}), range(2, pages + 1)):
+            rows.extend(data.get('data') or [])
+        return rows
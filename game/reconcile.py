@@ -0,0 +1,100 @@
+"""Match Player rows to league.json entries once, when ratings are imported.
+
+Names are compared folded: diacritics removed, apostrophes and periods
+dropped, generational suffixes (Jr., III) ignored, case and spacing
+normalized. When several league entries or several players share a folded
+name, the teams the player is on decide; if they don't, the name is reported
+as ambiguous instead of guessed. Scoring then only looks ratings up by
+player id.
+"""
+import re
+import unicodedata
+
+from .importing import NBA_TEAMS
+
+SUFFIXES = frozenset({'jr', 'sr', 'ii', 'iii', 'iv'})
+# Letters NFKD leaves alone
+TRANSLITERATIONS = str.maketrans({'ø': 'o', 'ł': 'l', 'đ': 'd', 'ð': 'd', 'æ': 'ae', 'œ': 'oe', 'ı': 'i', 'þ': 'th'})
+# Other codes NBA data uses for teams in NBA_TEAMS
+TEAM_ALIASES = {'BKN': 'BRK', 'CHA': 'CHO', 'PHX': 'PHO'}
+
+ABBREVIATIONS = frozenset(team['abbreviation'] for team in NBA_TEAMS)
+
+
+def fold_name(name):
+    """Comparable form of a player or team name."""
+    text = unicodedata.normalize('NFKD', name or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold().translate(TRANSLITERATIONS)
+    text = re.sub(r"['’‘`.]", '', text)
+    words = re.sub(r'[^a-z0-9]+', ' ', text).split()
+    while len(words) > 1 and words[-1] in SUFFIXES:
+        words.pop()
+    return ' '.join(words)
+
+
+TEAM_NAMES = {fold_name(team['name']): team['abbreviation'] for team in NBA_TEAMS}
+
+
+def team_key(team):
+    """Abbreviation for a known team name or code, otherwise the folded name."""
+    code = (team or '').strip().upper()
+    code = TEAM_ALIASES.get(code, code)
+    if code in ABBREVIATIONS:
+        return code
+    folded = fold_name(team)
+    return TEAM_NAMES.get(folded, folded)
+
+
+class Reconciliation:
+    """Which league entry each player was matched to, and what could not be."""
+
+    def __init__(self):
+        # player id -> (league entry position, 'name' or 'team')
+        self.matches = {}
+        # (player id, player name, ['League Name (Team)', ...])
+        self.ambiguous = []
+        # (player id, player name)
+        self.unmatched = []
+        # league entry positions no player was matched to
+        self.unused = []
+
+
+def reconcile(players, league):
+    """Match (player id, name, team keys) triples to league.json entries."""
+    by_name = {}
+    for position, entry in enumerate(league):
+        by_name.setdefault(fold_name(entry.get('name', '')), []).append(position)
+
+    def describe(positions):
+        return [f"{league[position].get('name')} ({league[position].get('team') or 'no team'})" for position in positions]
+
+    result = Reconciliation()
+    claims = {}
+    for player_id, name, teams in players:
+        candidates = by_name.get(fold_name(name), [])
+        hinted = [position for position in candidates if team_key(league[position].get('team')) in teams]
+        if not candidates:
+            result.unmatched.append((player_id, name))
+            continue
+        if len(candidates) == 1:
+            claim = (candidates[0], 'team' if hinted else 'name')
+        elif len(hinted) == 1:
+            claim = (hinted[0], 'team')
+        else:
+            result.ambiguous.append((player_id, name, describe(candidates)))
+            continue
+        claims.setdefault(claim[0], []).append((player_id, name, claim[1]))
+
+    # Several players claiming one entry: only a single team-confirmed claim wins
+    for position, claimants in claims.items():
+        confirmed = [claimant for claimant in claimants if claimant[2] == 'team']
+        winner = claimants[0] if len(claimants) == 1 else confirmed[0] if len(confirmed) == 1 else None
+        for player_id, name, method in claimants:
+            if winner is not None and player_id == winner[0]:
+                result.matches[player_id] = (position, method)
+            else:
+                result.ambiguous.append((player_id, name, describe([position])))
+
+    matched = {position for position, _method in result.matches.values()}
+    result.unused = [position for position in range(len(league)) if position not in matched]
+    return result
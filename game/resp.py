@@ -0,0 +1,177 @@
+"""Minimal Redis protocol (RESP) client and an in-memory stand-in server.
+
+Only the commands the game state store needs are implemented: PING, GET,
+SET (with EX), DEL and FLUSHDB. The client speaks to a real Redis as well as
+to RespServer, which `manage.py run_state_server` runs locally.
+"""
+import socket
+import socketserver
+import threading
+import time
+
+
+class RespError(Exception):
+    """Error reply from the server."""
+
+
+def encode_command(*args):
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b''.join(parts)
+
+
+def read_reply(stream):
+    """Read one RESP reply from a buffered binary stream."""
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("Connection closed by server")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b'+':
+        return payload.decode()
+    if kind == b'-':
+        raise RespError(payload.decode())
+    if kind == b':':
+        return int(payload)
+    if kind == b'$':
+        length = int(payload)
+        if length < 0:
+            return None
+        data = stream.read(length + 2)
+        return data[:-2]
+    if kind == b'*':
+        count = int(payload)
+        return None if count < 0 else [read_reply(stream) for _ in range(count)]
+    raise RespError(f"Unknown reply type {kind!r}")
+
+
+class RespClient:
+    """Blocking RESP client with one connection per thread."""
+
+    def __init__(self, host='127.0.0.1', port=6379, db=0, timeout=5):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn = (sock, sock.makefile('rb'))
+            self._local.conn = conn
+            if self.db:
+                self._send(conn, 'SELECT', self.db)
+        return conn
+
+    def _send(self, conn, *args):
+        sock, stream = conn
+        sock.sendall(encode_command(*args))
+        return read_reply(stream)
+
+    def execute(self, *args):
+        """Send a command, reconnecting once if the connection was dropped."""
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                return self._send(conn, *args)
+            except (ConnectionError, OSError):
+                self.close()
+                if attempt:
+                    raise
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn[1].close()
+            conn[0].close()
+            self._local.conn = None
+
+    def get(self, key):
+        return self.execute('GET', key)
+
+    def set(self, key, value, ex=None):
+        if ex:
+            return self.execute('SET', key, value, 'EX', int(ex))
+        return self.execute('SET', key, value)
+
+    def delete(self, key):
+        return self.execute('DEL', key)
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                command = read_reply(self.rfile)
+            except (ConnectionError, OSError, RespError, ValueError):
+                return
+            if not isinstance(command, list) or not command:
+                self.wfile.write(b"-ERR protocol error\r\n")
+                return
+            self.wfile.write(self.server.dispatch([part if isinstance(part, bytes) else str(part).encode() for part in command]))
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    """In-memory key/value server answering the RespClient command subset."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=('127.0.0.1', 0)):
+        super().__init__(address, _RespHandler)
+        self.data = {}
+        self.lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def _live(self, key, now):
+        item = self.data.get(key)
+        if item is not None and item[1] is not None and item[1] <= now:
+            del self.data[key]
+            return None
+        return item
+
+    def dispatch(self, command):
+        name, args = command[0].upper(), command[1:]
+        now = time.monotonic()
+        with self.lock:
+            if name == b'PING':
+                return b"+PONG\r\n"
+            if name == b'SELECT':
+                return b"+OK\r\n"
+            if name == b'GET' and len(args) == 1:
+                item = self._live(args[0], now)
+                if item is None:
+                    return b"$-1\r\n"
+                return b"$%d\r\n%s\r\n" % (len(item[0]), item[0])
+            if name == b'SET' and len(args) in (2, 4):
+                expires = None
+                if len(args) == 4:
+                    if args[2].upper() != b'EX':
+                        return b"-ERR syntax error\r\n"
+                    expires = now + int(args[3])
+                self.data[args[0]] = (args[1], expires)
+                return b"+OK\r\n"
+            if name == b'DEL':
+                removed = sum(1 for key in args if self._live(key, now) is not None and self.data.pop(key, None))
+                return b":%d\r\n" % removed
+            if name == b'FLUSHDB':
+                self.data.clear()
+                return b"+OK\r\n"
+        return b"-ERR unknown command '%s'\r\n" % name
+
+    def start(self):
+        """Serve from a daemon thread; returns self for chaining."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,104 @@
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EXCLUDED_ATTRIBUTES = ('name', 'team')
+
+
+class AttributeMatrix:
+    """League ratings held as a (players x attributes) float matrix.
+
+    Attributes are taken from the first player, as the dict-based scoring
+    did. Non-numeric or missing values count as 0. Columns whose values are
+    all integers are reported back as ints so totals render unchanged.
+    """
+
+    def __init__(self, players):
+        sample_player = players[0] if players else {}
+        self.attributes = tuple(key for key in sample_player.keys() if key not in EXCLUDED_ATTRIBUTES)
+        self.matrix = np.zeros((len(players), len(self.attributes)), dtype=np.float64)
+        self.integral = np.ones(len(self.attributes), dtype=bool)
+
+        for row, player in enumerate(players):
+            for column, attr in enumerate(self.attributes):
+                value = player.get(attr, 0)
+                if isinstance(value, (int, float)):
+                    self.matrix[row, column] = value
+                    if isinstance(value, float):
+                        self.integral[column] = False
+                else:
+                    logger.warning(f"Non-numeric value for {attr} in {player.get('name')}: {value}")
+
+    @classmethod
+    def from_arrays(cls, attributes, matrix, integral):
+        """Wrap prebuilt arrays, such as the mapped ones of a compiled league file."""
+        attribute_matrix = cls.__new__(cls)
+        attribute_matrix.attributes = tuple(attributes)
+        attribute_matrix.matrix = matrix
+        attribute_matrix.integral = integral
+        return attribute_matrix
+
+    def team_totals(self, rosters):
+        """Sum attribute rows per team; rosters is a list of row-position lists."""
+        totals = np.zeros((len(rosters), len(self.attributes)), dtype=np.float64)
+        rows = [row for roster in rosters for row in roster]
+        if rows:
+            teams = np.repeat(np.arange(len(rosters)), [len(roster) for roster in rosters])
+            np.add.at(totals, teams, self.matrix[rows])
+        return totals
+
+    def to_python(self, totals):
+        """Convert a totals array to nested lists of ints/floats."""
+        columns = totals.T.tolist()
+        return [
+            [int(value) for value in column] if integral else column
+            for column, integral in zip(columns, self.integral.tolist())
+        ]
+
+
+def score_teams(attribute_matrix, player_nums, rosters):
+    """Build the team_scores dict for the given seats and roster rows.
+
+    A team wins an attribute outright when it holds the single highest
+    total; equal highest totals above zero are a tie and nobody scores.
+    """
+    totals = attribute_matrix.team_totals(rosters)
+    team_scores = {player_num: {'total_attributes_won': 0, 'details': {}} for player_num in player_nums}
+    if not player_nums:
+        return team_scores
+
+    max_values = totals.max(axis=0)
+    winners = totals.argmax(axis=0)
+    leaders = (totals == max_values).sum(axis=0)
+    ties = ((leaders > 1) & (max_values > 0)) | (max_values <= -1)
+
+    columns = attribute_matrix.to_python(totals)
+    keys = [str(player_num) for player_num in player_nums]
+    for attr, column, winner, tie in zip(attribute_matrix.attributes, columns, winners.tolist(), ties.tolist()):
+        if tie:
+            for i, player_num in enumerate(player_nums):
+                team_scores[player_num]['details'][attr] = {
+                    'won': None,  # Indicates tie
+                    'value': column[i],
+                    'vs_others': {keys[j]: column[j] for j in range(len(player_nums)) if j != i}
+                }
+            continue
+
+        winning_team = player_nums[winner]
+        team_scores[winning_team]['total_attributes_won'] += 1
+        for i, player_num in enumerate(player_nums):
+            if i == winner:
+                team_scores[player_num]['details'][attr] = {
+                    'won': True,
+                    'value': column[i],
+                    'vs_others': {keys[j]: column[j] for j in range(len(player_nums)) if j != i}
+                }
+            else:
+                team_scores[player_num]['details'][attr] = {
+                    'won': False,
+                    'value': column[i],
+                    'vs_others': {keys[winner]: column[winner]}
+                }
+    return team_scores
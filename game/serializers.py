@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Team, Player
+from .models import Team, Player, PlayerSeasonStats
 
 class PlayerSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,4 +16,56 @@ class TeamSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Team
-        fields = ['id', 'name', 'abbreviation', 'players'] 
\ No newline at end of file
+        fields = ['id', 'name', 'abbreviation', 'players'] 
+
+class PlayerSeasonStatsSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(source='player.name', read_only=True)
+
+    class Meta:
+        model = PlayerSeasonStats
+        fields = ['id', 'player', 'name', 'season', 'points', 'rebounds', 'assists', 'vorp']
+
+class ValuesSerializer:
+    """Read-only stand-in for a ModelSerializer whose fields are plain columns.
+
+    Rows are built straight from values_list() tuples, skipping model
+    instances and serializer fields entirely. `columns` maps fields whose
+    values come from another column or a related model.
+    """
+    model_serializer = None
+    columns = {}
+
+    def __init__(self, fields=None):
+        available = self.model_serializer.Meta.fields
+        if fields:
+            unknown = [name for name in fields if name not in available]
+            if unknown:
+                raise serializers.ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}"})
+            self.fields = list(dict.fromkeys(fields))
+        else:
+            self.fields = list(available)
+
+    def rows(self, queryset):
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in queryset.values_list(*self.lookups(fields))]
+
+    def lookups(self, fields):
+        return [self.columns.get(name, name) for name in fields]
+
+    def page(self, queryset, limit, after=None, key='id'):
+        """Return up to limit rows with key > after, plus the key to continue from."""
+        if after is not None:
+            queryset = queryset.filter(**{f'{key}__gt': after})
+        # The key column is selected last so zip() drops it when it was not requested
+        columns = self.fields if key in self.fields else self.fields + [key]
+        rows = list(queryset.order_by(key).values_list(*self.lookups(columns))[:limit + 1])
+        next_after = rows[limit - 1][columns.index(key)] if len(rows) > limit else None
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in rows[:limit]], next_after
+
+class PlayerValuesSerializer(ValuesSerializer):
+    model_serializer = PlayerSerializer
+
+class PlayerSeasonStatsValuesSerializer(ValuesSerializer):
+    model_serializer = PlayerSeasonStatsSerializer
+    columns = {'player': 'player_id', 'name': 'player__name'}
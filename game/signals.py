@@ -0,0 +1,37 @@
+import logging
+
+from django.core.cache import caches
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .catalog import catalog_changed
+from .models import Player, PlayerAttributes, Team
+
+logger = logging.getLogger(__name__)
+
+# Sent by LeagueDataStore when league.json is re-parsed with new content.
+league_data_changed = Signal()
+
+
+@receiver(league_data_changed)
+def clear_scoring_cache(sender, **kwargs):
+    """Drop cached game results scored against the previous league data."""
+    caches['scoring'].clear()
+    logger.info("League data changed; cleared cached scoring results")
+
+
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=PlayerAttributes)
+@receiver(post_delete, sender=PlayerAttributes)
+def player_or_team_changed(sender, **kwargs):
+    catalog_changed()
+
+
+@receiver(m2m_changed, sender=Player.teams.through)
+def team_membership_changed(sender, action, pk_set=None, **kwargs):
+    # add() sends an empty pk_set when every membership already existed
+    if action == 'post_clear' or (action in ('post_add', 'post_remove') and pk_set):
+        catalog_changed()
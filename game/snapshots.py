@@ -0,0 +1,143 @@
+"""Prebuilt, precompressed JSON for the team list and team detail API.
+
+A snapshot set holds the all-teams index and one roster per team, each with
+a strong ETag and gzip (and brotli, when installed) encodings. Sets are tied
+to the catalog token they were built from: `manage.py build_roster_snapshots`
+and the importers write them to settings.ROSTER_SNAPSHOT_DIR, and workers
+read that directory when its token matches their catalog, building the set
+in memory otherwise.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+
+from .catalog import get_catalog
+from .encoding import ENCODING_SUFFIXES, compress, dumps, preferred_encoding
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+
+
+class Snapshot:
+    """One JSON document, its encodings and its ETag."""
+
+    __slots__ = ('body', 'encoded', 'etag')
+
+    def __init__(self, body, encoded=None, etag=None):
+        self.body = body
+        self.encoded = compress(body) if encoded is None else encoded
+        self.etag = etag or f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    def variant(self, accept_encoding):
+        """Return (content_encoding, body, etag) for the best encoding the client accepts."""
+        encoding = preferred_encoding(accept_encoding, self.encoded)
+        if encoding is None:
+            return None, self.body, self.etag
+        return encoding, self.encoded[encoding], f'{self.etag[:-1]}-{encoding}"'
+
+
+class RosterSnapshots:
+    """The index and per-team roster snapshots for one catalog token."""
+
+    def __init__(self, token, index, teams):
+        self.token = token
+        self.index = index
+        self.teams = teams
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        index = Snapshot(dumps([
+            {'id': team_id, 'abbreviation': abbreviation, 'name': name}
+            for team_id, name, abbreviation in catalog.teams
+        ]))
+        teams = {team_id: Snapshot(dumps(catalog.team(team_id))) for team_id, _name, _abbr in catalog.teams}
+        return cls(catalog.token, index, teams)
+
+    @classmethod
+    def from_directory(cls, directory):
+        with open(os.path.join(directory, MANIFEST), encoding='utf-8') as file:
+            manifest = json.load(file)
+
+        def read(entry):
+            with open(os.path.join(directory, entry['path']), 'rb') as file:
+                body = file.read()
+            encoded = {}
+            for encoding in entry['encodings']:
+                with open(os.path.join(directory, entry['path'] + ENCODING_SUFFIXES[encoding]), 'rb') as file:
+                    encoded[encoding] = file.read()
+            return Snapshot(body, encoded, entry['etag'])
+
+        teams = {int(team_id): read(entry) for team_id, entry in manifest['teams'].items()}
+        return cls(manifest['token'], read(manifest['index']), teams)
+
+    def write(self, directory):
+        """Write every snapshot and its encodings, then the manifest last."""
+        os.makedirs(os.path.join(directory, 'teams'), exist_ok=True)
+
+        def write_file(path, data):
+            handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(handle, 'wb') as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+
+        def write_snapshot(path, snapshot):
+            write_file(os.path.join(directory, path), snapshot.body)
+            for encoding, data in snapshot.encoded.items():
+                write_file(os.path.join(directory, path + ENCODING_SUFFIXES[encoding]), data)
+            return {'path': path, 'etag': snapshot.etag, 'size': len(snapshot.body), 'encodings': sorted(snapshot.encoded)}
+
+        manifest = {
+            'token': self.token,
+            'index': write_snapshot('index.json', self.index),
+            'teams': {str(team_id): write_snapshot(f'teams/{team_id}.json', snapshot) for team_id, snapshot in self.teams.items()},
+        }
+        write_file(os.path.join(directory, MANIFEST), json.dumps(manifest, indent=2).encode())
+        return manifest
+
+
+def read_manifest_token(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding='utf-8') as file:
+            return json.load(file).get('token')
+    except (OSError, ValueError):
+        return None
+
+
+_snapshots = None
+_lock = threading.Lock()
+
+
+def get_roster_snapshots():
+    """Return snapshots for the current catalog, from disk when they match it."""
+    global _snapshots
+    catalog = get_catalog()
+    snapshots = _snapshots
+    if snapshots is not None and snapshots.token == catalog.token:
+        return snapshots
+    with _lock:
+        if _snapshots is None or _snapshots.token != catalog.token:
+            directory = settings.ROSTER_SNAPSHOT_DIR
+            if directory and read_manifest_token(directory) == catalog.token:
+                try:
+                    _snapshots = RosterSnapshots.from_directory(directory)
+                    logger.info(f"Loaded roster snapshots from {directory}")
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Could not read roster snapshots from {directory}: {e}")
+                    _snapshots = None
+            if _snapshots is None or _snapshots.token != catalog.token:
+                _snapshots = RosterSnapshots.from_catalog(catalog)
+        return _snapshots
+
+
+def write_roster_snapshots(directory=None):
+    """Build snapshots from the current catalog and write them; returns the manifest, or None when disabled."""
+    directory = directory or settings.ROSTER_SNAPSHOT_DIR
+    if not directory:
+        return None
+    return RosterSnapshots.from_catalog(get_catalog()).write(directory)
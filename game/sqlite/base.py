@@ -0,0 +1,72 @@
+"""SQLite backend tuned for many short requests from several worker processes.
+
+Every connection is set up with the pragmas below: WAL so readers and the
+single writer don't block each other, a busy timeout so a writer waits for
+the lock instead of failing with "database is locked", and a larger page
+cache and memory map. OPTIONS['pragmas'] overrides any of them (None leaves
+SQLite's default). With CONN_MAX_AGE connections outlive requests, so
+`PRAGMA optimize` runs between requests every OPTIONS['optimize_interval']
+seconds, and once more when a connection closes.
+"""
+import time
+
+from django.db import DatabaseError
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    # First, so the pragmas after it wait for locks too
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    # Durable as of the last checkpoint; cannot corrupt the database in WAL mode
+    'synchronous': 'NORMAL',
+    # Negative sizes are KiB
+    'cache_size': -20000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+OPTIMIZE_INTERVAL = 60 * 60
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        options = self.settings_dict['OPTIONS']
+        self.pragmas = {**DEFAULT_PRAGMAS, **options.get('pragmas', {})}
+        self.optimize_interval = options.get('optimize_interval', OPTIMIZE_INTERVAL)
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        params.pop('optimize_interval', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            if value is not None:
+                conn.execute(f"PRAGMA {name} = {value}")
+        self.optimized_at = time.monotonic()
+        return conn
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        if (
+            self.connection is not None
+            and self.optimize_interval is not None
+            and time.monotonic() - self.optimized_at >= self.optimize_interval
+        ):
+            self.optimize()
+
+    def optimize(self):
+        """Refresh the query planner's statistics for tables that need it."""
+        if self.connection is None or self.in_atomic_block:
+            return
+        try:
+            with self.wrap_database_errors:
+                self.connection.execute('PRAGMA optimize')
+        except DatabaseError:
+            pass
+        self.optimized_at = time.monotonic()
+
+    def _close(self):
+        if self.optimize_interval is not None:
+            self.optimize()
+        super()._close()
@@ -0,0 +1,326 @@
+"""Storage for in-progress game state, kept out of the session.
+
+The session only carries the game id; the state itself lives in the backend
+configured by settings.GAME_STATE and is written only when a view changes it.
+"""
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .encoding import dumps
+from .catalog import player_names
+from .models import SavedGame
+
+SESSION_KEY = 'game_id'
+# Revision of the state last saved for the session, for backends that return one
+REVISION_KEY = 'game_rev'
+
+POSITIONS = ('PG', 'SG', 'SF', 'PF', 'C')
+POSITION_INDEX = {position: i for i, position in enumerate(POSITIONS)}
+ROUNDS = 5
+
+
+class GameState:
+    """One draft: whose turn it is and which (player id, position) picks each seat holds.
+
+    The drafted-id set and per-seat position bitmasks are kept in step with the
+    rosters so pick validation never scans them. Only ids are stored; player
+    names are looked up on first use.
+    """
+
+    SCHEMA_VERSION = 1
+
+    __slots__ = ('num_players', 'current_player', 'turn', 'rosters', 'drafted', 'position_masks', '_names')
+
+    def __init__(self, num_players, current_player=1, turn=1, rosters=None, names=None):
+        self.num_players = num_players
+        self.current_player = current_player
+        self.turn = turn
+        self.rosters = rosters or [[] for _ in range(num_players)]
+        self.drafted = {player_id for roster in self.rosters for player_id, _position in roster}
+        self.position_masks = [
+            sum(1 << POSITION_INDEX[position] for _player_id, position in roster) for roster in self.rosters
+        ]
+        self._names = dict(names or {})
+
+    @property
+    def is_over(self):
+        return self.turn > ROUNDS
+
+    def validate(self, player_id, position):
+        """Return (is_valid, error_message) for the current seat drafting player_id at position."""
+        position = position.upper()
+        if position not in POSITION_INDEX:
+            return False, f"Unknown position {position}."
+        if self.position_masks[self.current_player - 1] & (1 << POSITION_INDEX[position]):
+            return False, f"You already drafted a {position}. Choose a different position."
+        if player_id in self.drafted:
+            name = self.player_names().get(player_id)
+            if name is None:
+                return False, "Player not found."
+            return False, f"{name} has already been drafted by another team."
+        return True, ""
+
+    def pick(self, player_id, position, name=None):
+        """Add a validated pick to the current seat and advance the turn."""
+        position = position.upper()
+        seat = self.current_player - 1
+        self.rosters[seat].append((player_id, position))
+        self.drafted.add(player_id)
+        self.position_masks[seat] |= 1 << POSITION_INDEX[position]
+        if name is not None:
+            self._names[player_id] = name
+        self.advance_turn()
+
+    def advance_turn(self):
+        if self.current_player < self.num_players:
+            self.current_player += 1
+        else:
+            self.current_player = 1
+            self.turn += 1
+
+    def player_names(self):
+        """Map drafted ids to names, fetching any not yet known from the catalog."""
+        missing = self.drafted.difference(self._names)
+        if missing:
+            self._names.update(player_names(missing))
+        return self._names
+
+    def teams_display_data(self):
+        names = self.player_names() if self.drafted else {}
+        return [
+            {
+                'player_num': seat,
+                'is_current': seat == self.current_player,
+                'roster': [
+                    {'id': player_id, 'name': names.get(player_id, ''), 'position': position}
+                    for player_id, position in roster
+                ],
+            }
+            for seat, roster in enumerate(self.rosters, 1)
+        ]
+
+    def to_dict(self):
+        """Compact form: each roster is a flat [id, position index, ...] list."""
+        return {
+            'v': self.SCHEMA_VERSION,
+            'n': self.num_players,
+            'c': self.current_player,
+            't': self.turn,
+            'r': [
+                [value for player_id, position in roster for value in (player_id, POSITION_INDEX[position])]
+                for roster in self.rosters
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if 'v' not in data:
+            return cls._from_legacy_dict(data)
+        if data['v'] != cls.SCHEMA_VERSION:
+            raise ValueError(f"Unsupported game state schema version {data['v']}")
+        rosters = [
+            [(flat[i], POSITIONS[flat[i + 1]]) for i in range(0, len(flat), 2)]
+            for flat in data['r']
+        ]
+        return cls(data['n'], data['c'], data['t'], rosters)
+
+    @classmethod
+    def _from_legacy_dict(cls, data):
+        """Read the pre-schema {'player_N_team': [{'id', 'name', 'position'}]} layout."""
+        num_players = data['num_players']
+        rosters, names = [], {}
+        for i in range(1, num_players + 1):
+            roster = data.get(f"player_{i}_team", [])
+            rosters.append([(player['id'], player['position'].upper()) for player in roster])
+            names.update((player['id'], player['name']) for player in roster if 'name' in player)
+        return cls(num_players, data['current_player'], data['turn'], rosters, names)
+
+
+class BaseGameStateBackend:
+    def __init__(self, timeout=None):
+        self.timeout = timeout or settings.SESSION_COOKIE_AGE
+
+    def load(self, game_id, revision=None):
+        """Return the stored state dict, or None.
+
+        revision is what save() returned for the latest state, when the
+        caller knows it; backends that return none ignore it.
+        """
+        raise NotImplementedError
+
+    def save(self, game_id, state):
+        """Store state; return a revision string, or None."""
+        raise NotImplementedError
+
+    def delete(self, game_id):
+        raise NotImplementedError
+
+
+class LocalGameStateBackend(BaseGameStateBackend):
+    """In-process store. Fastest, but every worker process sees only its own games."""
+
+    def __init__(self, max_entries=10000, **options):
+        super().__init__(**options)
+        self.max_entries = max_entries
+        self._games = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, game_id, revision=None):
+        with self._lock:
+            item = self._games.get(game_id)
+            if item is None:
+                return None
+            expires, data = item
+            if expires <= time.monotonic():
+                del self._games[game_id]
+                return None
+            self._games.move_to_end(game_id)
+        return json.loads(data)
+
+    def save(self, game_id, state):
+        data = dumps(state)
+        with self._lock:
+            self._games[game_id] = (time.monotonic() + self.timeout, data)
+            self._games.move_to_end(game_id)
+            while len(self._games) > self.max_entries:
+                self._games.popitem(last=False)
+
+    def delete(self, game_id):
+        with self._lock:
+            self._games.pop(game_id, None)
+
+
+class CachedDBGameStateBackend(BaseGameStateBackend):
+    """Write-through: every save goes to the SavedGame table and the cache,
+    loads hit the cache first.
+
+    Saves return the row's updated_at as the revision, which the session
+    carries. A cached copy of that revision is current, so loads only query
+    the table when this worker's cache is missing it or holds an older copy,
+    e.g. after another worker saved. With a cache every worker shares,
+    shared_cache=True trusts it even without a revision.
+    """
+
+    def __init__(self, cache_alias='default', key_prefix='game-state:', shared_cache=False, **options):
+        super().__init__(**options)
+        self.cache_alias = cache_alias
+        self.key_prefix = key_prefix
+        self.shared_cache = shared_cache
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def load(self, game_id, revision=None):
+        key = self.key_prefix + game_id
+        # (revision, state)
+        cached = self.cache.get(key)
+        if cached is not None and (cached[0] == revision or (self.shared_cache and revision is None)):
+            return cached[1]
+        row = SavedGame.objects.filter(game_id=game_id).values_list('updated_at', 'state').first()
+        if row is None:
+            return None
+        self.cache.set(key, (row[0].isoformat(), row[1]), self.timeout)
+        return row[1]
+
+    def save(self, game_id, state):
+        # Two single-statement writes rather than update_or_create(), whose
+        # read-then-write transaction deadlocks against other SQLite writers.
+        # update() skips auto_now, so the timestamp is set here.
+        updated_at = timezone.now()
+        if not SavedGame.objects.filter(game_id=game_id).update(state=state, updated_at=updated_at):
+            updated_at = SavedGame.objects.create(game_id=game_id, state=state).updated_at
+        revision = updated_at.isoformat()
+        self.cache.set(self.key_prefix + game_id, (revision, state), self.timeout)
+        return revision
+
+    def delete(self, game_id):
+        SavedGame.objects.filter(game_id=game_id).delete()
+        self.cache.delete(self.key_prefix + game_id)
+
+
+class RedisGameStateBackend(BaseGameStateBackend):
+    """Redis, or anything speaking its protocol such as `manage.py run_state_server`."""
+
+    def __init__(self, host='127.0.0.1', port=6379, db=0, key_prefix='game-state:', **options):
+        from .resp import RespClient
+
+        super().__init__(**options)
+        self.client = RespClient(host=host, port=port, db=db)
+        self.key_prefix = key_prefix
+
+    def load(self, game_id, revision=None):
+        data = self.client.get(self.key_prefix + game_id)
+        return None if data is None else json.loads(data)
+
+    def save(self, game_id, state):
+        self.client.set(self.key_prefix + game_id, dumps(state), ex=self.timeout)
+
+    def delete(self, game_id):
+        self.client.delete(self.key_prefix + game_id)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_game_state_backend():
+    """Return the process-wide backend described by settings.GAME_STATE."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                config = settings.GAME_STATE
+                _backend = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_game_state_backend(setting, **kwargs):
+    global _backend
+    if setting == 'GAME_STATE':
+        _backend = None
+
+
+def load_game_state(request):
+    """Return the GameState of the request's current game, or None."""
+    game_id = request.session.get(SESSION_KEY)
+    if not game_id:
+        return None
+    data = get_game_state_backend().load(game_id, request.session.get(REVISION_KEY))
+    if data is None:
+        return None
+    try:
+        return GameState.from_dict(data)
+    except (KeyError, ValueError):
+        return None
+
+
+def start_game_state(request, state):
+    """Store state under a new game id and point the session at it."""
+    game_id = uuid.uuid4().hex
+    request.session[SESSION_KEY] = game_id
+    remember_revision(request, get_game_state_backend().save(game_id, state.to_dict()))
+    return game_id
+
+
+def save_game_state(request, state):
+    """Persist a changed state for the request's current game."""
+    remember_revision(request, get_game_state_backend().save(request.session[SESSION_KEY], state.to_dict()))
+
+
+def remember_revision(request, revision):
+    if revision is None:
+        request.session.pop(REVISION_KEY, None)
+    else:
+        request.session[REVISION_KEY] = revision
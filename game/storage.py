@@ -0,0 +1,52 @@
+"""Static files storage that bundles, fingerprints and precompresses assets."""
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .encoding import ENCODING_SUFFIXES, compress
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.json', '.map', '.svg', '.txt', '.html')
+
+
+class BundledStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that also builds settings.STATIC_BUNDLES.
+
+    During collectstatic each bundle is concatenated from its collected
+    sources before hashing, so it gets a content-hashed name like any other
+    file. Every hashed text file then gets .gz (and, with brotli installed,
+    .br) siblings for the static view or a front-end server to send as is.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for bundle, sources in settings.STATIC_BUNDLES.items():
+                self.replace(bundle, self.concatenate(bundle, sources))
+                paths[bundle] = (self, bundle)
+
+        yield from super().post_process(paths, dry_run, **options)
+
+        if not dry_run:
+            for name in set(self.hashed_files.values()):
+                if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                    self.precompress(name)
+
+    def concatenate(self, bundle, sources):
+        # A lone ';' keeps a minified script without a trailing semicolon from running into the next
+        separator = b'\n;\n' if bundle.endswith('.js') else b'\n'
+        parts = []
+        for source in sources:
+            with self.open(source) as file:
+                parts.append(file.read())
+        return separator.join(parts)
+
+    def precompress(self, name):
+        with self.open(name) as file:
+            body = file.read()
+        for encoding, data in compress(body).items():
+            if len(data) < len(body):
+                self.replace(name + ENCODING_SUFFIXES[encoding], data)
+
+    def replace(self, name, content):
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(content))
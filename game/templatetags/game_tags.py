@@ -1,7 +1,28 @@
 from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from game.storage import BundledStaticFilesStorage
 
 register = template.Library()
 
+@register.simple_tag
+def asset_bundle(name):
+    """Script or stylesheet tags for a STATIC_BUNDLES entry.
+
+    Emits the single fingerprinted bundle when collectstatic built it, and
+    one tag per source file otherwise (DEBUG, or a plain storage).
+    """
+    if isinstance(staticfiles_storage, BundledStaticFilesStorage) and not settings.DEBUG:
+        names = [name]
+    else:
+        names = settings.STATIC_BUNDLES[name]
+    if name.endswith('.css'):
+        return format_html_join('\n', '<link rel="stylesheet" href="{}">', ((static(n),) for n in names))
+    return format_html_join('\n', '<script src="{}"></script>', ((static(n),) for n in names))
+
 @register.filter
 def get_range(value):
     return range(1, value + 1)
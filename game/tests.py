@@ -1,3 +1,1359 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.http import Http404
+from django.template import Context, Template
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.html import escape
+
+from .benchmarks.baseline import compare
+from .benchmarks.database import create_rosters
+from .benchmarks.load import LoadClient, play_game, summarize
+from .benchmarks.lookup import build_queries, linear_player_lookup
+from .benchmarks.primitives import drafted_state, synthetic_league
+from .benchmarks.scoring import legacy_team_scores, random_teams
+from .nba_api import NBAApiClient, OfflineCacheMiss, TokenBucket
+from .catalog import Catalog, bump_catalog_version, get_catalog, muted_catalog_signals, player_names
+from .models import CatalogVersion, ImportWatermark, Player, PlayerAttributes, PlayerSeasonStats, SavedGame, Team
+from .encoding import preferred_encoding
+from .league import LeagueData, LeagueDataStore, get_league_store
+from .reconcile import fold_name, reconcile, team_key
+from .leaguefile import CompiledLeagueData, LeagueFileError, open_league_file, write_league_file
+from .resp import RespServer
+from .serializers import PlayerSeasonStatsSerializer, TeamSerializer
+from .signals import league_data_changed
+from .sqlite.base import DatabaseWrapper
+from .state import CachedDBGameStateBackend, GameState, LocalGameStateBackend, RedisGameStateBackend, get_game_state_backend, save_game_state
+from .templatetags.game_tags import count_lost, count_tied, count_won
+from .views import calculate_comprehensive_team_scores, determine_winner_comprehensive, roster_signature, serve_static, summarize_scores
+
+
+class LeagueDataStoreTests(SimpleTestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        self.write([{'name': 'Luka Doncic', 'team': 'Dallas Mavericks', 'speed': 84}])
+
+    def write(self, players, mtime=None):
+        with open(self.path, 'w', encoding='utf-8') as file:
+            json.dump(players, file)
+        if mtime is not None:
+            os.utime(self.path, ns=(mtime, mtime))
+
+    def test_loads_once_and_shares_snapshot(self):
+        store = LeagueDataStore(self.path)
+        first = store.get()
+        second = store.get()
+        self.assertIs(first, second)
+        self.assertEqual(store.stats()['misses'], 1)
+        self.assertEqual(store.stats()['hits'], 1)
+        with self.assertRaises(TypeError):
+            first.players[0]['speed'] = 99
+
+    def test_counts_every_hit_across_threads(self):
+        store = LeagueDataStore(self.path)
+        store.get()
+
+        def read():
+            for _ in range(2000):
+                store.get()
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(store.stats()['hits'], 8 * 2000)
+        self.assertEqual(store.stats()['misses'], 1)
+
+    def test_reloads_when_content_changes(self):
+        store = LeagueDataStore(self.path)
+        first = store.get()
+        self.write([{'name': 'Luka Doncic', 'team': 'Dallas Mavericks', 'speed': 90}], mtime=10**18)
+        second = store.get()
+        self.assertIsNot(first, second)
+        self.assertEqual(second.players[0]['speed'], 90)
+        self.assertNotEqual(first.version, second.version)
+        self.assertEqual(store.reloads, 1)
+
+    def test_touch_without_change_keeps_snapshot(self):
+        store = LeagueDataStore(self.path)
+        first = store.get()
+        os.utime(self.path, ns=(10**18, 10**18))
+        self.assertIs(store.get(), first)
+        self.assertEqual(store.reloads, 0)
+        self.assertEqual(store.misses, 2)
+
+    def test_missing_file_returns_empty_league(self):
+        store = LeagueDataStore(self.path + '.missing')
+        self.assertEqual(store.get().players, ())
+
+
+class CompiledLeagueTests(SimpleTestCase):
+    players = [
+        {'name': 'Luka Doncic', 'team': 'Dallas Mavericks', 'speed': 84, 'hustle': 70.5, 'block': 'n/a'},
+        {'name': 'Nikola Jokić', 'team': 'Denver Nuggets', 'speed': 61, 'hustle': 88},
+        {'name': 'Free Agent', 'speed': 50, 'hustle': 50},
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.json_path = os.path.join(self.directory, 'league.json')
+        self.compiled_path = os.path.join(self.directory, 'league.bin')
+        self.write(self.players)
+
+    def write(self, players, mtime=None):
+        with open(self.json_path, 'w', encoding='utf-8') as file:
+            json.dump(players, file)
+        if mtime is not None:
+            os.utime(self.json_path, ns=(mtime, mtime))
+
+    def test_records_read_like_league_json(self):
+        write_league_file(self.compiled_path, self.players, 'a' * 40)
+        league = open_league_file(self.compiled_path)
+        self.assertEqual(league.version, 'a' * 40)
+        self.assertEqual(len(league), 3)
+        self.assertEqual(dict(league.players[0]), {'name': 'Luka Doncic', 'team': 'Dallas Mavericks', 'speed': 84, 'hustle': 70.5, 'block': 0})
+        self.assertEqual(league.players[1]['name'], 'Nikola Jokić')
+        self.assertEqual(league.players[2]['team'], '')
+        self.assertIs(league.find('jokić'), league.players[1])
+        with self.assertRaises(TypeError):
+            league.players[0]['speed'] = 99
+
+    def test_scores_match_parsed_league(self):
+        source = get_league_store().get()
+        players = [dict(player) for player in source.players]
+        write_league_file(self.compiled_path, players, source.version)
+        compiled = open_league_file(self.compiled_path)
+        parsed = LeagueData(players)
+        for num_teams in (2, 4):
+            teams = random_teams(parsed.players, num_teams, seed=num_teams)
+            self.assertEqual(calculate_comprehensive_team_scores(teams, compiled), calculate_comprehensive_team_scores(teams, parsed))
+
+    def test_store_compiles_once_and_maps_the_file(self):
+        first = LeagueDataStore(self.json_path, self.compiled_path).get()
+        self.assertIsInstance(first, CompiledLeagueData)
+        with mock.patch('game.league.json.loads') as parse:
+            second = LeagueDataStore(self.json_path, self.compiled_path).get()
+        parse.assert_not_called()
+        self.assertEqual(second.version, first.version)
+
+    def test_store_recompiles_when_league_json_changes(self):
+        store = LeagueDataStore(self.json_path, self.compiled_path)
+        first = store.get()
+        self.write([{'name': 'Luka Doncic', 'team': 'Dallas Mavericks', 'speed': 90}], mtime=10**18)
+        second = store.get()
+        self.assertNotEqual(first.version, second.version)
+        self.assertEqual(second.players[0]['speed'], 90)
+        self.assertEqual(open_league_file(self.compiled_path).version, second.version)
+
+    def test_damaged_file_is_rebuilt(self):
+        version = LeagueDataStore(self.json_path, self.compiled_path).get().version
+        with open(self.compiled_path, 'r+b') as file:
+            file.truncate(200)
+        with self.assertRaises(LeagueFileError):
+            open_league_file(self.compiled_path)
+        league = LeagueDataStore(self.json_path, self.compiled_path).get()
+        self.assertEqual(league.version, version)
+        self.assertEqual(league.players[1]['speed'], 61)
+
+
+class PlayerIndexTests(SimpleTestCase):
+    players = [
+        {'name': 'Jalen Williams'},
+        {'name': 'Jaylin Williams'},
+        {'name': 'Gary Trent Jr.'},
+        {'name': 'Al Horford'},
+        {'name': 'Jo'},
+    ]
+
+    def test_matches_linear_scan(self):
+        league = LeagueData(self.players)
+        queries = ['jalen williams', ' JAYLIN WILLIAMS ', 'Gary Trent', 'Williams', 'al',
+                   'Joel Embiid', 'Nobody Here', 'Jo', 'j', '']
+        for kind_queries in build_queries(league.players).values():
+            queries.extend(kind_queries)
+        for query in queries:
+            with self.subTest(query=query):
+                self.assertIs(league.find(query), linear_player_lookup(query, league.players))
+
+    def test_empty_league(self):
+        self.assertIsNone(LeagueData([]).find('Luka Doncic'))
+
+
+class ComprehensiveScoringTests(SimpleTestCase):
+    def assertMatchesLegacy(self, teams, league):
+        self.assertEqual(
+            calculate_comprehensive_team_scores(teams, league),
+            legacy_team_scores(teams, league.players),
+        )
+
+    def test_matches_legacy_on_league_json(self):
+        league = get_league_store().get()
+        for num_teams in (2, 3, 4):
+            for seed in range(3):
+                with self.subTest(num_teams=num_teams, seed=seed):
+                    self.assertMatchesLegacy(random_teams(league.players, num_teams, seed=seed), league)
+
+    def test_ties_empty_rosters_and_unknown_players(self):
+        league = LeagueData([
+            {'name': 'A One', 'team': 'X', 'speed': 10, 'block': 0, 'hustle': 1.5},
+            {'name': 'B Two', 'team': 'X', 'speed': 10, 'block': 0, 'hustle': 'n/a'},
+            {'name': 'C Three', 'team': 'Y', 'speed': 4, 'block': 3},
+        ])
+        teams = [
+            {'player_num': 1, 'roster': [{'name': 'A One'}]},
+            {'player_num': 2, 'roster': [{'name': 'B Two'}, {'name': 'Nobody'}]},
+            {'player_num': 3, 'roster': []},
+        ]
+        self.assertMatchesLegacy(teams, league)
+        team_scores, _ = calculate_comprehensive_team_scores(teams, league)
+        self.assertIsNone(team_scores[1]['details']['speed']['won'])
+        self.assertIsInstance(team_scores[1]['details']['speed']['value'], int)
+        self.assertTrue(team_scores[1]['details']['block']['won'])
+
+
+class FinalResultCacheTests(TestCase):
+    def setUp(self):
+        caches['scoring'].clear()
+        league = get_league_store().get()
+        self.teams = random_teams(league.players, 2)
+        state = GameState(2)
+        for picks in zip(*(team['roster'] for team in self.teams)):
+            for player in picks:
+                saved = Player.objects.create(player_id=f"league{player['id']}", name=player['name'])
+                state.pick(saved.id, player['position'])
+        self.client.post(reverse('new_game'), {'num_players': 2})
+        get_game_state_backend().save(self.client.session['game_id'], state.to_dict())
+
+    def test_repeat_views_are_scored_once(self):
+        with mock.patch('game.views.determine_winner_comprehensive', wraps=determine_winner_comprehensive) as scorer:
+            first = self.client.get(reverse('game_over'))
+            second = self.client.get(reverse('game_over'))
+        self.assertEqual(scorer.call_count, 1)
+        self.assertEqual(first.context['winner'], second.context['winner'])
+        self.assertEqual(first.context['team_scores'], second.context['team_scores'])
+
+    def test_signature_ignores_draft_order_but_not_league_version(self):
+        reordered = [dict(team, roster=list(reversed(team['roster']))) for team in self.teams]
+        self.assertEqual(roster_signature(self.teams, 'v1'), roster_signature(reordered, 'v1'))
+        self.assertNotEqual(roster_signature(self.teams, 'v1'), roster_signature(self.teams, 'v2'))
+
+    def test_league_change_clears_results(self):
+        self.client.get(reverse('game_over'))
+        league_data_changed.send(sender=None)
+        with mock.patch('game.views.determine_winner_comprehensive', wraps=determine_winner_comprehensive) as scorer:
+            self.client.get(reverse('game_over'))
+        self.assertEqual(scorer.call_count, 1)
+
+    def test_results_fragment_is_cached(self):
+        first = self.client.get(reverse('game_over'))
+        with mock.patch('django.template.loader_tags.IncludeNode.render') as include:
+            second = self.client.get(reverse('game_over'))
+        include.assert_not_called()
+        self.assertEqual(first.content, second.content)
+        self.assertContains(second, 'attribute-name')
+
+    def test_results_fragment_follows_drafted_slots(self):
+        first = self.client.get(reverse('game_over'))
+        state = GameState.from_dict(get_game_state_backend().load(self.client.session['game_id']))
+        (first_id, first_position), (second_id, second_position) = state.rosters[0][:2]
+        state.rosters[0][:2] = [(first_id, second_position), (second_id, first_position)]
+        get_game_state_backend().save(self.client.session['game_id'], state.to_dict())
+        name = escape(Player.objects.get(pk=first_id).name)
+        self.assertContains(first, f"<strong>{name}</strong> ({first_position})")
+        self.assertContains(self.client.get(reverse('game_over')), f"<strong>{name}</strong> ({second_position})")
+
+
+class ScoreSummaryTests(SimpleTestCase):
+    def test_counts_match_template_filters(self):
+        league = get_league_store().get()
+        for num_teams in (2, 3, 4):
+            teams = random_teams(league.players, num_teams, seed=num_teams)
+            winner, team_scores, all_attributes = determine_winner_comprehensive(teams, league)
+            rows = summarize_scores(teams, team_scores, all_attributes, winner)
+            with self.subTest(num_teams=num_teams):
+                self.assertEqual(len(rows), len(all_attributes))
+                for team in teams:
+                    self.assertEqual(team['won_count'], count_won(team['score_details']))
+                    self.assertEqual(team['lost_count'], count_lost(team['score_details']))
+                    self.assertEqual(team['tied_count'], count_tied(team['score_details']))
+                    self.assertEqual(team['is_winner'], team['player_num'] == winner)
+
+
+class StoredAttributesTests(TestCase):
+    def setUp(self):
+        caches['scoring'].clear()
+        self.league = get_league_store().get()
+        self.teams = random_teams(self.league.players, 3, seed=1)
+        # The same rosters with database ids, as GameState reports them
+        self.db_teams = []
+        for team in self.teams:
+            roster = []
+            for player in team['roster']:
+                saved = Player.objects.create(player_id=f"league{player['id']}", name=player['name'])
+                roster.append(dict(player, id=saved.id))
+            self.db_teams.append(dict(team, roster=roster))
+
+    def import_league(self, players=None):
+        if players is None:
+            call_command('import_league_attributes', stdout=StringIO())
+            return
+        handle, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(handle, 'w') as file:
+            json.dump(players, file)
+        self.addCleanup(os.remove, path)
+        out = StringIO()
+        call_command('import_league_attributes', file=path, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_writes_report_only(self):
+        handle, path = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        call_command('import_league_attributes', dry_run=True, report=path, stdout=StringIO())
+        with open(path, encoding='utf-8') as file:
+            report = json.load(file)
+        self.assertEqual(len(report['matched']), 15)
+        self.assertEqual(len(report['unused_league_entries']), len(self.league) - 15)
+        self.assertFalse(PlayerAttributes.objects.exists())
+
+    def test_import_matches_players_by_name(self):
+        self.import_league()
+        self.assertEqual(PlayerAttributes.objects.count(), 15)
+        player = self.teams[0]['roster'][0]
+        stored = PlayerAttributes.objects.get(player__name=player['name'])
+        self.assertEqual(stored.ratings()['speed'], self.league.find(player['name'])['speed'])
+
+    def test_reimport_updates_and_drops_players_no_longer_matched(self):
+        name = self.teams[0]['roster'][0]['name']
+        self.import_league()
+        out = self.import_league([{'name': name, 'team': 'X', 'speed': 12.6, 'block': 'n/a'}])
+        stored = PlayerAttributes.objects.get()
+        self.assertEqual((stored.league_name, stored.speed, stored.block), (name, 13, 0))
+        self.assertIn('No league entry for (14)', out)
+
+    def test_scores_match_league_file_in_one_query(self):
+        self.import_league()
+        expected = calculate_comprehensive_team_scores(self.teams, self.league)
+        get_catalog()
+        with self.assertNumQueries(1):
+            self.assertEqual(calculate_comprehensive_team_scores(self.db_teams), expected)
+
+    def test_players_without_attributes_score_nothing(self):
+        self.import_league()
+        missing = self.db_teams[1]['roster'].pop(2)
+        PlayerAttributes.objects.filter(player_id=missing['id']).delete()
+        self.teams[1]['roster'].pop(2)
+        with self.assertLogs('game.views', 'WARNING'):
+            scores = calculate_comprehensive_team_scores(self.db_teams + [dict(self.db_teams[1], player_num=4, roster=[missing])])
+        self.assertEqual(scores[0][4]['total_attributes_won'], 0)
+        expected = calculate_comprehensive_team_scores(self.teams + [dict(self.teams[1], player_num=4, roster=[])], self.league)
+        self.assertEqual(scores, expected)
+
+    def test_league_file_is_used_until_first_import(self):
+        self.assertEqual(
+            calculate_comprehensive_team_scores(self.db_teams),
+            calculate_comprehensive_team_scores(self.teams, self.league),
+        )
+
+    def test_attribute_change_rescores_game(self):
+        self.import_league()
+        token = get_catalog().token
+        player_id = self.db_teams[0]['roster'][0]['id']
+        PlayerAttributes.objects.filter(player_id=player_id).update(speed=0)
+        PlayerAttributes.objects.get(player_id=player_id).save()
+        self.assertNotEqual(get_catalog().token, token)
+
+
+class ReconcileTests(SimpleTestCase):
+    league = [
+        {'name': 'Nikola Jokić', 'team': 'Denver Nuggets'},
+        {'name': 'Jaren Jackson Jr.', 'team': 'Memphis Grizzlies'},
+        {'name': 'De’Aaron Fox', 'team': 'San Antonio Spurs'},
+        {'name': 'Kevin Porter', 'team': 'Milwaukee Bucks'},
+        {'name': 'Kevin Porter', 'team': 'Los Angeles Clippers'},
+        {'name': 'Unclaimed Entry', 'team': 'Utah Jazz'},
+    ]
+
+    def test_fold_name(self):
+        self.assertEqual(fold_name('  Nikola JOKIĆ '), 'nikola jokic')
+        self.assertEqual(fold_name('De’Aaron Fox'), "deaaron fox")
+        self.assertEqual(fold_name("D'Angelo Russell"), fold_name('D’Angelo Russell'))
+        self.assertEqual(fold_name('Jaren Jackson Jr.'), 'jaren jackson')
+        self.assertEqual(fold_name('Karl-Anthony Towns'), 'karl anthony towns')
+        self.assertEqual(fold_name('Mathias Lessort Ø'), 'mathias lessort o')
+
+    def test_team_key(self):
+        self.assertEqual(team_key('Phoenix Suns'), 'PHO')
+        self.assertEqual(team_key('phx'), 'PHO')
+        self.assertEqual(team_key('Springfield Isotopes'), 'springfield isotopes')
+
+    def test_names_and_team_hints(self):
+        players = [
+            (1, 'Nikola Jokic', set()),
+            (2, 'Jaren Jackson', {'MEM'}),
+            (3, "De'Aaron Fox", set()),
+            (4, 'Kevin Porter', {'LAC'}),
+            (5, 'Kevin Porter', set()),
+            (6, 'Nobody', set()),
+        ]
+        result = reconcile(players, self.league)
+        self.assertEqual(result.matches, {1: (0, 'name'), 2: (1, 'team'), 3: (2, 'name'), 4: (4, 'team')})
+        self.assertEqual([(player_id, candidates) for player_id, _name, candidates in result.ambiguous],
+                         [(5, ['Kevin Porter (Milwaukee Bucks)', 'Kevin Porter (Los Angeles Clippers)'])])
+        self.assertEqual(result.unmatched, [(6, 'Nobody')])
+        self.assertEqual(result.unused, [3, 5])
+
+    def test_players_sharing_an_entry_need_a_team(self):
+        players = [(1, 'Nikola Jokic', {'DEN'}), (2, 'Nikola Jokić', set())]
+        result = reconcile(players, self.league)
+        self.assertEqual(result.matches, {1: (0, 'team')})
+        self.assertEqual([player_id for player_id, _name, _candidates in result.ambiguous], [2])
+        result = reconcile([(1, 'Nikola Jokic', set()), (2, 'Nikola Jokić', set())], self.league)
+        self.assertEqual(result.matches, {})
+
+
+class AcceptEncodingTests(SimpleTestCase):
+    def test_q_values(self):
+        both = {'br', 'gzip'}
+        self.assertEqual(preferred_encoding('br;q=0, gzip', both), 'gzip')
+        self.assertEqual(preferred_encoding('br;q=0.5, gzip;q=0.8', both), 'gzip')
+        self.assertEqual(preferred_encoding('gzip, br', both), 'br')
+        self.assertEqual(preferred_encoding('*', both), 'br')
+        self.assertEqual(preferred_encoding('*;q=0, gzip', both), 'gzip')
+        self.assertEqual(preferred_encoding('GZIP;Q=1', both), 'gzip')
+        self.assertIsNone(preferred_encoding('gzip;q=0', {'gzip'}))
+        self.assertIsNone(preferred_encoding('gzip;q=nope, identity', both))
+        self.assertIsNone(preferred_encoding('', both))
+
+
+class CatalogTests(TestCase):
+    def setUp(self):
+        self.team = Team.objects.create(name='Dallas Mavericks', abbreviation='DAL')
+        self.player = Player.objects.create(player_id='doncilu01', name='Luka Doncic', position='PG')
+
+    def test_signals_refresh_catalog(self):
+        self.assertEqual(get_catalog().team(self.team.id)['players'], [])
+        self.player.teams.add(self.team)
+        self.assertEqual(get_catalog().team(self.team.id)['players'], [{'id': self.player.id, 'name': 'Luka Doncic', 'position': 'PG'}])
+        self.player.name = 'Luka Dončić'
+        self.player.save()
+        self.assertEqual(get_catalog().player_names([self.player.id, 0]), {self.player.id: 'Luka Dončić'})
+
+    def test_reads_are_free_until_version_moves(self):
+        get_catalog()
+        with self.assertNumQueries(0):
+            self.assertEqual(player_names([self.player.id]), {self.player.id: 'Luka Doncic'})
+        # Another worker bulk-imports and bumps the token without signalling this process
+        Player.objects.filter(pk=self.player.pk).update(name='Renamed')
+        CatalogVersion.objects.filter(pk=1).update(token='elsewhere')
+        self.assertEqual(player_names([self.player.id]), {self.player.id: 'Luka Doncic'})
+        with override_settings(CATALOG_CHECK_INTERVAL=0):
+            self.assertEqual(player_names([self.player.id]), {self.player.id: 'Renamed'})
+
+    def test_memberships_of_players_deleted_mid_load_are_skipped(self):
+        players = list(Player.objects.order_by('id').values_list('id', 'name', 'position'))
+        teams = Team.objects.order_by('id').values_list('id', 'name', 'abbreviation')
+        memberships = [(self.team.id, self.player.id), (self.team.id, 999)]
+        catalog = Catalog('token', players, teams, memberships)
+        self.assertEqual([player['id'] for player in catalog.team(self.team.id)['players']], [self.player.id])
+
+    def test_unchanged_membership_does_not_bump(self):
+        self.player.teams.add(self.team)
+        with mock.patch('game.catalog.bump_catalog_version') as bump:
+            self.player.teams.add(self.team)
+        bump.assert_not_called()
+
+    def test_muted_signals_bump_once_at_the_end(self):
+        token = get_catalog().token
+        with mock.patch('game.catalog.bump_catalog_version', wraps=bump_catalog_version) as bump:
+            with muted_catalog_signals():
+                for i in range(3):
+                    Player.objects.create(player_id=f"p{i}", name=f"Player {i}").teams.add(self.team)
+                bump.assert_not_called()
+        bump.assert_called_once()
+        self.assertNotEqual(CatalogVersion.objects.get().token, token)
+        self.assertEqual(len(get_catalog().team(self.team.id)['players']), 3)
+
+
+class GameStateTests(TestCase):
+    def test_validation_tracks_positions_and_drafted_players(self):
+        state = GameState(2)
+        self.assertEqual(state.validate(7, 'pg'), (True, ''))
+        state.pick(7, 'pg', 'Luka Doncic')
+        self.assertEqual(state.validate(8, 'PG'), (True, ''))
+        self.assertEqual(state.validate(7, 'SG'), (False, 'Luka Doncic has already been drafted by another team.'))
+        state.pick(8, 'PG', 'LeBron James')
+        self.assertEqual(state.validate(9, 'PG'), (False, 'You already drafted a PG. Choose a different position.'))
+        self.assertEqual(state.validate(9, 'G'), (False, 'Unknown position G.'))
+        self.assertEqual((state.current_player, state.turn), (1, 2))
+
+    def test_round_trip_is_compact_and_resolves_names(self):
+        luka = Player.objects.create(player_id='doncilu01', name='Luka Doncic')
+        state = GameState(2)
+        state.pick(luka.id, 'C')
+        data = state.to_dict()
+        self.assertEqual(data, {'v': 1, 'n': 2, 'c': 2, 't': 1, 'r': [[luka.id, 4], []]})
+
+        loaded = GameState.from_dict(json.loads(json.dumps(data)))
+        self.assertEqual(loaded.drafted, {luka.id})
+        get_catalog()
+        with self.assertNumQueries(0):
+            teams = loaded.teams_display_data()
+        self.assertEqual(teams[0]['roster'], [{'id': luka.id, 'name': 'Luka Doncic', 'position': 'C'}])
+        self.assertTrue(teams[1]['is_current'])
+
+    def test_reads_legacy_layout(self):
+        state = GameState.from_dict({
+            'current_player': 1, 'turn': 2, 'num_players': 2,
+            'player_1_team': [{'id': 3, 'name': 'Luka Doncic', 'position': 'PG'}],
+            'player_2_team': [{'id': 4, 'name': 'LeBron James', 'position': 'SF'}],
+        })
+        self.assertEqual(state.to_dict()['r'], [[3, 0], [4, 2]])
+        with self.assertNumQueries(0):
+            self.assertEqual(state.teams_display_data()[1]['roster'][0]['name'], 'LeBron James')
+
+    def test_rejects_unknown_schema_version(self):
+        with self.assertRaises(ValueError):
+            GameState.from_dict({'v': 99})
+
+
+class GameStateBackendTests(TestCase):
+    state = {'current_player': 2, 'turn': 3, 'num_players': 2, 'player_1_team': [{'id': 1, 'name': 'Luka Doncic', 'position': 'PG'}]}
+
+    def check_round_trip(self, backend):
+        self.assertIsNone(backend.load('missing'))
+        backend.save('game1', self.state)
+        loaded = backend.load('game1')
+        self.assertEqual(loaded, self.state)
+        loaded['turn'] = 4
+        self.assertEqual(backend.load('game1')['turn'], 3)
+        backend.delete('game1')
+        self.assertIsNone(backend.load('game1'))
+
+    def test_local(self):
+        self.check_round_trip(LocalGameStateBackend())
+
+    def test_local_evicts_oldest_and_expired(self):
+        backend = LocalGameStateBackend(max_entries=2, timeout=60)
+        for game_id in ('a', 'b', 'c'):
+            backend.save(game_id, self.state)
+        self.assertIsNone(backend.load('a'))
+        with mock.patch('game.state.time.monotonic', return_value=10 ** 9):
+            self.assertIsNone(backend.load('c'))
+
+    def test_cached_db(self):
+        self.check_round_trip(CachedDBGameStateBackend())
+
+    def test_cached_db_falls_back_to_table(self):
+        backend = CachedDBGameStateBackend()
+        backend.save('game1', self.state)
+        backend.cache.clear()
+        self.assertEqual(backend.load('game1'), self.state)
+        self.assertEqual(SavedGame.objects.get().state, self.state)
+
+    def test_cached_db_sees_saves_from_other_workers(self):
+        backend = CachedDBGameStateBackend()
+        revision = backend.save('game1', self.state)
+        with self.assertNumQueries(0):
+            self.assertEqual(backend.load('game1', revision), self.state)
+        # Another worker's save reaches the table and the session, but not this worker's cache
+        other_worker = CachedDBGameStateBackend(cache_alias='scoring')
+        self.addCleanup(other_worker.cache.clear)
+        revision = other_worker.save('game1', dict(self.state, turn=4))
+        with self.assertNumQueries(1):
+            self.assertEqual(backend.load('game1', revision)['turn'], 4)
+        with self.assertNumQueries(0):
+            self.assertEqual(backend.load('game1', revision)['turn'], 4)
+        # Without a revision the table decides, unless the cache is shared
+        with self.assertNumQueries(1):
+            self.assertEqual(backend.load('game1')['turn'], 4)
+        shared = CachedDBGameStateBackend(shared_cache=True)
+        with self.assertNumQueries(0):
+            self.assertEqual(shared.load('game1')['turn'], 4)
+
+    def test_draft_requests_skip_the_table_on_cache_hits(self):
+        with override_settings(GAME_STATE={'BACKEND': 'game.state.CachedDBGameStateBackend', 'OPTIONS': {}}):
+            self.client.post(reverse('new_game'), {'num_players': 2})
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(reverse('wheel')).status_code, 200)
+
+    def test_redis_protocol(self):
+        server = RespServer().start()
+        self.addCleanup(server.stop)
+        backend = RedisGameStateBackend(port=server.port)
+        self.addCleanup(backend.client.close)
+        self.check_round_trip(backend)
+
+
+@override_settings(GAME_STATE={'BACKEND': 'game.state.LocalGameStateBackend', 'OPTIONS': {}})
+class DraftStateTests(TestCase):
+    def setUp(self):
+        team = Team.objects.create(name='Dallas Mavericks', abbreviation='DAL')
+        self.player = Player.objects.create(player_id='doncilu01', name='Luka Doncic', position='PG')
+        self.player.teams.add(team)
+        self.client.post(reverse('new_game'), {'num_players': 2})
+
+    def test_session_carries_only_game_id(self):
+        self.assertEqual(list(self.client.session.keys()), ['game_id'])
+
+    def test_reads_do_not_touch_database_or_session(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('wheel'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 0)
+        self.assertNotIn('sessionid', response.cookies)
+
+    def pick(self, player_id, position='PG'):
+        return self.client.post(
+            reverse('select_player_action'),
+            json.dumps({'player_id': player_id, 'position': position}),
+            content_type='application/json',
+        )
+
+    def test_pick_runs_no_queries_with_warm_catalog(self):
+        get_catalog()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.pick(self.player.id).status_code, 200)
+
+    def test_unknown_player(self):
+        response = self.pick(self.player.id + 1)
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(DEBUG=True)
+    def test_debug_headers_report_queries(self):
+        # Middleware is loaded on a client's first request, so start a new one
+        cookies = self.client.cookies
+        self.client = Client()
+        self.client.cookies = cookies
+        get_catalog()
+        response = self.pick(self.player.id)
+        self.assertEqual(response['X-Query-Count'], '0')
+        self.assertIn('db;desc="0 queries";dur=', response['Server-Timing'])
+
+    def test_no_debug_headers_in_production(self):
+        self.assertNotIn('X-Query-Count', self.client.get(reverse('wheel')))
+
+    def test_pick_is_saved(self):
+        with mock.patch('game.views.save_game_state', wraps=save_game_state) as save:
+            response = self.client.post(
+                reverse('select_player_action'),
+                json.dumps({'player_id': self.player.id, 'position': 'PG'}),
+                content_type='application/json',
+            )
+            self.client.post(
+                reverse('select_player_action'),
+                json.dumps({'player_id': self.player.id, 'position': 'PG'}),
+                content_type='application/json',
+            )
+        self.assertEqual(response.json(), {'redirect_url': '/wheel/'})
+        self.assertEqual(save.call_count, 1)
+        state = GameState.from_dict(get_game_state_backend().load(self.client.session['game_id']))
+        self.assertEqual(state.rosters, [[(self.player.id, 'PG')], []])
+        self.assertEqual(state.current_player, 2)
+
+
+@override_settings(ROSTER_SNAPSHOT_DIR=None)
+class PopulateRealNbaTests(TestCase):
+    totals = [
+        {'playerId': 'doncilu01', 'playerName': 'Luka Doncic', 'team': 'DAL', 'position': 'PG'},
+        {'playerId': 'doncilu01', 'playerName': 'Luka Doncic', 'team': 'LAL', 'position': 'PG'},
+        {'playerId': 'doncilu01', 'playerName': 'Luka Doncic', 'team': '2TM', 'position': 'PG'},
+        {'playerId': 'jamesle01', 'playerName': 'LeBron James', 'team': 'LAL', 'position': None},
+        {'playerId': 'unknown01', 'playerName': 'Nobody', 'team': 'XYZ', 'position': 'C'},
+    ]
+    advanced = [
+        {'playerId': 'doncilu01', 'playerName': 'Luka Doncic', 'vorp': 4.5},
+        {'playerId': 'jamesle01', 'playerName': 'LeBron James', 'vorp': '3.1'},
+        {'playerId': 'missing01', 'playerName': 'Not Imported', 'vorp': 1.0},
+    ]
+
+    def run_import(self, seasons='2024', totals=None, advanced=None, **options):
+        with mock.patch('game.management.commands.populate_real_nba.Command.fetch_players_for_season', return_value=totals or self.totals), \
+                mock.patch('game.management.commands.populate_real_nba.Command.fetch_advanced_stats_for_season', return_value=advanced or self.advanced):
+            call_command('populate_real_nba', seasons=seasons, stdout=StringIO(), stderr=StringIO(), **options)
+
+    def test_import_writes_roster_snapshots(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with override_settings(ROSTER_SNAPSHOT_DIR=directory):
+            self.run_import()
+        with open(os.path.join(directory, 'manifest.json')) as file:
+            manifest = json.load(file)
+        self.assertEqual(manifest['token'], get_catalog().token)
+        dal = str(Team.objects.get(abbreviation='DAL').id)
+        with open(os.path.join(directory, manifest['teams'][dal]['path']), 'rb') as file:
+            self.assertEqual([player['name'] for player in json.loads(file.read())['players']], ['Luka Doncic'])
+
+    def test_import_upserts_players_memberships_and_stats(self):
+        self.run_import('2024,2023')
+        luka = Player.objects.get(player_id='doncilu01')
+        self.assertEqual(luka.position, 'PG')
+        self.assertEqual(sorted(luka.teams.values_list('abbreviation', flat=True)), ['DAL', 'LAL'])
+        self.assertEqual(Player.objects.count(), 2)
+        self.assertEqual(PlayerSeasonStats.objects.get(player=luka, season=2023).vorp, 4.5)
+        self.assertEqual(PlayerSeasonStats.objects.filter(player__player_id='jamesle01').count(), 2)
+
+    def test_reimport_is_idempotent_and_keeps_positions(self):
+        self.run_import()
+        Player.objects.filter(player_id='jamesle01').update(position='SF')
+        self.run_import()
+        self.assertEqual(Player.objects.get(player_id='jamesle01').position, 'SF')
+        self.assertEqual(Player.teams.through.objects.count(), 3)
+        self.assertEqual(PlayerSeasonStats.objects.count(), 2)
+
+    def test_incremental_import_only_writes_changed_players(self):
+        from .management.commands.populate_real_nba import Command
+        self.run_import()
+        self.assertEqual(ImportWatermark.objects.get(source='populate_real_nba:playertotals', season=2024).rows_seen, 5)
+
+        advanced = [dict(row) for row in self.advanced]
+        advanced[1]['vorp'] = 5.0
+        saved = {}
+        save_players, save_stats = Command.save_players, Command.save_advanced_stats
+
+        def record_players(command, rows, team_ids):
+            saved['players'] = rows
+            return save_players(command, rows, team_ids)
+
+        def record_stats(command, rows, season):
+            saved['stats'] = rows
+            return save_stats(command, rows, season)
+
+        with mock.patch.object(Command, 'save_players', record_players), \
+                mock.patch.object(Command, 'save_advanced_stats', record_stats):
+            self.run_import(advanced=advanced, incremental=True)
+        # Only the row whose team was missing is retried
+        self.assertEqual([row['playerId'] for row in saved['players']], ['unknown01'])
+        self.assertEqual([row['playerId'] for row in saved['stats']], ['jamesle01'])
+        self.assertEqual(PlayerSeasonStats.objects.get(player__player_id='jamesle01').vorp, 5.0)
+        self.assertEqual(PlayerSeasonStats.objects.get(player__player_id='doncilu01').vorp, 4.5)
+        self.assertEqual(ImportWatermark.objects.get(source='populate_real_nba:playeradvancedstats', season=2024).rows_changed, 1)
+
+    def test_rows_with_unknown_teams_are_imported_once_the_team_exists(self):
+        self.run_import()
+        self.assertFalse(Player.objects.filter(player_id='unknown01').exists())
+        Team.objects.create(name='Expansion Team', abbreviation='XYZ')
+        self.run_import(incremental=True)
+        self.assertEqual(list(Player.objects.get(player_id='unknown01').teams.values_list('abbreviation', flat=True)), ['XYZ'])
+
+    def test_season_writes_use_a_fixed_number_of_queries(self):
+        from .management.commands.populate_real_nba import Command
+        Team.objects.create(name='Dallas Mavericks', abbreviation='DAL')
+        Team.objects.create(name='Los Angeles Lakers', abbreviation='LAL')
+        command = Command(stdout=StringIO(), stderr=StringIO())
+        team_ids = dict(Team.objects.values_list('abbreviation', 'id'))
+        with self.assertNumQueries(5):
+            command.save_players(self.totals, team_ids)
+        with self.assertNumQueries(2):
+            command.save_advanced_stats(self.advanced, 2024)
+
+
+@override_settings(ROSTER_SNAPSHOT_DIR=None)
+class PopulateDbTests(TestCase):
+    totals = [{'playerId': 'doncilu01', 'playerName': 'Luka Doncic', 'team': 'DAL'}]
+
+    def run_import(self, stat_lines, **options):
+        def fetch_pages(client, path, params=None):
+            return self.totals if params['season'] == 2024 else []
+
+        output = StringIO()
+        with mock.patch('game.nba_api.NBAApiClient.fetch_pages', fetch_pages), \
+                mock.patch('game.management.commands.populate_db.Command.get_teams', return_value={'DAL'}), \
+                mock.patch('game.management.commands.populate_db.Command.fetch_player_stat_lines', return_value=stat_lines), \
+                mock.patch.object(PlayerSeasonStats.objects, 'update_or_create', wraps=PlayerSeasonStats.objects.update_or_create) as upsert:
+            call_command('populate_db', no_cache=True, stdout=output, stderr=StringIO(), **options)
+        return upsert.call_count
+
+    def stat_lines(self, vorp_2024):
+        totals = [{'season': season, 'points': 28.0, 'totalRb': 8.0, 'assists': 8.0} for season in (2023, 2024)]
+        advanced = [{'season': 2023, 'vorp': 6.0}, {'season': 2024, 'vorp': vorp_2024}]
+        return advanced, totals
+
+    def test_incremental_stats_skip_unchanged_seasons(self):
+        self.assertEqual(self.run_import(self.stat_lines(5.0)), 2)
+        self.assertEqual(self.run_import(self.stat_lines(5.0), incremental=True), 0)
+        self.assertEqual(self.run_import(self.stat_lines(5.5), incremental=True), 1)
+        self.assertEqual(PlayerSeasonStats.objects.get(season=2024).vorp, 5.5)
+        self.assertEqual(PlayerSeasonStats.objects.get(season=2023).vorp, 6.0)
+        self.assertEqual(ImportWatermark.objects.get(source='populate_db:playerstats', season=2024).rows_changed, 1)
+
+
+class StubNBAApi:
+    """Local HTTP server answering like the NBA API from an in-memory page map."""
+
+    def __init__(self, pages, failures=0, etag=None):
+        self.pages = pages
+        self.failures = failures
+        self.etag = etag
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path, _, query = self.path.partition('?')
+                params = dict(part.split('=', 1) for part in query.split('&') if part)
+                stub.requests.append((path, params))
+                if stub.failures:
+                    stub.failures -= 1
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                if stub.etag and self.headers.get('If-None-Match') == stub.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                key = (path.rsplit('/', 1)[-1], params.get('season'), int(params.get('page', 1)))
+                rows = stub.pages.get(key, [])
+                pages = max([page for (endpoint, season, page) in stub.pages if endpoint == key[0] and season == key[1]] or [1])
+                body = json.dumps({'data': rows, 'pagination': {'pages': pages}}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                if stub.etag:
+                    self.send_header('ETag', stub.etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/api/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class NBAApiClientTests(SimpleTestCase):
+    def setUp(self):
+        self.stub = StubNBAApi({
+            ('playertotals', '2024', page): [{'playerId': f'p{page}', 'page': page}] for page in (1, 2, 3)
+        })
+        self.addCleanup(self.stub.close)
+
+    def test_fetch_pages_collects_every_page_in_order(self):
+        with NBAApiClient(base_url=self.stub.base_url, rate_limit=0) as client:
+            rows = client.fetch_pages('playertotals', {'season': 2024})
+        self.assertEqual([row['page'] for row in rows], [1, 2, 3])
+        self.assertEqual(len(self.stub.requests), 3)
+
+    def test_retries_server_errors_with_backoff(self):
+        self.stub.failures = 2
+        delays = []
+        with NBAApiClient(base_url=self.stub.base_url, rate_limit=0, backoff=0.1, sleep=delays.append) as client:
+            data = client.get_json('playertotals', {'season': 2024, 'page': 1})
+        self.assertEqual(data['data'][0]['playerId'], 'p1')
+        self.assertEqual(delays, [0.1, 0.2])
+
+    def test_token_bucket_spaces_out_requests(self):
+        now = [0.0]
+        delays = []
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0], sleep=delays.append)
+        for _ in range(4):
+            bucket.acquire()
+        self.assertEqual(delays, [0.5, 1.0])
+
+
+@override_settings(ROSTER_SNAPSHOT_DIR=None)
+class PopulateRealNbaStubServerTests(TestCase):
+    def test_import_against_stub_server(self):
+        stub = StubNBAApi({
+            ('playertotals', '2024', 1): [{'playerId': 'doncilu01', 'playerName': 'Luka Doncic', 'team': 'DAL', 'pos': 'PG'}],
+            ('playertotals', '2024', 2): [{'playerId': 'jamesle01', 'playerName': 'LeBron James', 'team': 'LAL', 'pos': 'SF'}],
+            ('playeradvancedstats', '2024', 1): [{'playerId': 'doncilu01', 'vorp': 4.5}],
+        })
+        self.addCleanup(stub.close)
+        with override_settings(NBA_API={'BASE_URL': stub.base_url, 'RATE_LIMIT': 0}):
+            call_command('populate_real_nba', seasons='2024', stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(Player.objects.count(), 2)
+        self.assertEqual(PlayerSeasonStats.objects.get(player__player_id='doncilu01').vorp, 4.5)
+
+
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        self.stub = StubNBAApi({('playertotals', '2024', 1): [{'playerId': 'p1'}]}, etag='"v1"')
+        self.addCleanup(self.stub.close)
+
+    def api_client(self, **kwargs):
+        return NBAApiClient(base_url=self.stub.base_url, rate_limit=0, cache_dir=self.cache_dir, **kwargs)
+
+    def test_revalidates_with_etag(self):
+        with self.api_client() as client:
+            first = client.get_json('playertotals', {'season': 2024})
+        with self.api_client() as client:
+            second = client.get_json('playertotals', {'season': 2024})
+            self.assertEqual(client.cache.revalidated, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(self.stub.requests[-1][0], '/api/playertotals')
+
+    def test_offline_replays_without_network(self):
+        with self.api_client() as client:
+            client.get_json('playertotals', {'season': 2024})
+        requests_made = len(self.stub.requests)
+        with self.api_client(offline=True) as client:
+            self.assertEqual(client.get_json('playertotals', {'season': 2024})['data'], [{'playerId': 'p1'}])
+            with self.assertRaises(OfflineCacheMiss):
+                client.get_json('playertotals', {'season': 2023})
+        self.assertEqual(len(self.stub.requests), requests_made)
+
+
+@override_settings(ROSTER_SNAPSHOT_DIR=None)
+class PopulateRealNbaFixtureTests(TestCase):
+    """Imports replayed offline from responses recorded in game/fixtures/nba_api."""
+
+    fixture_dir = os.path.join(os.path.dirname(__file__), 'fixtures', 'nba_api')
+
+    def run_import(self, seasons):
+        stdout = StringIO()
+        with mock.patch('requests.Session.send', side_effect=AssertionError('network access in offline mode')):
+            call_command('populate_real_nba', seasons=seasons, offline=True, cache_dir=self.fixture_dir,
+                         stdout=stdout, stderr=StringIO())
+        return stdout.getvalue()
+
+    def test_offline_import_from_recorded_responses(self):
+        output = self.run_import('2024')
+        self.assertIn('Response cache: 3 replayed', output)
+        self.assertEqual(Player.objects.count(), 5)
+        luka = Player.objects.get(player_id='doncilu01')
+        self.assertEqual(sorted(luka.teams.values_list('abbreviation', flat=True)), ['DAL', 'LAL'])
+        self.assertEqual(PlayerSeasonStats.objects.get(player__player_id='jokicni01', season=2024).vorp, 9.8)
+
+    def test_missing_recording_skips_season(self):
+        output = self.run_import('2023')
+        self.assertIn('No cached response', output)
+        self.assertEqual(Player.objects.count(), 0)
+
+
+class RosterSnapshotTests(TestCase):
+    def setUp(self):
+        self.team = Team.objects.create(name='Dallas Mavericks', abbreviation='DAL')
+        Player.objects.create(player_id='doncilu01', name='Luka Doncic', position='PG').teams.add(self.team)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.url = reverse('team-detail', args=[self.team.id])
+
+    def test_revalidation_returns_304_without_queries(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()['players'][0]['name'], 'Luka Doncic')
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get(reverse('team-list'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_gzip_variant(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.content)), self.client.get(self.url).json())
+        gzip_etag = response['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=gzip_etag, HTTP_ACCEPT_ENCODING='gzip').status_code, 304)
+
+    def test_refused_encodings_are_not_served(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0, deflate')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(response.json()['players'][0]['name'], 'Luka Doncic')
+
+    def test_roster_change_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        Player.objects.create(player_id='irvinky01', name='Kyrie Irving', position='PG').teams.add(self.team)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['players']), 2)
+
+    def test_workers_load_matching_snapshots_from_disk(self):
+        call_command('build_roster_snapshots', output=self.directory, stdout=StringIO())
+        self.assertTrue(os.path.exists(os.path.join(self.directory, f'teams/{self.team.id}.json.gz')))
+        with override_settings(ROSTER_SNAPSHOT_DIR=self.directory), \
+                mock.patch('game.snapshots._snapshots', None), \
+                mock.patch('game.snapshots.RosterSnapshots.from_catalog', side_effect=AssertionError('rebuilt')):
+            self.assertEqual(self.client.get(self.url).json()['players'][0]['name'], 'Luka Doncic')
+
+    def test_stale_disk_snapshots_are_ignored(self):
+        call_command('build_roster_snapshots', output=self.directory, stdout=StringIO())
+        Player.objects.create(player_id='irvinky01', name='Kyrie Irving', position='PG').teams.add(self.team)
+        with override_settings(ROSTER_SNAPSHOT_DIR=self.directory):
+            self.assertEqual(len(self.client.get(self.url).json()['players']), 2)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        Player.objects.create(player_id='doncilu01', name='Luka Doncic', position='PG')
+
+    def test_player_revalidation_costs_no_queries(self):
+        url = reverse('player-list') + '?fields=id,name'
+        response = self.client.get(url)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        self.assertIn('Last-Modified', response)
+        with self.assertNumQueries(0):
+            revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+        self.assertEqual(revalidated['Cache-Control'], 'public, max-age=60')
+
+        with self.assertNumQueries(0):
+            revalidated = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_missing_objects_are_not_revalidated(self):
+        last_modified = self.client.get(reverse('player-list'))['Last-Modified']
+        for url in (reverse('team-detail', args=[999]), reverse('player-detail', args=[999])):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+                self.assertEqual(response.status_code, 404)
+        player = reverse('player-detail', args=[Player.objects.get().id])
+        self.assertEqual(self.client.get(player, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+    def test_failed_precondition_skips_handler(self):
+        with mock.patch('game.views.PlayerViewSet.list') as handler:
+            response = self.client.get(reverse('player-list'), HTTP_IF_MATCH='"stale"')
+        handler.assert_not_called()
+        self.assertEqual(response.status_code, 412)
+
+    def test_etag_follows_url_and_data_version(self):
+        etag = self.client.get(reverse('player-list'))['ETag']
+        self.assertNotEqual(self.client.get(reverse('player-list') + '?fields=id')['ETag'], etag)
+        Player.objects.create(player_id='jamesle01', name='LeBron James', position='SF')
+        response = self.client.get(reverse('player-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_cache_control_per_endpoint(self):
+        self.assertEqual(self.client.get(reverse('team-list'))['Cache-Control'], 'public, max-age=300')
+        with override_settings(API_CACHE_CONTROL={'default': {'private': True, 'max_age': 5}}):
+            self.assertEqual(self.client.get(reverse('team-list'))['Cache-Control'], 'private, max-age=5')
+
+
+class StaticAssetTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.static_root)
+        cls.enterClassContext(override_settings(
+            STATIC_ROOT=cls.static_root,
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'game.storage.BundledStaticFilesStorage'},
+            },
+        ))
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.bundle = staticfiles_storage.stored_name('game/js/wheel.js')
+
+    def serve(self, path, **headers):
+        return serve_static(RequestFactory().get(f'/static/{path}', **headers), path)
+
+    def test_bundle_is_fingerprinted_and_precompressed(self):
+        self.assertRegex(self.bundle, r'^game/js/wheel\.[0-9a-f]{12}\.js$')
+        with open(os.path.join(self.static_root, self.bundle), 'rb') as file:
+            body = file.read()
+        with open(os.path.join(settings.BASE_DIR, 'game/static/game/js/Winwheel.min.js'), 'rb') as file:
+            self.assertTrue(body.endswith(file.read()))
+        with open(os.path.join(self.static_root, self.bundle + '.gz'), 'rb') as file:
+            self.assertEqual(gzip.decompress(file.read()), body)
+        self.assertTrue(staticfiles_storage.exists(staticfiles_storage.stored_name('game/css/game.css') + '.gz'))
+
+    def test_template_tag_emits_one_bundle(self):
+        rendered = Template("{% load game_tags %}{% asset_bundle 'game/js/wheel.js' %}").render(Context())
+        self.assertEqual(rendered, f'<script src="/static/{self.bundle}"></script>')
+        with override_settings(DEBUG=True):
+            rendered = Template("{% load game_tags %}{% asset_bundle 'game/css/game.css' %}").render(Context())
+        self.assertEqual(rendered.count('<link rel="stylesheet"'), 3)
+
+    def test_fingerprinted_files_are_immutable_and_compressed(self):
+        response = self.serve(self.bundle, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/javascript')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertNotIn('Content-Disposition', response)
+        self.assertEqual(self.serve(self.bundle, HTTP_IF_NONE_MATCH=response['ETag'], HTTP_ACCEPT_ENCODING='gzip').status_code, 304)
+
+    def test_unhashed_names_revalidate(self):
+        response = self.serve('game/js/wheel.js')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+        with self.assertRaises(Http404):
+            self.serve('../manage.py')
+
+
+@override_settings(CATALOG_CHECK_INTERVAL=3600)
+class ApiQueryBudgetTests(TestCase):
+    """Every /api/ endpoint must stay within a fixed number of queries, however much data there is."""
+
+    budgets = {
+        'api-root': 0,
+        'team-list': 0,
+        'team-detail': 0,
+        'player-list': 1,
+        'player-detail': 1,
+        'stats-list': 1,
+        'stats-detail': 1,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        Membership = Player.teams.through
+        teams = Team.objects.bulk_create(Team(name=f"Team {i}", abbreviation=f"T{i:02d}") for i in range(10))
+        players = Player.objects.bulk_create(
+            Player(player_id=f"p{i}", name=f"Player {i}", position='PG') for i in range(100)
+        )
+        Membership.objects.bulk_create(
+            Membership(team_id=teams[i % 10].id, player_id=player.id) for i, player in enumerate(players)
+        )
+        stats = PlayerSeasonStats.objects.bulk_create(
+            PlayerSeasonStats(player=player, season=2024, points=i, rebounds=i, assists=i, vorp=i) for i, player in enumerate(players)
+        )
+        bump_catalog_version()
+        cls.team = teams[0]
+        cls.player = players[0]
+        cls.stats = stats[0]
+
+    def setUp(self):
+        get_catalog()
+
+    def urls(self):
+        return {
+            'api-root': reverse('api-root'),
+            'team-list': reverse('team-list'),
+            'team-detail': reverse('team-detail', args=[self.team.id]),
+            'player-list': reverse('player-list'),
+            'player-detail': reverse('player-detail', args=[self.player.id]),
+            'stats-list': reverse('stats-list') + '?season=2024&team=T00',
+            'stats-detail': reverse('stats-detail', args=[self.stats.id]),
+        }
+
+    def test_every_router_endpoint_has_a_budget(self):
+        from .urls import router
+        for prefix, viewset, basename in router.registry:
+            for suffix in ('list', 'detail'):
+                self.assertIn(f"{basename}-{suffix}", self.budgets)
+
+    def test_endpoints_stay_within_query_budget(self):
+        for name, url in self.urls().items():
+            with self.subTest(endpoint=name), CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(queries), self.budgets[name], [query['sql'] for query in queries])
+
+    def test_team_detail_lists_players(self):
+        response = self.client.get(self.urls()['team-detail'])
+        self.assertEqual(len(response.json()['players']), 10)
+        self.assertEqual(set(response.json()['players'][0]), {'id', 'name', 'position'})
+
+    def test_team_detail_matches_serializer(self):
+        team = Team.objects.prefetch_related('players').get(pk=self.team.pk)
+        self.assertEqual(self.client.get(self.urls()['team-detail']).json(), TeamSerializer(team).data)
+        self.assertEqual(self.client.get(reverse('team-detail', args=[999])).status_code, 404)
+
+
+class StatsApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.lal = Team.objects.create(name='Los Angeles Lakers', abbreviation='LAL')
+        cls.den = Team.objects.create(name='Denver Nuggets', abbreviation='DEN')
+        cls.lebron = Player.objects.create(player_id='jamesle01', name='LeBron James', position='SF')
+        cls.davis = Player.objects.create(player_id='davisan02', name='Anthony Davis', position='C')
+        cls.jokic = Player.objects.create(player_id='jokicni01', name='Nikola Jokic', position='C')
+        cls.lebron.teams.add(cls.lal)
+        cls.davis.teams.add(cls.lal)
+        cls.jokic.teams.add(cls.den)
+        for player, season, points, vorp in [
+            (cls.lebron, 2023, 25.7, 4.9), (cls.lebron, 2024, 25.7, 5.0),
+            (cls.davis, 2024, 24.7, 4.1), (cls.jokic, 2024, 26.4, 9.8),
+        ]:
+            PlayerSeasonStats.objects.create(player=player, season=season, points=points, rebounds=8.0, assists=6.0, vorp=vorp)
+
+    def get(self, **params):
+        response = self.client.get(reverse('stats-list'), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def query_plan(self, **params):
+        """EXPLAIN QUERY PLAN details of the query the list runs for params."""
+        with CaptureQueriesContext(connection) as queries:
+            self.get(**params)
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {queries[-1]['sql']}")
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_season_leaderboard(self):
+        rows = self.get(season=2024)
+        self.assertEqual([row['name'] for row in rows], ['Nikola Jokic', 'LeBron James', 'Anthony Davis'])
+        self.assertEqual(rows[0], {
+            'id': rows[0]['id'], 'player': self.jokic.id, 'name': 'Nikola Jokic', 'season': 2024,
+            'points': 26.4, 'rebounds': 8.0, 'assists': 6.0, 'vorp': 9.8,
+        })
+        self.assertEqual([row['name'] for row in self.get(season=2024, order='points', top=1)], ['Nikola Jokic'])
+        self.assertEqual(self.get(season=2024, team='lal', fields='name,vorp'), [
+            {'name': 'LeBron James', 'vorp': 5.0}, {'name': 'Anthony Davis', 'vorp': 4.1},
+        ])
+        self.assertEqual([row['season'] for row in self.get(player='LeBron James')], [2024, 2023])
+
+    def test_detail_matches_serializer(self):
+        stats = PlayerSeasonStats.objects.select_related('player').get(player=self.jokic)
+        response = self.client.get(reverse('stats-detail', args=[stats.id]))
+        self.assertEqual(response.json(), PlayerSeasonStatsSerializer(stats).data)
+        self.assertEqual(response.json()['name'], 'Nikola Jokic')
+
+    def test_invalid_filters(self):
+        cases = [
+            ({}, 'season'),
+            ({'season': 'latest'}, 'season'),
+            ({'season': 2024, 'top': 'x'}, 'top'),
+            ({'season': 2024, 'top': 0}, 'top'),
+            ({'season': 2024, 'order': 'salary'}, 'order'),
+        ]
+        for params, key in cases:
+            with self.subTest(params=params):
+                response = self.client.get(reverse('stats-list'), params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.json()), [key])
+
+    def test_leaderboards_read_their_index_in_order(self):
+        for order in ('vorp', 'points', 'rebounds', 'assists'):
+            with self.subTest(order=order):
+                plan = self.query_plan(season=2024, order=order)
+                self.assertTrue(any(f'USING INDEX stats_season_{order}_idx (season=?)' in step for step in plan), plan)
+                self.assertFalse(any('TEMP B-TREE' in step for step in plan), plan)
+
+    def test_team_and_player_filters_use_indexes(self):
+        for params in [{'season': 2024, 'team': 'LAL'}, {'player': 'LeBron James'}]:
+            with self.subTest(params=params):
+                plan = self.query_plan(**params)
+                scans = [step for step in plan if step.startswith('SCAN')]
+                self.assertEqual(scans, [], plan)
+
+class PlayerListFastPathTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Player.objects.bulk_create(Player(player_id=f"p{i}", name=f"Player {i}", position='C') for i in range(7))
+
+    def test_matches_model_serializer(self):
+        from .serializers import PlayerSerializer
+        response = self.client.get(reverse('player-list'))
+        self.assertEqual(response.json(), PlayerSerializer(Player.objects.order_by('id'), many=True).data)
+
+    def test_field_selection(self):
+        response = self.client.get(reverse('player-list'), {'fields': 'name'})
+        self.assertEqual(response.json()[0], {'name': 'Player 0'})
+        response = self.client.get(reverse('player-list'), {'fields': 'id,salary'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_pagination_walks_every_player_once(self):
+        names = []
+        url = reverse('player-list') + '?limit=3&fields=name'
+        while url:
+            with self.assertNumQueries(1):
+                page = self.client.get(url).json()
+            names.extend(row['name'] for row in page['results'])
+            url = page['next']
+        self.assertEqual(names, [f"Player {i}" for i in range(7)])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(reverse('player-list'), {'cursor': '!!'}).status_code, 400)
+
+    def test_errors_name_the_bad_parameter(self):
+        for params, key in [({'cursor': '!!'}, 'cursor'), ({'limit': 'abc'}, 'limit'), ({'limit': 0}, 'limit')]:
+            with self.subTest(params=params):
+                response = self.client.get(reverse('player-list'), params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.json()), [key])
+
+
+class LoadHarnessTests(TestCase):
+    def test_game_is_played_through_every_endpoint(self):
+        create_rosters(num_teams=3, players_per_team=10)
+        client = LoadClient()
+        play_game(client, 3, random.Random(0))
+        self.assertEqual(len(client.samples['new_game']), 1)
+        self.assertEqual(len(client.samples['select_player_action']), 15)
+        self.assertEqual(len(client.samples['game_over']), 1)
+        state = GameState.from_dict(get_game_state_backend().load(client.client.session['game_id']))
+        self.assertTrue(state.is_over)
+        self.assertEqual(len(state.drafted), 15)
+
+    def test_baseline_comparison(self):
+        baseline = [summarize('load.all', [(0.001, 1), (0.002, 1)], 1.0)]
+        self.assertEqual(compare([summarize('load.all', [(0.0011, 1), (0.002, 1)], 1.0)], baseline), [])
+        regressions = compare([summarize('load.all', [(0.003, 2), (0.004, 2)], 1.0)], baseline)
+        self.assertEqual(len(regressions), 4)
+        self.assertIn('queries per request 1.00 -> 2.00', regressions[-1])
+        self.assertEqual(compare([summarize('load.other', [(1.0, 9)], 1.0)], baseline), [])
+
+
+class SyntheticLeagueTests(SimpleTestCase):
+    def test_names_are_unique_and_columns_match_league_json(self):
+        league = synthetic_league(2000)
+        self.assertEqual(len(league), 2000)
+        self.assertEqual(len(set(player['name'] for player in league.players)), 2000)
+        self.assertEqual(league.attribute_matrix.attributes, get_league_store().get().attribute_matrix.attributes)
+
+    def test_teams_score_and_draft(self):
+        league = synthetic_league(500)
+        teams = random_teams(league.players, 16)
+        winner, team_scores, _ = determine_winner_comprehensive(teams, league)
+        self.assertEqual(len(team_scores), 16)
+        self.assertIn(winner, team_scores)
+        self.assertEqual(len(drafted_state(teams).drafted), 80)
+
+
+class SqliteBackendTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_connections_get_tuned_pragmas(self):
+        self.assertEqual(connection.vendor, 'sqlite')
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('cache_size'), -20000)
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def file_connection(self):
+        """A separate connection to a throwaway database file, outside the test transaction."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        wrapper = DatabaseWrapper(dict(connection.settings_dict, NAME=os.path.join(directory, 'db.sqlite3')))
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def test_wal_on_file_databases(self):
+        with self.file_connection().cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+
+    def test_optimize_runs_between_requests_once_due(self):
+        wrapper = self.file_connection()
+        wrapper.optimized_at -= wrapper.optimize_interval
+        before = wrapper.optimized_at
+        with mock.patch.object(wrapper, 'optimize', wraps=wrapper.optimize) as optimize:
+            wrapper.close_if_unusable_or_obsolete()
+            wrapper.close_if_unusable_or_obsolete()
+        optimize.assert_called_once()
+        self.assertGreater(wrapper.optimized_at, before)
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TeamViewSet, PlayerViewSet, main_menu, wheel_view, new_game_view, select_player_action_view, game_over_view
+from .views import TeamViewSet, PlayerViewSet, PlayerSeasonStatsViewSet, main_menu, wheel_view, new_game_view, select_player_action_view, game_over_view
 
 router = DefaultRouter()
 router.register(r'teams', TeamViewSet, basename='team')
 router.register(r'players', PlayerViewSet, basename='player')
+router.register(r'stats', PlayerSeasonStatsViewSet, basename='stats')
 
 urlpatterns = [
     path('', main_menu, name='main_menu'),
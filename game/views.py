@@ -1,72 +1,55 @@
+import base64
+import hashlib
 import json
 import logging
+import mimetypes
+import os
+import re
+import numpy as np
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import caches
+from django.core.exceptions import SuspiciousFileOperation
 from django.shortcuts import render, redirect
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
 from django.views.decorators.http import require_POST
-from rest_framework import viewsets, status
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Team, Player
-from .serializers import TeamSerializer, PlayerSerializer, TeamNameSerializer
-import os
-from django.conf import settings
+from rest_framework.utils.urls import replace_query_param
+from .models import LEAGUE_ATTRIBUTE_FIELDS, Player, PlayerAttributes, PlayerSeasonStats, Team
+from .serializers import (
+    PlayerSerializer,
+    PlayerValuesSerializer,
+    PlayerSeasonStatsSerializer,
+    PlayerSeasonStatsValuesSerializer,
+)
+from .catalog import get_catalog, player_names
+from .conditional import ConditionalGetMixin
+from .encoding import ENCODING_SUFFIXES, dumps, preferred_encoding
+from .league import LeagueData, get_league_store
+from .scoring import AttributeMatrix, score_teams
+from .snapshots import get_roster_snapshots
+from .state import GameState, load_game_state, save_game_state, start_game_state
+from .templatetags.game_tags import replace_underscores
 
 logger = logging.getLogger(__name__)
 
 # Game State Utility Functions
 def get_teams_display_data(game_state):
     """Generate teams display data for templates."""
-    teams_data = []
-    if game_state:
-        for i in range(1, game_state.get('num_players', 0) + 1):
-            team_key = f"player_{i}_team"
-            teams_data.append({
-                'player_num': i,
-                'is_current': i == game_state.get('current_player'),
-                'roster': game_state.get(team_key, [])
-            })
-    return teams_data
+    return game_state.teams_display_data() if game_state else []
 
 def get_all_drafted_player_ids(game_state):
     """Get set of all drafted player IDs across all teams."""
-    drafted_ids = set()
-    for i in range(1, game_state.get('num_players', 0) + 1):
-        roster = game_state.get(f"player_{i}_team", [])
-        for player_data in roster:
-            if player_data and 'id' in player_data:
-                drafted_ids.add(player_data['id'])
-    return drafted_ids
+    return set(game_state.drafted)
 
 def validate_player_selection(game_state, player_id, position):
     """Validate if a player can be drafted in the given position."""
-    current_player_team_key = f"player_{game_state['current_player']}_team"
-    
-    # Check for duplicate positions
-    existing_positions = [p.get('position', '').upper() for p in game_state.get(current_player_team_key, [])]
-    if position.upper() in existing_positions:
-        return False, f"You already drafted a {position}. Choose a different position."
-
-    # Check for duplicate players
-    for i in range(1, game_state['num_players'] + 1):
-        team_key = f"player_{i}_team"
-        for drafted_player in game_state.get(team_key, []):
-            if drafted_player.get('id') == player_id:
-                try:
-                    player = Player.objects.get(id=player_id)
-                    return False, f"{player.name} has already been drafted by another team."
-                except Player.DoesNotExist:
-                    return False, "Player not found."
-    
-    return True, ""
-
-def advance_turn(game_state):
-    """Advance to the next player/turn."""
-    if game_state['current_player'] < game_state['num_players']:
-        game_state['current_player'] += 1
-    else:
-        game_state['current_player'] = 1
-        game_state['turn'] += 1
-
+    return game_state.validate(player_id, position)
 
 
 def main_menu(request):
@@ -76,23 +59,12 @@ def main_menu(request):
 def new_game_view(request):
     """Initialize a new game with the selected number of players."""
     num_players = int(request.POST.get('num_players', 2))
-    
-    game_state = {
-        'current_player': 1,
-        'turn': 1,
-        'num_players': num_players,
-    }
-    
-    # Initialize empty teams for each player
-    for i in range(1, num_players + 1):
-        game_state[f'player_{i}_team'] = []
-
-    request.session['game_state'] = game_state
+    start_game_state(request, GameState(num_players))
     return redirect('wheel')
 
 def wheel_view(request):
     """Display the wheel for team selection."""
-    game_state = request.session.get('game_state')
+    game_state = load_game_state(request)
     
     if not game_state:
         return redirect('new_game')
@@ -109,7 +81,7 @@ def wheel_view(request):
 @require_POST
 def select_player_action_view(request):
     """Handle player selection and update game state."""
-    game_state = request.session.get('game_state')
+    game_state = load_game_state(request)
     if not game_state:
         return JsonResponse({'error': 'Game state not found.'}, status=400)
 
@@ -120,41 +92,33 @@ def select_player_action_view(request):
         
         if not player_id or not position:
             return JsonResponse({'error': 'Missing player_id or position'}, status=400)
+        try:
+            player_id = int(player_id)
+        except (TypeError, ValueError):
+            return JsonResponse({'error': 'Invalid player_id'}, status=400)
 
         # Validate player selection
         is_valid, error_message = validate_player_selection(game_state, player_id, position)
         if not is_valid:
             return JsonResponse({'error': error_message}, status=400)
 
-        # Get player and create player data
-        player = Player.objects.get(id=player_id)
-        player_data = {
-            'id': player.id,
-            'name': player.name,
-            'position': position
-        }
-        
-        # Add player to current player's team
-        current_player_team_key = f"player_{game_state['current_player']}_team"
-        if current_player_team_key not in game_state:
-            game_state[current_player_team_key] = []
-        game_state[current_player_team_key].append(player_data)
-        
-        # Advance turn
-        advance_turn(game_state)
+        # At most one primary-key read; none once the player's name is cached
+        name = player_names([player_id]).get(player_id)
+        if name is None:
+            return JsonResponse({'error': f'Player with id {player_id} not found'}, status=404)
+
+        # Add player to current player's team and advance the turn
+        game_state.pick(player_id, position, name)
         
-        # Save session
-        request.session['game_state'] = game_state
-        request.session.modified = True
+        # Save game state
+        save_game_state(request, game_state)
         
         # Check if game is over
-        if game_state['turn'] > 5:
+        if game_state.is_over:
             return JsonResponse({'redirect_url': '/game_over/'})
 
         return JsonResponse({'redirect_url': '/wheel/'})
         
-    except Player.DoesNotExist:
-        return JsonResponse({'error': f'Player with id {player_id} not found'}, status=404)
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON data'}, status=400)
     except Exception as e:
@@ -162,117 +126,94 @@ def select_player_action_view(request):
         return JsonResponse({'error': 'Server error occurred'}, status=500)
 
 def load_league_data():
-    """Load comprehensive player data from league.json"""
-    league_file_path = os.path.join(settings.BASE_DIR, 'league.json')
-    try:
-        with open(league_file_path, 'r', encoding='utf-8') as file:
-            return json.load(file)
-    except FileNotFoundError:
-        logger.error(f"league.json not found at {league_file_path}")
-        return []
-    except json.JSONDecodeError as e:
-        logger.error(f"Error parsing league.json: {e}")
-        return []
+    """Return the shared, read-only league.json player list for this process."""
+    return get_league_store().get().players
 
 def get_player_league_data(player_name, league_data):
     """Get comprehensive stats for a player from league data"""
-    # Normalize player name for matching
-    normalized_name = player_name.strip().lower()
-    
-    for player_data in league_data:
-        if player_data.get('name', '').strip().lower() == normalized_name:
-            return player_data
-    
-    # If exact match not found, try partial matching
-    for player_data in league_data:
-        league_name = player_data.get('name', '').strip().lower()
-        if normalized_name in league_name or league_name in normalized_name:
-            return player_data
-    
-    logger.warning(f"Player {player_name} not found in league data")
-    return None
+    if not isinstance(league_data, LeagueData):
+        league_data = LeagueData(league_data)
+
+    player_data = league_data.find(player_name)
+    if player_data is None:
+        logger.warning(f"Player {player_name} not found in league data")
+    return player_data
+
+def calculate_comprehensive_team_scores(teams_display_data, league=None):
+    """Calculate comprehensive team scores based on all available attributes from league.json
 
-def calculate_comprehensive_team_scores(teams_display_data):
-    """Calculate comprehensive team scores based on all available attributes from league.json"""
-    league_data = load_league_data()
-    if not league_data:
+    Without an explicit league and with LEAGUE_RATINGS_SOURCE = 'database',
+    drafted players are scored from their PlayerAttributes rows instead.
+    """
+    if league is None:
+        league = get_league_store().get()
+        if settings.LEAGUE_RATINGS_SOURCE == 'database':
+            return calculate_stored_team_scores(teams_display_data, league)
+    if not league.players:
         # Fallback to simple scoring if league data unavailable
         return calculate_simple_team_scores(teams_display_data)
-    
-    # Get all possible attributes from the first player (excluding name and team)
-    sample_player = league_data[0] if league_data else {}
-    all_attributes = [key for key in sample_player.keys() if key not in ['name', 'team']]
-    
+
+    attribute_matrix = league.attribute_matrix
+    all_attributes = list(attribute_matrix.attributes)
+
     logger.info(f"Found {len(all_attributes)} attributes to evaluate: {all_attributes}")
-    
-    team_scores = {}
-    team_attribute_totals = {}
-    
-    # Calculate totals for each attribute for each team
+
+    # Resolve every drafted player to a row of the attribute matrix
+    player_nums = []
+    rosters = []
     for team in teams_display_data:
-        player_num = team['player_num']
-        team_scores[player_num] = {'total_attributes_won': 0, 'details': {}}
-        team_attribute_totals[player_num] = {}
-        
-        # Initialize all attributes to 0
-        for attr in all_attributes:
-            team_attribute_totals[player_num][attr] = 0
-        
-        # Sum up attributes for all players on the team
+        rows = []
         for player in team['roster']:
-            player_data = get_player_league_data(player['name'], league_data)
-            if player_data:
-                for attr in all_attributes:
-                    value = player_data.get(attr, 0)
-                    if isinstance(value, (int, float)):
-                        team_attribute_totals[player_num][attr] += value
-                    else:
-                        logger.warning(f"Non-numeric value for {attr} in {player['name']}: {value}")
-    
-    # Compare teams for each attribute
-    for attr in all_attributes:
-        # Find the team with the highest total for this attribute
-        max_value = -1
-        winning_teams = []
-        
-        for player_num in team_attribute_totals:
-            attr_total = team_attribute_totals[player_num][attr]
-            if attr_total > max_value:
-                max_value = attr_total
-                winning_teams = [player_num]
-            elif attr_total == max_value and attr_total > 0:
-                winning_teams.append(player_num)
-        
-        # Award points to winning team(s) for this attribute
-        if len(winning_teams) == 1:
-            winning_team = winning_teams[0]
-            team_scores[winning_team]['total_attributes_won'] += 1
-            team_scores[winning_team]['details'][attr] = {
-                'won': True,
-                'value': team_attribute_totals[winning_team][attr],
-                'vs_others': {str(pn): team_attribute_totals[pn][attr] for pn in team_attribute_totals if pn != winning_team}
-            }
-            
-            # Add loss details to other teams
-            for other_team in team_attribute_totals:
-                if other_team != winning_team:
-                    team_scores[other_team]['details'][attr] = {
-                        'won': False,
-                        'value': team_attribute_totals[other_team][attr],
-                        'vs_others': {str(winning_team): team_attribute_totals[winning_team][attr]}
-                    }
-        else:
-            # Tie - no team gets a point for this attribute
-            for player_num in team_attribute_totals:
-                team_scores[player_num]['details'][attr] = {
-                    'won': None,  # Indicates tie
-                    'value': team_attribute_totals[player_num][attr],
-                    'vs_others': {str(pn): team_attribute_totals[pn][attr] for pn in team_attribute_totals if pn != player_num}
-                }
-    
+            row = league.index.find(player['name'])
+            if row is None:
+                logger.warning(f"Player {player['name']} not found in league data")
+            else:
+                rows.append(row)
+        player_nums.append(team['player_num'])
+        rosters.append(rows)
+
+    team_scores = score_teams(attribute_matrix, player_nums, rosters)
+
     logger.info(f"Team attribute scores: {team_scores}")
     return team_scores, all_attributes
 
+def calculate_stored_team_scores(teams_display_data, league):
+    """Score rosters from PlayerAttributes, read in a single query by player id.
+
+    Players are matched to league entries once, by import_league_attributes;
+    one without a row scores nothing rather than being guessed by name here.
+    Until the first import the table is empty and league.json is used.
+    """
+    keys = [key for key, _field in LEAGUE_ATTRIBUTE_FIELDS]
+    player_ids = [player['id'] for team in teams_display_data for player in team['roster']]
+    stored = {
+        row[0]: row[1:]
+        for row in PlayerAttributes.objects.filter(player_id__in=player_ids).values_list(
+            'player_id', *(field for _key, field in LEAGUE_ATTRIBUTE_FIELDS)
+        )
+    }
+    if not stored and not PlayerAttributes.objects.exists():
+        return calculate_comprehensive_team_scores(teams_display_data, league)
+
+    player_nums = []
+    rosters = []
+    rows = []
+    for team in teams_display_data:
+        roster = []
+        for player in team['roster']:
+            if player['id'] not in stored:
+                logger.warning(f"Player {player['name']} has no stored attributes")
+                continue
+            rows.append(stored[player['id']])
+            roster.append(len(rows) - 1)
+        player_nums.append(team['player_num'])
+        rosters.append(roster)
+
+    matrix = np.array(rows, dtype=np.float64).reshape(len(rows), len(keys))
+    attribute_matrix = AttributeMatrix.from_arrays(keys, matrix, np.ones(len(keys), dtype=bool))
+    team_scores = score_teams(attribute_matrix, player_nums, rosters)
+    return team_scores, keys
+
 def calculate_simple_team_scores(teams_display_data):
     """Fallback simple scoring system if league data is unavailable"""
     team_scores = {}
@@ -285,9 +226,9 @@ def calculate_simple_team_scores(teams_display_data):
         }
     return team_scores, ['players_drafted']
 
-def determine_winner_comprehensive(teams_display_data):
+def determine_winner_comprehensive(teams_display_data, league=None):
     """Determine the winner using comprehensive attribute comparison"""
-    team_scores, all_attributes = calculate_comprehensive_team_scores(teams_display_data)
+    team_scores, all_attributes = calculate_comprehensive_team_scores(teams_display_data, league)
     
     # Find the team with the most attributes won
     max_attributes_won = 0
@@ -311,48 +252,286 @@ def determine_winner_comprehensive(teams_display_data):
     
     return winner, team_scores, all_attributes
 
+def roster_signature(teams_display_data, league_version):
+    """Canonical key for a set of final rosters scored against one league version."""
+    seats = [
+        [team['player_num'], sorted(player['id'] for player in team['roster'])]
+        for team in teams_display_data
+    ]
+    payload = json.dumps([league_version, seats], separators=(',', ':'))
+    return 'game-result:' + hashlib.sha1(payload.encode()).hexdigest()
+
+def fragment_signature(teams_display_data, version):
+    """Key for the rendered results, which list each roster in draft order with its slots."""
+    seats = [
+        [team['player_num'], [[player['id'], player['position']] for player in team['roster']]]
+        for team in teams_display_data
+    ]
+    payload = json.dumps([version, seats], separators=(',', ':'))
+    return 'game-fragment:' + hashlib.sha1(payload.encode()).hexdigest()
+
+def get_final_result(teams_display_data):
+    """Score frozen rosters once and serve repeat views from the scoring cache."""
+    league = get_league_store().get()
+    cache = caches['scoring']
+    # Stored attributes change with the catalog token, league.json with its version
+    key = roster_signature(teams_display_data, f"{league.version}:{get_catalog().token}")
+    result = cache.get(key)
+    if result is None:
+        result = determine_winner_comprehensive(teams_display_data)
+        cache.set(key, result)
+    return result
+
+def summarize_scores(teams_display_data, team_scores, all_attributes, winner):
+    """Add per-team score summaries and build the attribute comparison rows.
+
+    Everything the game over page shows is computed here once, so the
+    template only loops over ready-made values.
+    """
+    for team_data in teams_display_data:
+        player_num = team_data['player_num']
+        score_data = team_scores.get(player_num, {})
+        details = score_data.get('details', {})
+        outcomes = [attr_data.get('won') for attr_data in details.values()]
+        team_data['attributes_won'] = score_data.get('total_attributes_won', 0)
+        team_data['score_details'] = details
+        team_data['is_winner'] = player_num == winner
+        team_data['won_count'] = outcomes.count(True)
+        team_data['lost_count'] = outcomes.count(False)
+        team_data['tied_count'] = outcomes.count(None)
+        # Wins among the first five attributes, as the page has always shown
+        team_data['sample_wins'] = [
+            (replace_underscores(attr_name), attr_data.get('value'))
+            for attr_name, attr_data in list(details.items())[:5]
+            if attr_data.get('won') is True
+        ]
+
+    attribute_rows = []
+    for attr_name in all_attributes:
+        cells = []
+        for team_data in teams_display_data:
+            attr_data = team_data['score_details'].get(attr_name) or {}
+            cells.append({
+                'player_num': team_data['player_num'],
+                'value': attr_data.get('value') or '0',
+                'won': attr_data.get('won'),
+            })
+        attribute_rows.append({'label': replace_underscores(attr_name), 'cells': cells})
+    return attribute_rows
+
 def game_over_view(request):
     """Display the game over screen with comprehensive team analysis."""
-    game_state = request.session.get('game_state')
+    game_state = load_game_state(request)
     if not game_state:
         return redirect('new_game')
     
     # Get teams display data first
     teams_display_data = get_teams_display_data(game_state)
     
-    # Use comprehensive scoring system
-    winner, team_scores, all_attributes = determine_winner_comprehensive(teams_display_data)
+    # Use comprehensive scoring system; rosters are frozen once the draft is over,
+    # so their rendered results can be cached as a fragment too
+    fragment_key = None
+    if game_state.is_over:
+        winner, team_scores, all_attributes = get_final_result(teams_display_data)
+        league = get_league_store().get()
+        fragment_key = fragment_signature(teams_display_data, f"{league.version}:{get_catalog().token}")
+    else:
+        winner, team_scores, all_attributes = determine_winner_comprehensive(teams_display_data)
 
-    # Enhance teams display data with comprehensive scores and winner status
-    for team_data in teams_display_data:
-        player_num = team_data['player_num']
-        score_data = team_scores.get(player_num, {})
-        team_data['attributes_won'] = score_data.get('total_attributes_won', 0)
-        team_data['score_details'] = score_data.get('details', {})
-        team_data['is_winner'] = player_num == winner
+    attribute_rows = summarize_scores(teams_display_data, team_scores, all_attributes, winner)
 
     context = {
         'game_state': game_state,
         'winner': winner,
         'teams_display_data': teams_display_data,
         'all_attributes': all_attributes,
+        'attribute_rows': attribute_rows,
         'team_scores': team_scores,
-        'total_attributes': len(all_attributes)
+        'total_attributes': len(all_attributes),
+        'fragment_key': fragment_key,
     }
     
     return render(request, 'game/game_over.html', context)
 
 # API ViewSets
-class TeamViewSet(viewsets.ReadOnlyModelViewSet):
-    """API endpoint that allows teams to be viewed."""
+def snapshot_response(request, snapshot):
+    """Serve a snapshot in the best encoding the client accepts."""
+    encoding, body, etag = snapshot.variant(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    response = HttpResponse(body, content_type='application/json')
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+class TeamViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    """API endpoint that allows teams to be viewed.
+
+    Responses are roster snapshots, validated by their content ETags.
+    """
+    # Only gives the router its basename; responses never query it
     queryset = Team.objects.all()
-    
-    def get_serializer_class(self):
+
+    def get_snapshot(self):
+        snapshots = get_roster_snapshots()
         if self.action == 'list':
-            return TeamNameSerializer
-        return TeamSerializer
+            return snapshots.index
+        try:
+            return snapshots.teams.get(int(self.kwargs[self.lookup_field]))
+        except ValueError:
+            return None
+
+    def resource_exists(self, request):
+        return self.get_snapshot() is not None
 
-class PlayerViewSet(viewsets.ReadOnlyModelViewSet):
-    """API endpoint that allows players to be viewed."""
-    queryset = Player.objects.all()
+    def get_etag(self, request):
+        return self.get_snapshot().variant(request.META.get('HTTP_ACCEPT_ENCODING', ''))[2]
+
+    def list(self, request, *args, **kwargs):
+        return snapshot_response(request, self.get_snapshot())
+
+    def retrieve(self, request, *args, **kwargs):
+        # Rosters are prebuilt, precompressed snapshots of the in-memory catalog
+        snapshot = self.get_snapshot()
+        if snapshot is None:
+            raise Http404
+        return snapshot_response(request, snapshot)
+
+class PlayerViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    """API endpoint that allows players to be viewed.
+
+    The list is served from values_list() rows and supports ?fields=id,name
+    and opt-in cursor pagination with ?limit=N (follow the returned 'next').
+    """
+    queryset = Player.objects.only(*PlayerSerializer.Meta.fields)
     serializer_class = PlayerSerializer
+    max_limit = 500
+
+    def resource_exists(self, request):
+        if self.action != 'retrieve':
+            return True
+        try:
+            return int(self.kwargs[self.lookup_field]) in get_catalog().player_index
+        except ValueError:
+            return False
+
+    def list(self, request, *args, **kwargs):
+        fields = request.query_params.get('fields')
+        serializer = PlayerValuesSerializer(fields.split(',') if fields else None)
+        queryset = Player.objects.order_by('id')
+
+        if 'limit' not in request.query_params and 'cursor' not in request.query_params:
+            return HttpResponse(dumps(serializer.rows(queryset)), content_type='application/json')
+
+        try:
+            limit = min(int(request.query_params.get('limit', self.max_limit)), self.max_limit)
+        except ValueError:
+            raise serializers.ValidationError({'limit': 'Limit must be an integer.'})
+        try:
+            cursor = request.query_params.get('cursor')
+            after = int(base64.urlsafe_b64decode(cursor.encode()).decode()) if cursor else None
+        except (ValueError, UnicodeDecodeError):
+            raise serializers.ValidationError({'cursor': 'Invalid cursor.'})
+        if limit < 1:
+            raise serializers.ValidationError({'limit': 'Limit must be positive.'})
+
+        results, next_after = serializer.page(queryset, limit, after)
+        next_url = None
+        if next_after is not None:
+            cursor = base64.urlsafe_b64encode(str(next_after).encode()).decode()
+            next_url = replace_query_param(request.build_absolute_uri(), 'cursor', cursor)
+        return HttpResponse(dumps({'next': next_url, 'results': results}), content_type='application/json')
+
+class PlayerSeasonStatsViewSet(viewsets.ReadOnlyModelViewSet):
+    """API endpoint for season stats and leaderboards.
+
+    The list needs ?season=YYYY or ?player=<name>, and takes ?team=ABBR,
+    ?order=vorp|points|rebounds|assists (best first), ?top=N and ?fields=.
+    Each order has a (season, -column) index, so a season's top N is read
+    straight off it.
+    """
+    queryset = PlayerSeasonStats.objects.select_related('player')
+    serializer_class = PlayerSeasonStatsSerializer
+    orders = ('vorp', 'points', 'rebounds', 'assists')
+    default_top = 10
+    max_top = 100
+
+    def list(self, request, *args, **kwargs):
+        params = request.query_params
+        fields = params.get('fields')
+        serializer = PlayerSeasonStatsValuesSerializer(fields.split(',') if fields else None)
+
+        try:
+            season = int(params['season']) if 'season' in params else None
+        except ValueError:
+            raise serializers.ValidationError({'season': 'Season must be an integer.'})
+        try:
+            top = min(int(params.get('top', self.default_top)), self.max_top)
+        except ValueError:
+            raise serializers.ValidationError({'top': 'Top must be an integer.'})
+        if top < 1:
+            raise serializers.ValidationError({'top': 'Top must be positive.'})
+        order = params.get('order', 'vorp')
+        if order not in self.orders:
+            raise serializers.ValidationError({'order': f"Order by one of: {', '.join(self.orders)}"})
+        if season is None and 'player' not in params:
+            raise serializers.ValidationError({'season': 'Pass a season or a player.'})
+
+        queryset = PlayerSeasonStats.objects.all()
+        if season is not None:
+            queryset = queryset.filter(season=season)
+        if 'player' in params:
+            queryset = queryset.filter(player__name=params['player'])
+        if 'team' in params:
+            queryset = queryset.filter(player__teams__abbreviation=params['team'].upper())
+        # id breaks ties; SQLite indexes end in the rowid, so this order is still the index's
+        queryset = queryset.order_by(f'-{order}', 'id')[:top]
+        return HttpResponse(dumps(serializer.rows(queryset)), content_type='application/json')
+
+
+# Static files
+STATIC_HASH = re.compile(r'\.[0-9a-f]{12}(?=\.[^./]+$)')
+
+def is_fingerprinted(path):
+    """True if path is the name collectstatic's manifest gives some file."""
+    match = STATIC_HASH.search(path)
+    if match is None:
+        return False
+    original = path[:match.start()] + path[match.end():]
+    return getattr(staticfiles_storage, 'hashed_files', {}).get(original) == path
+
+def serve_static(request, path):
+    """Serve collected static files when DEBUG is off.
+
+    Sends the precompressed sibling the client accepts, answers conditional
+    requests with 304, and lets browsers keep fingerprinted files for a year
+    without asking again.
+    """
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+
+    available = [encoding for encoding, suffix in ENCODING_SUFFIXES.items() if os.path.isfile(fullpath + suffix)]
+    encoding = preferred_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), available)
+    served = fullpath + ENCODING_SUFFIXES[encoding] if encoding else fullpath
+    stat = os.stat(served)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        content_type = mimetypes.guess_type(fullpath)[0] or 'application/octet-stream'
+        response = FileResponse(open(served, 'rb'), content_type=content_type)
+        del response['Content-Disposition']
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    if is_fingerprinted(path):
+        patch_cache_control(response, public=True, max_age=365 * 24 * 60 * 60, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
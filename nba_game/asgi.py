@@ -14,3 +14,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nba_game.settings')
 
 application = get_asgi_application()
+
+from game.catalog import warm_catalog  # noqa: E402
+
+warm_catalog()
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'game.middleware.QueryCountMiddleware',  # DEBUG only
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -57,13 +58,19 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compile each template once per process
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -76,8 +83,17 @@ WSGI_APPLICATION = 'nba_game.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # SQLite in WAL mode with a busy timeout and tuned pragmas, see game/sqlite/base.py
+        'ENGINE': 'game.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep one connection per worker thread across requests
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock when a transaction begins, so concurrent writers
+            # wait on busy_timeout instead of failing to upgrade a read lock
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -121,16 +137,105 @@ STATIC_URL = 'static/'
 # Static files directories for development
 STATICFILES_DIRS = []
 
+# `manage.py collectstatic` output, served by game.views.serve_static when DEBUG is off
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Files concatenated into one fingerprinted asset by collectstatic; see {% asset_bundle %}
+STATIC_BUNDLES = {
+    'game/js/wheel.js': ['game/js/TweenMax.min.js', 'game/js/Winwheel.min.js'],
+    'game/css/game.css': ['game/css/base.css', 'game/css/components.css', 'game/css/pages.css'],
+}
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Bundled, content-hashed and precompressed by collectstatic outside DEBUG;
+    # DEBUG serves the sources unchanged
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'game.storage.BundledStaticFilesStorage'
+        ),
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# League ratings used for end-of-game scoring
+LEAGUE_DATA_FILE = BASE_DIR / 'league.json'
+# Compiled, memory-mapped copy shared by all workers; rebuilt when league.json changes.
+# None parses league.json in every worker instead.
+LEAGUE_COMPILED_FILE = BASE_DIR / 'league.bin'
+# 'database' scores drafted players by id from PlayerAttributes, as matched by
+# import_league_attributes (league.json until the first import); 'file' matches names in league.json
+LEAGUE_RATINGS_SOURCE = 'database'
+
+# NBA data API used by the populate_* management commands
+NBA_API = {
+    'BASE_URL': 'https://api.server.nbaapi.com/api/',
+    'MAX_WORKERS': 4,     # concurrent requests in flight
+    'RATE_LIMIT': 4.0,    # average requests per second
+    'BURST': 4,
+    'RETRIES': 3,
+    'BACKOFF': 0.5,       # seconds, doubled on each retry
+    'TIMEOUT': 30,
+    'CACHE_DIR': BASE_DIR / 'nba_api_cache',  # on-disk response cache, None to disable
+}
+
+# Caches
+# Final scoring results are cached per roster signature; entries are evicted
+# least-recently-used once MAX_ENTRIES is reached, or after TIMEOUT seconds.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'scoring': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'game-scoring',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+        },
+    },
+}
+
 # Session configuration
+# The session only holds the current game id, so a signed cookie is enough and
+# requests never touch the database for it.
 SESSION_COOKIE_AGE = 86400  # 24 hours
-SESSION_SAVE_EVERY_REQUEST = True
+SESSION_SAVE_EVERY_REQUEST = False
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+
+# Seconds between checks that this worker's in-memory team/player catalog is current
+CATALOG_CHECK_INTERVAL = 5
+
+# Precompressed team list/roster JSON written by build_roster_snapshots and the importers; None disables writing
+ROSTER_SNAPSHOT_DIR = BASE_DIR / 'roster_snapshots'
+
+# Cache-Control for API responses by route name, with a fallback for the rest.
+# Responses carry ETag/Last-Modified, so clients revalidate cheaply once these expire.
+API_CACHE_CONTROL = {
+    'team-list': {'public': True, 'max_age': 300},
+    'team-detail': {'public': True, 'max_age': 300},
+    'player-list': {'public': True, 'max_age': 60},
+    'player-detail': {'public': True, 'max_age': 60},
+    'default': {'no_cache': True},
+}
+
+# Game state store, written only when a draft pick changes it.
+# - game.state.CachedDBGameStateBackend: SavedGame table behind a cache; the session carries
+#   the saved revision, so loads only query the table when this worker's copy is out of date
+# - game.state.RedisGameStateBackend: Redis, or `manage.py run_state_server`
+# - game.state.LocalGameStateBackend: in-process, single worker only, lost on restart
+GAME_STATE = {
+    'BACKEND': 'game.state.CachedDBGameStateBackend',
+    'OPTIONS': {},
+}
 
 # Logging configuration
 LOGGING = {